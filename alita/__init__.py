@@ -17,14 +17,16 @@
 
 
 from datetime import datetime
-from importlib import import_module as imp_mod
 from logging import INFO, WARNING, FileHandler, StreamHandler, basicConfig, getLogger
 from os import environ, mkdir, path
 from sys import exit as sysexit
-from sys import stdout, version_info
-from time import time
+from sys import modules, stdout, version_info
+from time import perf_counter, time
 from traceback import format_exc
 
+# Start of the startup profile, phases are timed from here
+BOOT_START = perf_counter()
+
 LOG_DATETIME = datetime.now().strftime("%d_%m_%Y-%H_%M_%S")
 LOGDIR = f"{__name__}/logs"
 
@@ -96,8 +98,16 @@ SUPPORT_STAFF = list(
 # Plugins, DB and Workers
 DB_URI = Config.DB_URI
 DB_NAME = Config.DB_NAME
+DB_BACKEND = Config.DB_BACKEND
+DB_LATENCY_MS = Config.DB_LATENCY_MS
+CACHE_BUS = Config.CACHE_BUS
 NO_LOAD = Config.NO_LOAD
 WORKERS = Config.WORKERS
+DB_MAX_POOL_SIZE = Config.DB_MAX_POOL_SIZE
+DB_MIN_POOL_SIZE = Config.DB_MIN_POOL_SIZE
+DB_TIMEOUT = Config.DB_TIMEOUT
+DB_SLOW_QUERY_MS = Config.DB_SLOW_QUERY_MS
+STATS_REFRESH_INTERVAL = Config.STATS_REFRESH_INTERVAL
 
 # Prefixes
 PREFIX_HANDLER = Config.PREFIX_HANDLER
@@ -129,7 +139,12 @@ async def load_cmds(all_plugins):
             LOGGER.warning(f"Not loading '{single}' s it's added in NO_LOAD list")
             continue
 
-        imported_module = imp_mod("ineruki.plugins." + single)
+        # Already imported by pyrogram when it loaded the plugins, never
+        # import plugin code a second time only to read its metadata
+        imported_module = modules.get("ineruki.plugins." + single)
+        if imported_module is None:
+            LOGGER.warning(f"Plugin '{single}' was not loaded, skipping its help")
+            continue
         if not hasattr(imported_module, "__PLUGIN__"):
             continue
 
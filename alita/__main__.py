@@ -16,46 +16,54 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from asyncio import get_event_loop
 from time import time
 
-from ineruki import LOGGER
+from ineruki import BOOT_START, LOGGER
 from ineruki.bot_class import Ineruki
+
+# DB classes register their schemas and indexes when imported
+from ineruki.database import (  # noqa: F401
+    approve_db,
+    blacklist_db,
+    chats_db,
+    greetings_db,
+    notes_db,
+    pins_db,
+    reporting_db,
+    rules_db,
+    users_db,
+    warns_db,
+)
 from ineruki.database.antispam_db import __pre_req_antispam_users
-from ineruki.database.approve_db import __pre_req_approve
-from ineruki.database.blacklist_db import __pre_req_blacklists
-from ineruki.database.chats_db import __pre_req_chats
 from ineruki.database.filters_db import __pre_req_filters
-from ineruki.database.greetings_db import __pre_req_greetings
 from ineruki.database.group_blacklist import __pre_req_group_blacklist
-from ineruki.database.lang_db import __load_lang_cache, __pre_req_all_langs
-from ineruki.database.pins_db import __pre_req_pins_chats
-from ineruki.database.reporting_db import __pre_req_all_reporting_settings
-from ineruki.database.rules_db import __pre_req_all_rules
-from ineruki.database.users_db import __pre_req_users
-from ineruki.database.warns_db import __pre_req_warns
+from ineruki.database.indexes import __pre_req_indexes
+from ineruki.database.lang_db import __load_lang_cache
+from ineruki.database.migrations import __pre_req_migrations
+from ineruki.utils.startup_profiler import record_phase, startup_phase
 
 
-def pre_req_all():
+async def pre_req_all():
     # Load local cache dictionaries
     start = time()
     LOGGER.info("Starting to load Local Caches!")
-    __load_lang_cache()
-    __pre_req_all_langs()
-    __pre_req_greetings()
-    __pre_req_blacklists()
-    __pre_req_chats()
-    __pre_req_antispam_users()
-    __pre_req_users()
-    __pre_req_filters()
-    __pre_req_all_rules()
-    __pre_req_approve()
-    __pre_req_warns()
-    __pre_req_pins_chats()
-    __pre_req_all_reporting_settings()
-    __pre_req_group_blacklist()
+    with startup_phase("Schema repairs"):
+        await __pre_req_migrations()
+    with startup_phase("Indexes"):
+        await __pre_req_indexes()
+    with startup_phase("Language cache"):
+        await __load_lang_cache()
+    with startup_phase("Gban cache"):
+        await __pre_req_antispam_users()
+    with startup_phase("Filters cache"):
+        await __pre_req_filters()
+    with startup_phase("Chat blacklist cache"):
+        await __pre_req_group_blacklist()
     LOGGER.info(f"Successfully loaded Local Caches in {round((time() - start), 3)}s\n")
 
 
 if __name__ == "__main__":
-    pre_req_all()
+    record_phase("Imports", BOOT_START)
+    get_event_loop().run_until_complete(pre_req_all())
     Ineruki().run()
@@ -44,9 +44,12 @@ from ineruki import (
     load_cmds,
 )
 from ineruki.database import MongoDB
+from ineruki.database.cache_bus import start_bus, stop_bus
+from ineruki.database.write_behind import start_writer, stop_writer
 from ineruki.plugins import all_plugins
 from ineruki.tr_engine import lang_dict
 from ineruki.utils.paste import paste
+from ineruki.utils.startup_profiler import startup_phase, startup_report
 
 INITIAL_LOCK = RLock()
 
@@ -72,14 +75,20 @@ class Ineruki(Client):
             workers=WORKERS,
         )
 
+    def load_plugins(self):
+        """Import the plugins, timed apart from connecting the client."""
+        with startup_phase("Plugin imports"):
+            super().load_plugins()
+
     async def start(self):
         """Start the bot."""
-        await super().start()
+        with startup_phase("Client connect"):
+            await super().start()
 
-        meh = await get_self(self)  # Get bot info from pyrogram client
-        LOGGER.info("Starting bot...")
+            meh = await get_self(self)  # Get bot info from pyrogram client
+            LOGGER.info("Starting bot...")
 
-        startmsg = await self.send_message(MESSAGE_DUMP, "<i>Starting Bot...</i>")
+            startmsg = await self.send_message(MESSAGE_DUMP, "<i>Starting Bot...</i>")
 
         # Load Languages
         lang_status = len(lang_dict) >= 1
@@ -92,10 +101,19 @@ class Ineruki(Client):
         LOGGER.info(f"Python Version: {python_version()}\n")
 
         # Get cmds and keys
-        cmd_list = await load_cmds(await all_plugins())
+        with startup_phase("Plugin metadata"):
+            cmd_list = await load_cmds(await all_plugins())
 
         LOGGER.info(f"Plugins Loaded: {cmd_list}")
 
+        with startup_phase("Background tasks"):
+            # Start writing buffered user/chat updates in bulk
+            start_writer()
+            # Receive cache invalidations from other instances
+            start_bus()
+
+        LOGGER.info(f"Startup phases:\n{startup_report(html=False)}\n")
+
         # Send a message to MESSAGE_DUMP telling that the
         # bot has started and has loaded all plugins!
         await startmsg.edit_text(
@@ -104,6 +122,8 @@ class Ineruki(Client):
                 f"\n<b>Python:</b> <u>{python_version()}</u>\n"
                 "\n<b>Loaded Plugins:</b>\n"
                 f"<i>{cmd_list}</i>\n"
+                "\n<b>Startup:</b>\n"
+                f"{startup_report()}\n"
             ),
         )
 
@@ -136,6 +156,8 @@ class Ineruki(Client):
                 caption=f"Uptime: {runtime}\n[NekoBin]({neko})\n[Raw]({raw})",
             )
         await super().stop()
+        await stop_writer()  # Flush pending user/chat updates
+        await stop_bus()
         MongoDB.close()
         LOGGER.info(
             f"""Bot Stopped.
@@ -16,73 +16,294 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 
-from ineruki import DB_NAME, DB_URI, LOGGER
+from ineruki import (
+    DB_BACKEND,
+    DB_LATENCY_MS,
+    DB_MAX_POOL_SIZE,
+    DB_MIN_POOL_SIZE,
+    DB_NAME,
+    DB_TIMEOUT,
+    DB_URI,
+    LOGGER,
+)
+from ineruki.database.cache_bus import publish
+from ineruki.database.monitoring import (
+    CommandLatencyListener,
+    PoolListener,
+    log_slow,
+)
+from ineruki.database.settings_cache import drop_settings, get_settings, put_settings
 
-ineruki_db_client = MongoClient(DB_URI)
+
+def __get_client():
+    """Create the database client for the configured DB_BACKEND."""
+    if DB_BACKEND == "memory":
+        from ineruki.database.memory_backend import MemoryClient
+
+        return MemoryClient(DB_LATENCY_MS)
+    if DB_BACKEND == "sqlite":
+        from ineruki.database.sqlite_backend import SQLiteClient
+
+        path = (DB_URI or "ineruki/ineruki.sqlite3").replace("sqlite:///", "", 1)
+        return SQLiteClient(path, DB_LATENCY_MS)
+    return AsyncIOMotorClient(
+        DB_URI,
+        maxPoolSize=DB_MAX_POOL_SIZE,
+        minPoolSize=DB_MIN_POOL_SIZE,
+        connectTimeoutMS=DB_TIMEOUT * 1000,
+        serverSelectionTimeoutMS=DB_TIMEOUT * 1000,
+        waitQueueTimeoutMS=DB_TIMEOUT * 1000,
+        socketTimeoutMS=DB_TIMEOUT * 3000,
+        event_listeners=[CommandLatencyListener(), PoolListener()],
+    )
+
+
+ineruki_db_client = __get_client()
 ineruki_main_db = ineruki_db_client[DB_NAME]
 
+# Indexes declared by DB classes, keyed by collection name
+INDEX_REGISTRY = {}
+# DB classes declaring a document schema, keyed by collection name
+SCHEMA_REGISTRY = {}
+# DB classes holding chat scoped documents, keyed by collection name
+CHAT_REGISTRY = {}
+
 
 class MongoDB:
     """Class for interacting with Bot database."""
 
+    # Indexes used by queries of a DB class, created at startup
+    indexes = []
+    # Keep per-chat documents of this collection in the settings cache
+    cache_settings = False
+    # Fields every document must have, bump schema_version when changed
+    schema_version = 0
+    schema_defaults = {}
+    # Fields set when a document is first created, always schema_defaults
+    defaults = schema_defaults
+    # Field holding the chat id of documents, rewritten when a chat migrates
+    chat_field = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.defaults = cls.schema_defaults
+        if cls.indexes:
+            INDEX_REGISTRY.setdefault(cls.db_name, []).extend(cls.indexes)
+        if cls.schema_defaults:
+            SCHEMA_REGISTRY[cls.db_name] = cls
+        if cls.chat_field:
+            CHAT_REGISTRY[cls.db_name] = cls
+
     def __init__(self, collection) -> None:
         self.collection = ineruki_main_db[collection]
+        self.collection_name = collection
+
+    # Return the _id a write touches if its document may be cached
+    def __cached_id(self, query):
+        if not (self.cache_settings and query) or len(query) != 1:
+            return None
+        _id = query.get("_id")
+        if _id is None or isinstance(_id, dict):
+            return None
+        return _id
+
+    # Drop cached settings documents, here and in other instances
+    def __drop_settings(self, _id=None):
+        drop_settings(self.collection_name, _id)
+        publish("settings", [self.collection_name, _id])
+
+    # Get settings document from cache, database or create it from defaults
+    async def get_settings_doc(self, _id, defaults):
+        data = get_settings(self.collection_name, _id)
+        if data is not None:
+            return data
+        data = await self.find_one({"_id": _id})
+        if not data:
+            data = await self.upsert({"_id": _id}, {}, defaults)
+            LOGGER.info(f"Initialized {self.collection_name} Document for {_id}")
+        return put_settings(self.collection_name, _id, data)
 
     # Insert one entry into collection
-    def insert_one(self, document):
-        result = self.collection.insert_one(document)
+    @log_slow
+    async def insert_one(self, document):
+        result = await self.collection.insert_one(document)
+        if self.__cached_id(document) is not None:
+            self.__drop_settings(result.inserted_id)
         return repr(result.inserted_id)
 
     # Find one entry from collection
-    def find_one(self, query):
-        result = self.collection.find_one(query)
+    @log_slow
+    async def find_one(self, query):
+        result = await self.collection.find_one(query)
         if result:
             return result
         return False
 
     # Find entries from collection
-    def find_all(self, query=None):
+    @log_slow
+    async def find_all(self, query=None):
         if query is None:
             query = {}
-        return [document for document in self.collection.find(query)]
+        return await self.collection.find(query).to_list(length=None)
+
+    # Iterate over entries from collection without loading all of them
+    async def find_iter(self, query=None, projection=None, skip=0, limit=0):
+        if query is None:
+            query = {}
+        cursor = self.collection.find(query, projection, skip=skip, limit=limit)
+        async for document in cursor:
+            yield document
 
     # Count entries from collection
-    def count(self, query=None):
+    @log_slow
+    async def count(self, query=None):
         if query is None:
             query = {}
-        return self.collection.count_documents(query)
+        return await self.collection.count_documents(query)
+
+    # Delete one entry from collection
+    @log_slow
+    async def delete_one(self, query):
+        result = await self.collection.delete_one(query)
+        _id = self.__cached_id(query)
+        if _id is not None:
+            self.__drop_settings(_id)
+        return result.deleted_count
 
-    # Delete entry/entries from collection
-    def delete_one(self, query):
-        self.collection.delete_many(query)
-        return self.collection.count_documents({})
+    # Delete all matching entries from collection
+    @log_slow
+    async def delete_many(self, query):
+        result = await self.collection.delete_many(query)
+        if self.cache_settings:
+            self.__drop_settings()
+        return result.deleted_count
+
+    # Delete one entry and return it
+    @log_slow
+    async def find_one_and_delete(self, query):
+        result = await self.collection.find_one_and_delete(query)
+        if result and self.cache_settings:
+            self.__drop_settings(result["_id"])
+        return result
 
     # Replace one entry in collection
-    def replace(self, query, new_data):
-        old = self.collection.find_one(query)
-        _id = old["_id"]
-        self.collection.replace_one({"_id": _id}, new_data)
-        new = self.collection.find_one({"_id": _id})
-        return old, new
+    @log_slow
+    async def replace(self, query, new_data):
+        old = await self.collection.find_one_and_replace(query, new_data)
+        if old:
+            new_data = {"_id": old["_id"], **new_data}
+            if self.cache_settings:
+                put_settings(self.collection_name, old["_id"], new_data)
+                publish("settings", [self.collection_name, old["_id"]])
+        return old, new_data
+
+    # Insert document unless an entry matching query already exists
+    @log_slow
+    async def insert_if_absent(self, query, document):
+        result = await self.collection.update_one(
+            query,
+            {"$setOnInsert": document},
+            upsert=True,
+        )
+        if result.upserted_id is None:
+            return False
+        return repr(result.upserted_id)
+
+    # Apply update operators to one entry and return the updated document.
+    # If defaults are given, a missing entry is created from them.
+    @log_slow
+    async def find_one_and_update(self, query, update, defaults=None):
+        if defaults is not None:
+            touched = {key for fields in update.values() for key in fields}
+            on_insert = {k: v for k, v in defaults.items() if k not in touched}
+            if on_insert:
+                update = {**update, "$setOnInsert": on_insert}
+        result = await self.collection.find_one_and_update(
+            query,
+            update,
+            upsert=defaults is not None,
+            return_document=ReturnDocument.AFTER,
+        )
+        _id = self.__cached_id(query)
+        if _id is not None:
+            put_settings(self.collection_name, _id, result)
+            publish("settings", [self.collection_name, _id])
+        return result
 
     # Update one entry from collection
-    def update(self, query, update):
-        result = self.collection.update_one(query, {"$set": update})
-        new_document = self.collection.find_one(query)
-        return result.modified_count, new_document
+    async def update(self, query, update):
+        return await self.find_one_and_update(query, {"$set": update})
+
+    # Update all matching entries from collection
+    @log_slow
+    async def update_many(self, query, update):
+        result = await self.collection.update_many(query, update)
+        if self.cache_settings:
+            self.__drop_settings()
+        return result.modified_count
+
+    # Update one entry, creating it from defaults if it does not exist
+    async def upsert(self, query, update, defaults=None):
+        return await self.find_one_and_update(
+            query,
+            {"$set": update} if update else {},
+            defaults or {},
+        )
+
+    async def push(self, query, update, defaults=None):
+        return await self.find_one_and_update(query, {"$push": update}, defaults)
+
+    async def pull(self, query, update):
+        return await self.find_one_and_update(query, {"$pull": update})
+
+    async def add_to_set(self, query, update, defaults=None):
+        return await self.find_one_and_update(query, {"$addToSet": update}, defaults)
+
+    async def inc(self, query, update, defaults=None):
+        return await self.find_one_and_update(query, {"$inc": update}, defaults)
+
+    # Run a batch of write operations in one round trip
+    @log_slow
+    async def bulk_write(self, requests, ordered=False):
+        if not requests:
+            return None
+        return await self.collection.bulk_write(requests, ordered=ordered)
+
+    # Run an aggregation pipeline on collection
+    @log_slow
+    async def aggregate(self, pipeline):
+        return await self.collection.aggregate(pipeline).to_list(length=None)
+
+    # Run a pipeline whose single output document holds a "count" field
+    async def aggregate_count(self, pipeline):
+        result = await self.aggregate(pipeline)
+        return result[0]["count"] if result else 0
+
+    # Create indexes, existing indexes with same spec are left untouched
+    async def create_indexes(self, indexes):
+        return await self.collection.create_indexes(indexes)
+
+    async def index_information(self):
+        return await self.collection.index_information()
+
+    async def drop_index(self, name):
+        return await self.collection.drop_index(name)
 
-    def db_command(self, command):
-        return self._db.command(command)
+    @staticmethod
+    async def db_command(command):
+        return await ineruki_main_db.command(command)
 
-    def close(self):
-        return self._client.close()
+    @staticmethod
+    def close():
+        return ineruki_db_client.close()
 
 
 def __connect_first():
     _ = MongoDB("test")
-    LOGGER.info("Initialized Database!\n")
+    LOGGER.info(f"Initialized Database! (backend: {DB_BACKEND})\n")
 
 
 __connect_first()
@@ -23,10 +23,14 @@ from traceback import format_exc
 
 from ineruki import LOGGER
 from ineruki.database import MongoDB
+from ineruki.database.cache_bus import on_invalidate, publish
+from ineruki.database.users_db import Users
+from ineruki.utils.id_set import IDSet
 
 INSERTION_LOCK = RLock()
 
-ANTISPAM_BANNED = set()
+# Ids of all gbanned users, kept in sync with database while running
+ANTISPAM_BANNED = IDSet()
 
 
 class GBan(MongoDB):
@@ -37,84 +41,112 @@ class GBan(MongoDB):
     def __init__(self) -> None:
         super().__init__(self.db_name)
 
-    def check_gban(self, user_id: int):
-        with INSERTION_LOCK:
-            return (
-                True
-                if user_id in ANTISPAM_BANNED
-                else bool(self.find_one({"_id": user_id}))
-            )
+    @staticmethod
+    def is_gbanned(user_id: int):
+        """Check gban status from local cache without touching database."""
+        return user_id in ANTISPAM_BANNED
 
-    def add_gban(self, user_id: int, reason: str, by_user: int):
-        global ANTISPAM_BANNED
-        with INSERTION_LOCK:
-            # Check if  user is already gbanned or not
-            if self.find_one({"_id": user_id}):
-                return self.update_gban_reason(user_id, reason)
+    async def check_gban(self, user_id: int):
+        return self.is_gbanned(user_id)
 
-            # If not already gbanned, then add to gban
-            time_rn = datetime.now()
+    async def add_gban(self, user_id: int, reason: str, by_user: int):
+        with INSERTION_LOCK:
+            # Update reason if already gbanned, else add to gban
             ANTISPAM_BANNED.add(user_id)
-            return self.insert_one(
-                {
-                    "_id": user_id,
-                    "reason": reason,
-                    "by": by_user,
-                    "time": time_rn,
-                },
+            result = await self.upsert(
+                {"_id": user_id},
+                {"reason": reason},
+                {"by": by_user, "time": datetime.now()},
             )
+            publish("gbans", user_id, True)
+            return result
 
-    def remove_gban(self, user_id: int):
-        global ANTISPAM_BANNED
+    async def remove_gban(self, user_id: int):
         with INSERTION_LOCK:
-            # Check if  user is already gbanned or not
-            if self.find_one({"_id": user_id}):
-                ANTISPAM_BANNED.remove(user_id)
-                return self.delete_one({"_id": user_id})
+            ANTISPAM_BANNED.discard(user_id)
+            publish("gbans", user_id, False)
+            if await self.delete_one({"_id": user_id}):
+                return True
 
             return "User not gbanned!"
 
-    def get_gban(self, user_id: int):
-        if self.check_gban(user_id):
-            curr = self.find_one({"_id": user_id})
-            if curr:
-                return True, curr["reason"]
+    async def get_gban(self, user_id: int):
+        curr = await self.find_one({"_id": user_id})
+        if curr:
+            return True, curr["reason"]
         return False, ""
 
-    def update_gban_reason(self, user_id: int, reason: str):
+    async def update_gban_reason(self, user_id: int, reason: str):
         with INSERTION_LOCK:
-            return self.update(
+            return await self.update(
                 {"_id": user_id},
                 {"reason": reason},
             )
 
-    def count_gbans(self):
+    async def count_gbans(self):
         with INSERTION_LOCK:
             try:
                 return len(ANTISPAM_BANNED)
             except Exception as ef:
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
-                return self.count()
+                return await self.count()
 
-    def load_from_db(self):
+    async def load_from_db(self):
         with INSERTION_LOCK:
-            return self.find_all()
+            return await self.find_all()
+
+    async def iter_gbans(self, batch_size: int = 1000):
+        """Yield batches of (user_id, name, reason) without loading all gbans."""
+        batch = []
+        async for gban in self.find_iter(projection={"reason": True}):
+            batch.append(gban)
+            if len(batch) >= batch_size:
+                yield await self.__with_names(batch)
+                batch = []
+        if batch:
+            yield await self.__with_names(batch)
+
+    # Resolve names of a batch of gbanned users with one query
+    @staticmethod
+    async def __with_names(batch: list):
+        users = MongoDB(Users.db_name)
+        names = {
+            i["_id"]: i.get("name")
+            async for i in users.find_iter(
+                {"_id": {"$in": [gban["_id"] for gban in batch]}},
+                {"name": True},
+            )
+        }
+        return [
+            (gban["_id"], names.get(gban["_id"]) or gban["_id"], gban.get("reason"))
+            for gban in batch
+        ]
 
-    def list_gbans(self):
+    async def list_gbans(self):
         with INSERTION_LOCK:
             try:
                 return list(ANTISPAM_BANNED)
             except Exception as ef:
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
-            return self.find_all()
+            return await self.find_all()
+
+
+@on_invalidate("gbans")
+def __update_gban(user_id, banned):
+    with INSERTION_LOCK:
+        if banned:
+            ANTISPAM_BANNED.add(user_id)
+        else:
+            ANTISPAM_BANNED.discard(user_id)
 
 
-def __pre_req_antispam_users():
-    global ANTISPAM_BANNED
+async def __pre_req_antispam_users():
     start = time()
     db = GBan()
-    users = db.load_from_db()
-    ANTISPAM_BANNED = {i["_id"] for i in users}
+    # Loaded in place, filters built at import hold a reference to the set
+    ANTISPAM_BANNED.load(
+        [i["_id"] async for i in db.find_iter(projection={"_id": True})],
+    )
     LOGGER.info(f"Loaded AntispamBanned Cache - {round((time() - start), 3)}s")
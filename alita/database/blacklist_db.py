@@ -16,151 +16,160 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from cachetools import LRUCache
+from pymongo import ASCENDING, IndexModel
 from threading import RLock
-from time import time
 
-from ineruki import LOGGER
 from ineruki.database import MongoDB
+from ineruki.utils.keyword_matcher import KeywordMatcher
 
 INSERTION_LOCK = RLock()
 
+# Compiled trigger matchers keyed by chat id, with the triggers list they
+# were built from, a changed list is a new object so it gets rebuilt
+BL_MATCHERS = LRUCache(maxsize=10000)
+
 
 class Blacklist(MongoDB):
     """Class to manage database for blacklists for chats."""
 
     # Database name to connect to to preform operations
     db_name = "blacklists"
+    chat_field = "_id"
+    cache_settings = True
+    schema_version = 1
+    schema_defaults = {
+        "triggers": [],
+        "action": "none",
+        "reason": "Automated blacklisted word: {{}}",
+    }
+    indexes = [IndexModel([("action", ASCENDING)], name="action")]
 
     def __init__(self, chat_id: int) -> None:
         super().__init__(self.db_name)
         self.chat_id = chat_id
-        self.chat_info = self.__ensure_in_db()
+        self.chat_info = None
 
-    def check_word_blacklist_status(self, word: str):
+    async def check_word_blacklist_status(self, word: str):
         with INSERTION_LOCK:
-            bl_words = self.chat_info["triggers"]
+            bl_words = (await self.__ensure_in_db())["triggers"]
             return bool(word in bl_words)
 
-    def add_blacklist(self, trigger: str):
+    async def add_blacklist(self, trigger: str):
         with INSERTION_LOCK:
-            if not self.check_word_blacklist_status(trigger):
-                return self.update(
-                    {"_id": self.chat_id},
-                    {
-                        "_id": self.chat_id,
-                        "triggers": self.chat_info["triggers"] + [trigger],
-                    },
-                )
+            self.chat_info = await self.add_to_set(
+                {"_id": self.chat_id},
+                {"triggers": trigger},
+                self.defaults,
+            )
+            BL_MATCHERS.pop(self.chat_id, None)
+            return self.chat_info
 
-    def remove_blacklist(self, trigger: str):
+    async def remove_blacklist(self, trigger: str):
         with INSERTION_LOCK:
-            if self.check_word_blacklist_status(trigger):
-                self.chat_info["triggers"].remove(trigger)
-                return self.update(
-                    {"_id": self.chat_id},
-                    {
-                        "_id": self.chat_id,
-                        "triggers": self.chat_info["triggers"],
-                    },
-                )
+            self.chat_info = await self.pull(
+                {"_id": self.chat_id},
+                {"triggers": trigger},
+            )
+            BL_MATCHERS.pop(self.chat_id, None)
+            return self.chat_info
 
-    def get_blacklists(self):
+    async def get_blacklists(self):
         with INSERTION_LOCK:
-            return self.chat_info["triggers"]
+            return (await self.__ensure_in_db())["triggers"]
+
+    async def get_matcher(self):
+        """Matcher finding the first blacklisted trigger in a text."""
+        triggers = await self.get_blacklists()
+        try:
+            built_from, matcher = BL_MATCHERS[self.chat_id]
+            if built_from is triggers:
+                return matcher
+        except KeyError:
+            pass
+        matcher = KeywordMatcher(triggers)
+        BL_MATCHERS[self.chat_id] = (triggers, matcher)
+        return matcher
 
     @staticmethod
-    def count_blacklists_all():
+    async def count_blacklists_all():
         with INSERTION_LOCK:
             collection = MongoDB(Blacklist.db_name)
-            curr = collection.find_all()
-            return sum(len(chat["triggers"]) for chat in curr)
+            return await collection.aggregate_count(
+                [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "count": {"$sum": {"$size": "$triggers"}},
+                        },
+                    },
+                ],
+            )
 
     @staticmethod
-    def count_blackists_chats():
+    async def count_blackists_chats():
         with INSERTION_LOCK:
             collection = MongoDB(Blacklist.db_name)
-            curr = collection.find_all()
-            return sum(1 for chat in curr if chat["triggers"])
+            return await collection.count({"triggers.0": {"$exists": True}})
 
-    def set_action(self, action: str):
+    async def set_action(self, action: str):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
-                {"_id": self.chat_id, "action": action},
+                {"action": action},
+                self.defaults,
             )
+            return self.chat_info
 
-    def get_action(self):
+    async def get_action(self):
         with INSERTION_LOCK:
-            return self.chat_info["action"]
+            return (await self.__ensure_in_db())["action"]
 
-    def set_reason(self, reason: str):
+    async def set_reason(self, reason: str):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
-                {"_id": self.chat_id, "reason": reason},
+                {"reason": reason},
+                self.defaults,
             )
+            return self.chat_info
 
-    def get_reason(self):
+    async def get_reason(self):
+        with INSERTION_LOCK:
+            return (await self.__ensure_in_db())["reason"]
+
+    @staticmethod
+    async def count_action_bl_all(action: str):
         with INSERTION_LOCK:
-            return self.chat_info["reason"]
+            collection = MongoDB(Blacklist.db_name)
+            return await collection.count(
+                {"action": action, "triggers.0": {"$exists": True}},
+            )
 
     @staticmethod
-    def count_action_bl_all(action: str):
+    async def count_action_bl_chats():
+        """Number of chats with blacklists, grouped by action."""
         with INSERTION_LOCK:
             collection = MongoDB(Blacklist.db_name)
-            all_data = collection.find_all({"action": action})
-            return sum(len(i["triggers"]) >= 1 for i in all_data)
+            curr = await collection.aggregate(
+                [
+                    {"$match": {"triggers.0": {"$exists": True}}},
+                    {"$group": {"_id": "$action", "count": {"$sum": 1}}},
+                ],
+            )
+            return {i["_id"]: i["count"] for i in curr}
 
-    def rm_all_blacklist(self):
+    async def rm_all_blacklist(self):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"triggers": []},
+                self.defaults,
             )
+            BL_MATCHERS.pop(self.chat_id, None)
+            return self.chat_info
 
-    def __ensure_in_db(self):
-        chat_data = self.find_one({"_id": self.chat_id})
-        if not chat_data:
-            new_data = new_data = {
-                "_id": self.chat_id,
-                "triggers": [],
-                "action": "none",
-                "reason": "Automated blacklisted word: {{}}",
-            }
-            self.insert_one(new_data)
-            LOGGER.info(f"Initialized Blacklist Document for chat {self.chat_id}")
-            return new_data
-        return chat_data
-
-    # Migrate if chat id changes!
-    def migrate_chat(self, new_chat_id: int):
-        old_chat_db = self.find_one({"_id": self.chat_id})
-        new_data = old_chat_db.update({"_id": new_chat_id})
-        self.insert_one(new_data)
-        self.delete_one({"_id": self.chat_id})
-
-    @staticmethod
-    def repair_db(collection):
-        all_data = collection.find_all()
-        keys = {
-            "triggers": [],
-            "action": "none",
-            "reason": "Automated blacklisted word: {{}}",
-        }
-        for data in all_data:
-            for key, val in keys.items():
-                try:
-                    _ = data[key]
-                except KeyError:
-                    LOGGER.warning(
-                        f"Repairing Blacklist Database - setting '{key}:{val}' for {data['_id']}",
-                    )
-                    collection.update({"_id": data["_id"]}, {key: val})
-
-
-def __pre_req_blacklists():
-    start = time()
-    LOGGER.info("Starting Blacklists Database Repair...")
-    collection = MongoDB(Blacklist.db_name)
-    Blacklist.repair_db(collection)
-    LOGGER.info(f"Done in {round((time() - start), 3)}s!")
+    async def __ensure_in_db(self):
+        if self.chat_info is None:
+            self.chat_info = await self.get_settings_doc(self.chat_id, self.defaults)
+        return self.chat_info
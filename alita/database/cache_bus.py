@@ -0,0 +1,199 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Broadcast cache invalidations between bot processes sharing a database.
+
+Callers update their own process caches as before and then publish() a
+keyed event. Every other process runs the handler registered for that
+cache with on_invalidate(). CACHE_BUS selects the transport: "mongo" tails
+a capped collection, "local" delivers events back to this process as if
+another one published them (for tests, every change is then applied twice)
+and an empty value disables the bus.
+"""
+
+from asyncio import CancelledError, ensure_future, sleep
+from inspect import isawaitable
+from traceback import format_exc
+from uuid import uuid4
+
+from ineruki import CACHE_BUS, DB_BACKEND, LOGGER
+from ineruki.database.settings_cache import drop_settings
+
+# Identifies events published by this process
+INSTANCE_ID = uuid4().hex
+
+# Capped collection used as the event log, oldest events are overwritten
+BUS_COLLECTION = "cache_events"
+BUS_SIZE = 4 * 1024 * 1024
+
+# Handlers keyed by cache name, called as handler(key, value)
+HANDLERS = {}
+
+_BUS = None
+
+
+def on_invalidate(cache: str):
+    """Register the handler applying events of cache published elsewhere."""
+
+    def decorator(func):
+        HANDLERS[cache] = func
+        return func
+
+    return decorator
+
+
+def publish(cache: str, key, value=None):
+    """Tell other processes that an entry of cache changed."""
+    if _BUS is None:
+        return
+    _BUS.publish({"origin": INSTANCE_ID, "cache": cache, "key": key, "value": value})
+
+
+async def dispatch(event: dict):
+    """Apply an event from another process to the local caches."""
+    if event.get("origin") == INSTANCE_ID:
+        return
+    try:
+        handler = HANDLERS[event["cache"]]
+    except KeyError:
+        LOGGER.warning(f"No cache bus handler for '{event.get('cache')}'")
+        return
+    try:
+        result = handler(event["key"], event.get("value"))
+        if isawaitable(result):
+            await result
+    except Exception as ef:
+        LOGGER.error(ef)
+        LOGGER.error(format_exc())
+
+
+class LocalBus:
+    """In-process stand-in, delivering events back as another process would."""
+
+    def __init__(self) -> None:
+        # Events come back from the bus, so dispatch does not drop them
+        self.origin = uuid4().hex
+        self.tasks = set()
+
+    def publish(self, event: dict):
+        task = ensure_future(dispatch({**event, "origin": self.origin}))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def start(self):
+        pass
+
+    async def stop(self):
+        for task in list(self.tasks):
+            await task
+
+
+class MongoBus(LocalBus):
+    """Bus using a tailable cursor on a capped collection."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        from ineruki.database import MongoDB, ineruki_main_db
+
+        self.db = ineruki_main_db
+        self.events = MongoDB(BUS_COLLECTION)
+        self.tail_task = None
+
+    def publish(self, event: dict):
+        task = ensure_future(self.events.insert_one(event))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def __ensure_capped(self):
+        if BUS_COLLECTION not in await self.db.list_collection_names():
+            await self.db.create_collection(BUS_COLLECTION, capped=True, size=BUS_SIZE)
+
+    async def __tail(self):
+        from bson import ObjectId
+        from pymongo import CursorType
+
+        await self.__ensure_capped()
+        # Only events published after this process started are applied
+        last_id = ObjectId()
+        while True:
+            try:
+                cursor = self.events.collection.find(
+                    {"_id": {"$gt": last_id}},
+                    cursor_type=CursorType.TAILABLE_AWAIT,
+                )
+                while cursor.alive:
+                    async for event in cursor:
+                        last_id = event["_id"]
+                        await dispatch(event)
+            except CancelledError:
+                raise
+            except Exception as ef:
+                LOGGER.error(ef)
+                LOGGER.error(format_exc())
+            # Cursor dies while the collection is empty, retry shortly
+            await sleep(1)
+
+    def start(self):
+        if self.tail_task is None:
+            self.tail_task = ensure_future(self.__tail())
+
+    async def stop(self):
+        if self.tail_task is not None:
+            self.tail_task.cancel()
+            try:
+                await self.tail_task
+            except CancelledError:
+                pass
+            self.tail_task = None
+        await super().stop()
+
+
+@on_invalidate("settings")
+def __drop_settings(key, _):
+    collection, chat_id = key
+    drop_settings(collection, chat_id)
+
+
+def start_bus():
+    """Start the configured cache bus on the running loop."""
+    global _BUS
+    if _BUS is not None or not CACHE_BUS:
+        return
+    if CACHE_BUS == "mongo":
+        if DB_BACKEND != "mongo":
+            # Other backends live inside a single process, nothing to broadcast
+            LOGGER.warning(
+                f"CACHE_BUS 'mongo' needs DB_BACKEND 'mongo', not '{DB_BACKEND}'",
+            )
+            return
+        _BUS = MongoBus()
+    elif CACHE_BUS == "local":
+        LOGGER.warning("CACHE_BUS 'local' applies every change twice, for tests only")
+        _BUS = LocalBus()
+    else:
+        LOGGER.error(f"Unknown CACHE_BUS '{CACHE_BUS}', cache bus disabled")
+        return
+    _BUS.start()
+    LOGGER.info(f"Started {CACHE_BUS} cache invalidation bus as {INSTANCE_ID}")
+
+
+async def stop_bus():
+    """Stop listening for events and wait for pending publishes."""
+    global _BUS
+    if _BUS is not None:
+        await _BUS.stop()
+        _BUS = None
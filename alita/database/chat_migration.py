@@ -0,0 +1,141 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Move every chat scoped document and cache entry to a new chat id.
+
+Telegram gives a group a new id when it is upgraded to a supergroup. All
+collections in CHAT_REGISTRY are rewritten concurrently with bulk writes,
+then the process caches are moved in one step.
+"""
+
+from asyncio import gather
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from time import time
+
+from ineruki.database import CHAT_REGISTRY, MongoDB, filters_db, lang_db
+from ineruki.database.cache_bus import publish
+from ineruki.database.settings_cache import drop_settings
+
+# Documents rewritten per bulk write when they have to be moved one by one
+BATCH_SIZE = 1000
+
+
+async def __move_document(collection: MongoDB, old_chat_id: int, new_chat_id: int):
+    # _id cannot be changed, copy the document to the new id and drop the old one
+    doc = await collection.find_one({"_id": old_chat_id})
+    if not doc:
+        return 0
+    del doc["_id"]
+    await collection.bulk_write(
+        [
+            ReplaceOne({"_id": new_chat_id}, doc, upsert=True),
+            DeleteOne({"_id": old_chat_id}),
+        ],
+        ordered=True,
+    )
+    return 1
+
+
+async def __move_field(
+    collection: MongoDB,
+    field: str,
+    old_chat_id: int,
+    new_chat_id: int,
+):
+    try:
+        return await collection.update_many(
+            {field: old_chat_id},
+            {"$set": {field: new_chat_id}},
+        )
+    except (BulkWriteError, DuplicateKeyError):
+        # Some entries already exist in the new chat, e.g. members seen after
+        # the upgrade, move the others and drop the duplicates
+        pass
+    ids = [
+        i["_id"]
+        async for i in collection.find_iter({field: old_chat_id}, {"_id": True})
+    ]
+    moved = 0
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start : start + BATCH_SIZE]
+        try:
+            result = await collection.bulk_write(
+                [UpdateOne({"_id": i}, {"$set": {field: new_chat_id}}) for i in batch],
+            )
+            moved += result.modified_count
+        except BulkWriteError as ef:
+            moved += ef.details["nModified"]
+            duplicates = [batch[i["index"]] for i in ef.details["writeErrors"]]
+            await collection.delete_many({"_id": {"$in": duplicates}})
+    return moved
+
+
+def __move_caches(old_chat_id: int, new_chat_id: int):
+    # No awaits here, other handlers never see a half moved chat
+    with filters_db.INSERTION_LOCK:
+        filters = filters_db.FILTER_CACHE.pop(old_chat_id, None)
+        if filters is not None:
+            for i in filters:
+                i["chat_id"] = new_chat_id
+            filters_db.FILTER_CACHE[new_chat_id] = filters
+        filters_db.FILTER_INDEX.pop(old_chat_id, None)
+        filters_db.FILTER_INDEX.pop(new_chat_id, None)
+    with lang_db.INSERTION_LOCK:
+        lang = lang_db.LANG_CACHE.pop(old_chat_id, None)
+        if lang is not None:
+            lang_db.LANG_CACHE[new_chat_id] = lang
+    for collection_name, db_class in CHAT_REGISTRY.items():
+        if not db_class.cache_settings:
+            continue
+        for chat_id in (old_chat_id, new_chat_id):
+            drop_settings(collection_name, chat_id)
+            publish("settings", [collection_name, chat_id])
+    publish("filters", old_chat_id)
+    publish("filters", new_chat_id)
+    publish("langs", old_chat_id, None)
+    publish("langs", new_chat_id, lang)
+
+
+async def migrate_chat_data(old_chat_id: int, new_chat_id: int):
+    """Move all documents and cached entries of a chat to new_chat_id."""
+    start = time()
+    jobs = {}
+    if old_chat_id == new_chat_id:
+        # Service message sent in the new chat, already migrated
+        return {"moved": jobs, "time": 0}
+    for collection_name, db_class in CHAT_REGISTRY.items():
+        collection = MongoDB(collection_name)
+        if db_class.chat_field == "_id":
+            jobs[collection_name] = __move_document(
+                collection,
+                old_chat_id,
+                new_chat_id,
+            )
+        else:
+            jobs[collection_name] = __move_field(
+                collection,
+                db_class.chat_field,
+                old_chat_id,
+                new_chat_id,
+            )
+    results = await gather(*jobs.values())
+    __move_caches(old_chat_id, new_chat_id)
+    return {
+        "moved": {name: count for name, count in zip(jobs, results) if count},
+        "time": round((time() - start), 3),
+    }
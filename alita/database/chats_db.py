@@ -16,144 +16,172 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from pymongo import ASCENDING, IndexModel, UpdateOne
 from threading import RLock
-from time import time
 
 from ineruki import LOGGER
 from ineruki.database import MongoDB
+from ineruki.database.migrations import migration_step
 
 INSERTION_LOCK = RLock()
 
+# Number of membership upserts sent per bulk write while migrating
+MIGRATION_BATCH_SIZE = 1000
+
 
 class Chats(MongoDB):
     """Class to manage users for bot."""
 
     # Database name to connect to to preform operations
     db_name = "chats"
+    chat_field = "_id"
+    schema_version = 2
+    schema_defaults = {"chat_name": ""}
 
     def __init__(self, chat_id: int) -> None:
         super().__init__(self.db_name)
         self.chat_id = chat_id
-        self.chat_info = self.__ensure_in_db()
+        self.chat_info = None
+        self.members = ChatMembers()
 
-    def user_is_in_chat(self, user_id: int):
-        return bool(user_id in set(self.chat_info["users"]))
+    async def user_is_in_chat(self, user_id: int):
+        return await self.members.is_member(self.chat_id, user_id)
 
-    def update_chat(self, chat_name: str, user_id: int):
+    async def update_chat(self, chat_name: str, user_id: int):
         with INSERTION_LOCK:
-
-            if chat_name == self.chat_info["chat_name"] and self.user_is_in_chat(
-                    user_id,
-            ):
-                return True
-
-            if chat_name != self.chat_info["chat_name"] and self.user_is_in_chat(
-                    user_id,
-            ):
-                return self.update(
-                    {"_id": self.chat_id},
-                    {"chat_name": chat_name},
-                )
-
-            if chat_name == self.chat_info["chat_name"] and not self.user_is_in_chat(
-                    user_id,
-            ):
-                self.chat_info["users"].append(user_id)
-                return self.update(
-                    {"_id": self.chat_id},
-                    {"users": self.chat_info["users"]},
-                )
-
-            users_old = self.chat_info["users"]
-            users_old.append(user_id)
-            users = list(set(users_old))
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
-                {
-                    "_id": self.chat_id,
-                    "chat_name": chat_name,
-                    "users": users,
-                },
+                {"chat_name": chat_name},
+                self.defaults,
             )
+            await self.members.add_member(self.chat_id, user_id)
+            return self.chat_info
 
-    def count_chat_users(self):
+    async def count_chat_users(self):
         with INSERTION_LOCK:
-            return len(self.chat_info["users"]) or 0
+            return await self.members.count_members(self.chat_id)
 
-    def chat_members(self):
+    async def chat_members(self, skip: int = 0, limit: int = 0):
         with INSERTION_LOCK:
-            return self.chat_info["users"]
+            return await self.members.list_members(self.chat_id, skip, limit)
 
     @staticmethod
-    def remove_chat(chat_id: int):
+    async def remove_chat(chat_id: int):
         with INSERTION_LOCK:
             collection = MongoDB(Chats.db_name)
-            collection.delete_one({"_id": chat_id})
+            await collection.delete_one({"_id": chat_id})
+            await ChatMembers().delete_many({"chat_id": chat_id})
 
     @staticmethod
-    def count_chats():
+    async def count_chats():
         with INSERTION_LOCK:
             collection = MongoDB(Chats.db_name)
-            return collection.count() or 0
+            return await collection.count() or 0
 
     @staticmethod
-    def list_chats_by_id():
+    async def list_chats_by_id():
         with INSERTION_LOCK:
             collection = MongoDB(Chats.db_name)
-            chats = collection.find_all()
+            chats = await collection.find_all()
             chat_list = {i["_id"] for i in chats}
             return list(chat_list)
 
     @staticmethod
-    def list_chats_full():
+    async def list_chats_full():
         with INSERTION_LOCK:
             collection = MongoDB(Chats.db_name)
-            return collection.find_all()
+            return await collection.find_all()
 
     @staticmethod
-    def get_chat_info(chat_id: int):
+    async def get_chat_info(chat_id: int):
         with INSERTION_LOCK:
             collection = MongoDB(Chats.db_name)
-            return collection.find_one({"_id": chat_id})
+            return await collection.find_one({"_id": chat_id})
 
-    def load_from_db(self):
+    async def load_from_db(self):
         with INSERTION_LOCK:
-            return self.find_all()
+            return await self.find_all()
 
-    def __ensure_in_db(self):
-        chat_data = self.find_one({"_id": self.chat_id})
+    async def __ensure_in_db(self):
+        if self.chat_info is not None:
+            return self.chat_info
+        chat_data = await self.find_one({"_id": self.chat_id})
         if not chat_data:
-            new_data = {"_id": self.chat_id, "chat_name": "", "users": []}
-            self.insert_one(new_data)
+            chat_data = await self.upsert({"_id": self.chat_id}, {}, self.defaults)
             LOGGER.info(f"Initialized Chats Document for chat {self.chat_id}")
-            return new_data
+        self.chat_info = chat_data
         return chat_data
 
-    # Migrate if chat id changes!
-    def migrate_chat(self, new_chat_id: int):
-        old_chat_db = self.find_one({"_id": self.chat_id})
-        new_data = old_chat_db.update({"_id": new_chat_id})
-        self.insert_one(new_data)
-        self.delete_one({"_id": self.chat_id})
+
+class ChatMembers(MongoDB):
+    """Class to manage which users have been seen in which chats."""
+
+    db_name = "chat_members"
+    chat_field = "chat_id"
+    indexes = [
+        IndexModel(
+            [("chat_id", ASCENDING), ("user_id", ASCENDING)],
+            name="chat_id_user_id",
+            unique=True,
+        ),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ]
+
+    def __init__(self) -> None:
+        super().__init__(self.db_name)
 
     @staticmethod
-    def repair_db(collection):
-        all_data = collection.find_all()
-        keys = {"chat_name": "", "users": []}
-        for data in all_data:
-            for key, val in keys.items():
-                try:
-                    _ = data[key]
-                except KeyError:
-                    LOGGER.warning(
-                        f"Repairing Chats Database - setting '{key}:{val}' for {data['_id']}",
-                    )
-                    collection.update({"_id": data["_id"]}, {key: val})
-
-
-def __pre_req_chats():
-    start = time()
-    LOGGER.info("Starting Chats Database Repair...")
-    collection = MongoDB(Chats.db_name)
-    Chats.repair_db(collection)
-    LOGGER.info(f"Done in {round((time() - start), 3)}s!")
+    def member_op(chat_id: int, user_id: int):
+        """Upsert adding a user to a chat, for use in bulk writes."""
+        return UpdateOne(
+            {"chat_id": chat_id, "user_id": user_id},
+            {"$setOnInsert": {"chat_id": chat_id, "user_id": user_id}},
+            upsert=True,
+        )
+
+    async def add_member(self, chat_id: int, user_id: int):
+        return await self.insert_if_absent(
+            {"chat_id": chat_id, "user_id": user_id},
+            {"chat_id": chat_id, "user_id": user_id},
+        )
+
+    async def is_member(self, chat_id: int, user_id: int):
+        return bool(await self.find_one({"chat_id": chat_id, "user_id": user_id}))
+
+    async def count_members(self, chat_id: int):
+        return await self.count({"chat_id": chat_id})
+
+    async def list_members(self, chat_id: int, skip: int = 0, limit: int = 0):
+        return [
+            i["user_id"]
+            async for i in self.find_iter(
+                {"chat_id": chat_id},
+                {"_id": False, "user_id": True},
+                skip=skip,
+                limit=limit,
+            )
+        ]
+
+
+@migration_step(Chats.db_name, 2)
+async def move_users_to_chat_members():
+    """Move users arrays of chat documents into the chat_members collection."""
+    chats = MongoDB(Chats.db_name)
+    members = ChatMembers()
+    # Membership upserts below need the unique index to stay fast
+    await members.create_indexes(ChatMembers.indexes)
+    ops, moved = [], 0
+    async for chat in chats.find_iter(
+        {"users": {"$exists": True}},
+        {"users": True},
+    ):
+        for user_id in chat["users"]:
+            ops.append(ChatMembers.member_op(chat["_id"], user_id))
+        if len(ops) >= MIGRATION_BATCH_SIZE:
+            await members.bulk_write(ops)
+            moved += len(ops)
+            ops = []
+    await members.bulk_write(ops)
+    moved += len(ops)
+    await chats.update_many({"users": {"$exists": True}}, {"$unset": {"users": ""}})
+    return moved
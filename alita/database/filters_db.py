@@ -16,26 +16,39 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from pymongo import ASCENDING, IndexModel
 from threading import RLock
 from time import time
 from traceback import format_exc
 
 from ineruki import LOGGER
 from ineruki.database import MongoDB
+from ineruki.database.cache_bus import on_invalidate, publish
+from ineruki.utils.keyword_matcher import KeywordMatcher
 from ineruki.utils.msg_types import Types
 
 INSERTION_LOCK = RLock()
 
 FILTER_CACHE = {}
+# Matchers from every alias to its filter, keyed by chat id, built on first
+# use and dropped whenever filters of the chat change
+FILTER_INDEX = {}
 
 
 class Filters(MongoDB):
     db_name = "chat_filters"
+    chat_field = "chat_id"
+    indexes = [
+        IndexModel(
+            [("chat_id", ASCENDING), ("keyword", ASCENDING)],
+            name="chat_id_keyword",
+        ),
+    ]
 
     def __init__(self) -> None:
         super().__init__(self.db_name)
 
-    def save_filter(
+    async def save_filter(
             self,
             chat_id: int,
             keyword: str,
@@ -68,14 +81,11 @@ class Filters(MongoDB):
                     },
                 )
                 FILTER_CACHE[chat_id] = curr_filters
+            FILTER_INDEX.pop(chat_id, None)
 
             # Database update
-            curr = self.find_one(
+            result = await self.insert_if_absent(
                 {"chat_id": chat_id, "keyword": keyword},
-            )
-            if curr:
-                return False
-            return self.insert_one(
                 {
                     "chat_id": chat_id,
                     "keyword": keyword,
@@ -84,8 +94,10 @@ class Filters(MongoDB):
                     "fileid": fileid,
                 },
             )
+            publish("filters", chat_id)
+            return result
 
-    def get_filter(self, chat_id: int, keyword: str):
+    async def get_filter(self, chat_id: int, keyword: str):
         with INSERTION_LOCK:
             try:
                 curr = next(
@@ -101,7 +113,7 @@ class Filters(MongoDB):
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
 
-            curr = self.find_one(
+            curr = await self.find_one(
                 {"chat_id": chat_id, "keyword": {"$regex": fr"\|?{keyword}\|?"}},
             )
             if curr:
@@ -109,7 +121,21 @@ class Filters(MongoDB):
 
             return "Filter does not exist!"
 
-    def get_all_filters(self, chat_id: int):
+    async def get_matcher(self, chat_id: int):
+        """Matcher finding the filter of the first alias in a text."""
+        with INSERTION_LOCK:
+            try:
+                return FILTER_INDEX[chat_id]
+            except KeyError:
+                pass
+            aliases = {}
+            for filt in FILTER_CACHE.get(chat_id, []):
+                for alias in filt["keyword"].split("|"):
+                    aliases.setdefault(alias, filt)
+            matcher = FILTER_INDEX[chat_id] = KeywordMatcher(aliases)
+            return matcher
+
+    async def get_all_filters(self, chat_id: int):
         with INSERTION_LOCK:
             try:
                 return [i["keyword"] for i in FILTER_CACHE[chat_id]]
@@ -119,13 +145,13 @@ class Filters(MongoDB):
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
 
-            curr = self.find_all({"chat_id": chat_id})
+            curr = await self.find_all({"chat_id": chat_id})
             if curr:
                 filter_list = {i["keyword"] for i in curr}
                 return list(filter_list)
             return []
 
-    def rm_filter(self, chat_id: int, keyword: str):
+    async def rm_filter(self, chat_id: int, keyword: str):
         global FILTER_CACHE
         with INSERTION_LOCK:
             try:
@@ -141,17 +167,15 @@ class Filters(MongoDB):
             except Exception as ef:
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
+            FILTER_INDEX.pop(chat_id, None)
 
-            curr = self.find_one(
+            curr = await self.find_one_and_delete(
                 {"chat_id": chat_id, "keyword": {"$regex": fr"\|?{keyword}\|?"}},
             )
-            if curr:
-                self.delete_one(curr)
-                return True
-
-            return False
+            publish("filters", chat_id)
+            return bool(curr)
 
-    def rm_all_filters(self, chat_id: int):
+    async def rm_all_filters(self, chat_id: int):
         global FILTER_CACHE
         with INSERTION_LOCK:
             try:
@@ -161,10 +185,13 @@ class Filters(MongoDB):
             except Exception as ef:
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
+            FILTER_INDEX.pop(chat_id, None)
 
-            return self.delete_one({"chat_id": chat_id})
+            result = await self.delete_many({"chat_id": chat_id})
+            publish("filters", chat_id)
+            return result
 
-    def count_filters_all(self):
+    async def count_filters_all(self):
         with INSERTION_LOCK:
             try:
                 return len(
@@ -183,12 +210,9 @@ class Filters(MongoDB):
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
 
-            curr = self.find_all()
-            if curr:
-                return len(curr)
-            return 0
+            return await self.count()
 
-    def count_filter_aliases(self):
+    async def count_filter_aliases(self):
         with INSERTION_LOCK:
             try:
                 return len(
@@ -212,25 +236,25 @@ class Filters(MongoDB):
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
 
-            curr = self.find_all()
+            curr = await self.find_all()
             if curr:
                 return len(
                     [z for z in (i["keyword"].split("|") for i in curr) if len(z) >= 2],
                 )
             return 0
 
-    def count_filters_chats(self):
+    async def count_filters_chats(self):
         with INSERTION_LOCK:
             try:
                 return len(set(FILTER_CACHE.keys()))
             except Exception as ef:
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
-            filters = self.find_all()
-            chats_ids = {i["chat_id"] for i in filters}
-            return len(chats_ids)
+            return await self.aggregate_count(
+                [{"$group": {"_id": "$chat_id"}}, {"$count": "count"}],
+            )
 
-    def count_all_filters(self):
+    async def count_all_filters(self):
         with INSERTION_LOCK:
             try:
                 return len(
@@ -244,40 +268,35 @@ class Filters(MongoDB):
             except Exception as ef:
                 LOGGER.error(ef)
                 LOGGER.error(format_exc())
-            return self.count()
+            return await self.count()
 
-    def count_filter_type(self, ntype):
+    async def count_filter_type(self, ntype):
         with INSERTION_LOCK:
-            return self.count({"msgtype": ntype})
+            return await self.count({"msgtype": ntype})
 
-    def load_from_db(self):
+    async def load_from_db(self):
         with INSERTION_LOCK:
-            return self.find_all()
+            return await self.find_all()
 
-    # Migrate if chat id changes!
-    def migrate_chat(self, old_chat_id: int, new_chat_id: int):
-        with INSERTION_LOCK:
-            # Update locally
-            try:
-                old_db_local = FILTER_CACHE[old_chat_id]
-                del FILTER_CACHE[old_chat_id]
-                FILTER_CACHE[new_chat_id] = old_db_local
-            except KeyError:
-                pass
 
-            # Update in db
-            old_chat_db = self.find_one({"_id": old_chat_id})
-            if old_chat_db:
-                new_data = old_chat_db.update({"_id": new_chat_id})
-                self.delete_one({"_id": old_chat_id})
-                self.insert_one(new_data)
+@on_invalidate("filters")
+async def __reload_chat_filters(chat_id, _):
+    curr = await Filters().find_all({"chat_id": chat_id})
+    with INSERTION_LOCK:
+        FILTER_INDEX.pop(chat_id, None)
+        if not curr:
+            FILTER_CACHE.pop(chat_id, None)
+            return
+        for i in curr:
+            del i["_id"]
+        FILTER_CACHE[chat_id] = curr
 
 
-def __pre_req_filters():
+async def __pre_req_filters():
     global FILTER_CACHE
     start = time()
     db = Filters()
-    all_filters = db.load_from_db()
+    all_filters = await db.load_from_db()
 
     chat_ids = {i["chat_id"] for i in all_filters}
 
@@ -288,4 +307,5 @@ def __pre_req_filters():
         chat: [filt for filt in all_filters if filt["chat_id"] == chat]
         for chat in chat_ids
     }
+    FILTER_INDEX.clear()
     LOGGER.info(f"Loaded Filters Cache - {round((time() - start), 3)}s")
@@ -17,9 +17,7 @@
 
 
 from threading import RLock
-from time import time
 
-from ineruki import LOGGER
 from ineruki.database import MongoDB
 
 INSERTION_LOCK = RLock()
@@ -30,116 +28,104 @@ class Greetings(MongoDB):
 
     # Database name to connect to to preform operations
     db_name = "welcome_chats"
+    chat_field = "_id"
+    cache_settings = True
+    schema_version = 1
+    schema_defaults = {
+        "cleanwelcome": False,
+        "cleanservice": False,
+        "goodbye_text": "Sad to see you leave {first}.\nTake Care!",
+        "welcome_text": "Hey {first}, welcome to {group}!",
+        "welcome": True,
+        "goodbye": True,
+    }
 
     def __init__(self, chat_id: int) -> None:
         super().__init__(self.db_name)
         self.chat_id = chat_id
-        self.chat_info = self.__ensure_in_db()
+        self.chat_info = None
 
     # Get settings from database
-    def get_welcome_status(self):
+    async def get_welcome_status(self):
         with INSERTION_LOCK:
-            return self.chat_info["welcome"]
+            return (await self.__ensure_in_db())["welcome"]
 
-    def get_goodbye_status(self):
+    async def get_goodbye_status(self):
         with INSERTION_LOCK:
-            return self.chat_info["goodbye"]
+            return (await self.__ensure_in_db())["goodbye"]
 
-    def get_current_cleanservice_settings(self):
+    async def get_current_cleanservice_settings(self):
         with INSERTION_LOCK:
-            return self.chat_info["cleanservice"]
+            return (await self.__ensure_in_db())["cleanservice"]
 
-    def get_current_cleanwelcome_settings(self):
+    async def get_current_cleanwelcome_settings(self):
         with INSERTION_LOCK:
-            return self.chat_info["cleanwelcome"]
+            return (await self.__ensure_in_db())["cleanwelcome"]
 
-    def get_welcome_text(self):
+    async def get_welcome_text(self):
         with INSERTION_LOCK:
-            return self.chat_info["welcome_text"]
+            return (await self.__ensure_in_db())["welcome_text"]
 
-    def get_goodbye_text(self):
+    async def get_goodbye_text(self):
         with INSERTION_LOCK:
-            return self.chat_info["goodbye_text"]
+            return (await self.__ensure_in_db())["goodbye_text"]
 
     # Set settings in database
-    def set_current_welcome_settings(self, status: bool):
+    async def set_current_welcome_settings(self, status: bool):
         with INSERTION_LOCK:
-            return self.update({"_id": self.chat_id}, {"welcome": status})
+            self.chat_info = await self.upsert(
+                {"_id": self.chat_id},
+                {"welcome": status},
+                self.defaults,
+            )
+            return self.chat_info
 
-    def set_current_goodbye_settings(self, status: bool):
+    async def set_current_goodbye_settings(self, status: bool):
         with INSERTION_LOCK:
-            return self.update({"_id": self.chat_id}, {"goodbye": status})
+            self.chat_info = await self.upsert(
+                {"_id": self.chat_id},
+                {"goodbye": status},
+                self.defaults,
+            )
+            return self.chat_info
 
-    def set_welcome_text(self, welcome_text: str):
+    async def set_welcome_text(self, welcome_text: str):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"welcome_text": welcome_text},
+                self.defaults,
             )
+            return self.chat_info
 
-    def set_goodbye_text(self, goodbye_text: str):
+    async def set_goodbye_text(self, goodbye_text: str):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"goodbye_text": goodbye_text},
+                self.defaults,
             )
+            return self.chat_info
 
-    def set_current_cleanservice_settings(self, status: bool):
+    async def set_current_cleanservice_settings(self, status: bool):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"cleanservice": status},
+                self.defaults,
             )
+            return self.chat_info
 
-    def set_current_cleanwelcome_settings(self, status: bool):
+    async def set_current_cleanwelcome_settings(self, status: bool):
         with INSERTION_LOCK:
-            return self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"cleanwelcome": status},
+                self.defaults,
             )
+            return self.chat_info
 
-    def __ensure_in_db(self):
-        chat_data = self.find_one({"_id": self.chat_id})
-        if not chat_data:
-            new_data = {
-                "_id": self.chat_id,
-                "cleanwelcome": False,
-                "cleanservice": False,
-                "goodbye_text": "Sad to see you leave {first}.\nTake Care!",
-                "welcome_text": "Hey {first}, welcome to {group}!",
-                "welcome": True,
-                "goodbye": True,
-            }
-            self.insert_one(new_data)
-            LOGGER.info(f"Initialized Greetings Document for chat {self.chat_id}")
-            return new_data
-        return chat_data
-
-    @staticmethod
-    def repair_db(collection):
-        all_data = collection.find_all()
-        keys = {
-            "cleanwelcome": False,
-            "cleanservice": False,
-            "goodbye_text": "Sad to see you leave {first}.\nTake Care!",
-            "welcome_text": "Hey {first}, welcome to {group}!",
-            "welcome": True,
-            "goodbye": True,
-        }
-        for data in all_data:
-            for key, val in keys.items():
-                try:
-                    _ = data[key]
-                except KeyError:
-                    LOGGER.warning(
-                        f"Repairing Greeting Database - setting '{key}:{val}' for {data['_id']}",
-                    )
-                    collection.update({"_id": data["_id"]}, {key: val})
-
-
-def __pre_req_greetings():
-    start = time()
-    LOGGER.info("Starting Geeetings Database Repair...")
-    collection = MongoDB(Greetings.db_name)
-    Greetings.repair_db(collection)
-    LOGGER.info(f"Done in {round((time() - start), 3)}s!")
+    async def __ensure_in_db(self):
+        if self.chat_info is None:
+            self.chat_info = await self.get_settings_doc(self.chat_id, self.defaults)
+        return self.chat_info
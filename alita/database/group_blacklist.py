@@ -21,11 +21,13 @@ from time import time
 
 from ineruki import LOGGER
 from ineruki.database import MongoDB
+from ineruki.database.cache_bus import on_invalidate, publish
 from ineruki.database.chats_db import Chats
 
 INSERTION_LOCK = RLock()
 
-BLACKLIST_CHATS = []
+# Ids of chats the bot leaves, kept in sync with database while running
+BLACKLIST_CHATS = set()
 
 
 class GroupBlacklist(MongoDB):
@@ -36,40 +38,48 @@ class GroupBlacklist(MongoDB):
     def __init__(self) -> None:
         super().__init__(self.db_name)
 
-    def add_chat(self, chat_id: int):
+    @staticmethod
+    def is_blacklisted(chat_id: int):
+        """Check if chat is blacklisted from local cache without touching database."""
+        return chat_id in BLACKLIST_CHATS
+
+    async def add_chat(self, chat_id: int):
         with INSERTION_LOCK:
-            global BLACKLIST_CHATS
-            Chats.remove_chat(chat_id)  # Delete chat from database
-            BLACKLIST_CHATS.append(chat_id)
-            BLACKLIST_CHATS.sort()
-            return self.insert_one({"_id": chat_id, "blacklist": True})
+            await Chats.remove_chat(chat_id)  # Delete chat from database
+            BLACKLIST_CHATS.add(chat_id)
+            publish("group_blacklist", chat_id, True)
+            return await self.upsert({"_id": chat_id}, {"blacklist": True})
 
-    def remove_chat(self, chat_id: int):
+    async def remove_chat(self, chat_id: int):
         with INSERTION_LOCK:
-            global BLACKLIST_CHATS
-            BLACKLIST_CHATS.remove(chat_id)
-            BLACKLIST_CHATS.sort()
-            return self.delete_one({"_id": chat_id})
+            BLACKLIST_CHATS.discard(chat_id)
+            publish("group_blacklist", chat_id, False)
+            return await self.delete_one({"_id": chat_id})
 
-    def list_all_chats(self):
+    async def list_all_chats(self):
         with INSERTION_LOCK:
             try:
-                BLACKLIST_CHATS.sort()
-                return BLACKLIST_CHATS
+                return sorted(BLACKLIST_CHATS)
             except Exception:
-                all_chats = self.find_all()
+                all_chats = await self.find_all()
                 return [chat["_id"] for chat in all_chats]
 
-    def get_from_db(self):
-        return self.find_all()
+    async def get_from_db(self):
+        return await self.find_all()
+
+
+@on_invalidate("group_blacklist")
+def __update_blacklisted_chat(chat_id, blacklisted):
+    with INSERTION_LOCK:
+        if blacklisted:
+            BLACKLIST_CHATS.add(chat_id)
+        else:
+            BLACKLIST_CHATS.discard(chat_id)
 
 
-def __pre_req_group_blacklist():
-    global BLACKLIST_CHATS
+async def __pre_req_group_blacklist():
     start = time()
     db = GroupBlacklist()
-    chats = db.get_from_db() or []
-    for chat in chats:
-        BLACKLIST_CHATS.append(chat["_id"])
-    BLACKLIST_CHATS.sort()
+    chats = await db.get_from_db() or []
+    BLACKLIST_CHATS.update(chat["_id"] for chat in chats)
     LOGGER.info(f"Loaded GroupBlacklist Cache - {round((time() - start), 3)}s")
@@ -0,0 +1,62 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from pymongo.errors import OperationFailure
+from time import time
+from traceback import format_exc
+
+from ineruki import LOGGER
+from ineruki.database import INDEX_REGISTRY, MongoDB, ineruki_main_db
+
+
+async def index_report():
+    """Report declared indexes which are missing and existing ones never used."""
+    report = {}
+    for collection_name in sorted(await ineruki_main_db.list_collection_names()):
+        collection = MongoDB(collection_name)
+        declared = {i.document["name"] for i in INDEX_REGISTRY.get(collection_name, [])}
+        existing = set(await collection.index_information())
+        try:
+            stats = await collection.aggregate([{"$indexStats": {}}])
+            unused = sorted(
+                i["name"]
+                for i in stats
+                if i["accesses"]["ops"] == 0 and i["name"] != "_id_"
+            )
+        except OperationFailure:
+            # $indexStats is not allowed on some shared clusters
+            unused = []
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "unused": unused,
+        }
+    return report
+
+
+async def __pre_req_indexes():
+    start = time()
+    LOGGER.info("Starting Database Index Creation...")
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        try:
+            await MongoDB(collection_name).create_indexes(indexes)
+        except OperationFailure as ef:
+            LOGGER.error(f"Could not create indexes for {collection_name}: {ef}")
+            LOGGER.error(format_exc())
+    LOGGER.info(
+        f"Ensured {sum(len(i) for i in INDEX_REGISTRY.values())} indexes in {round((time() - start), 3)}s!",
+    )
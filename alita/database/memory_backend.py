@@ -0,0 +1,838 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""In-memory stand-in for the Motor client.
+
+Implements the subset of the Motor collection and database API used by the
+MongoDB wrapper, so the bot, benchmarks and load tests can run without a
+Mongo server. Only query, update and aggregation operators used by the DB
+classes are supported. Fields of registered indexes are kept in hash indexes
+which serve equality lookups, and unique indexes are enforced on every write.
+"""
+
+from asyncio import sleep
+from bson import ObjectId
+from bson.json_util import dumps
+from copy import deepcopy
+from pymongo import DeleteMany, DeleteOne, ReplaceOne, UpdateMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from re import compile as compile_re
+from re import IGNORECASE, search
+from time import perf_counter
+
+from ineruki.database.monitoring import record_latency
+
+_PATTERN_TYPE = type(compile_re(""))
+_MISSING = object()
+
+
+def doc_key(_id):
+    """Hashable key for any _id value."""
+    if isinstance(_id, (dict, list)):
+        return dumps(_id, sort_keys=True)
+    return _id
+
+
+def index_keys(doc, field: str):
+    """Keys doc is indexed under for field, one per element of an array."""
+    value = get_path(doc, field)
+    if value is _MISSING:
+        return [None]
+    if isinstance(value, list):
+        return list(dict.fromkeys(doc_key(i) for i in value))
+    return [doc_key(value)]
+
+
+def equality_values(cond):
+    """Values a condition matches by equality, None for any other condition."""
+    if isinstance(cond, dict):
+        if len(cond) != 1:
+            return None
+        ((op, arg),) = cond.items()
+        if op == "$eq":
+            values = [arg]
+        elif op == "$in" and isinstance(arg, list):
+            values = arg
+        else:
+            return None
+    else:
+        values = [cond]
+    if any(isinstance(i, (dict, list, _PATTERN_TYPE)) for i in values):
+        return None
+    return values
+
+
+# --------------------------------------------------------------------------
+# Query matching
+
+
+def get_path(doc, path: str):
+    """Resolve a dotted path, returning _MISSING when it does not exist."""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit():
+            value = value[int(part)] if int(part) < len(value) else _MISSING
+        elif isinstance(value, list):
+            values = [get_path(i, part) for i in value if isinstance(i, dict)]
+            value = [i for i in values if i is not _MISSING] or _MISSING
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def __compare(value, op: str, cond):
+    try:
+        if op == "$gt":
+            return value > cond
+        if op == "$gte":
+            return value >= cond
+        if op == "$lt":
+            return value < cond
+        if op == "$lte":
+            return value <= cond
+    except TypeError:
+        return False
+    return False
+
+
+def __regex_match(value, pattern, options: str = ""):
+    if not isinstance(value, str):
+        return False
+    if isinstance(pattern, _PATTERN_TYPE):
+        return bool(pattern.search(value))
+    return bool(search(pattern, value, IGNORECASE if "i" in options else 0))
+
+
+def match_value(value, cond) -> bool:
+    """Check a single field value against a query condition."""
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op == "$exists":
+                if (value is not _MISSING) != bool(arg):
+                    return False
+            elif op == "$eq":
+                if not match_value(value, arg):
+                    return False
+            elif op == "$ne":
+                if match_value(value, arg):
+                    return False
+            elif op == "$in":
+                if not any(match_value(value, i) for i in arg):
+                    return False
+            elif op == "$nin":
+                if any(match_value(value, i) for i in arg):
+                    return False
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                values = value if isinstance(value, list) else [value]
+                if not any(__compare(i, op, arg) for i in values):
+                    return False
+            elif op == "$regex":
+                values = value if isinstance(value, list) else [value]
+                if not any(
+                    __regex_match(i, arg, cond.get("$options", "")) for i in values
+                ):
+                    return False
+            elif op == "$options":
+                continue
+            elif op == "$size":
+                if not (isinstance(value, list) and len(value) == arg):
+                    return False
+            elif op == "$elemMatch":
+                if not (
+                    isinstance(value, list)
+                    and any(isinstance(i, dict) and match(i, arg) for i in value)
+                ):
+                    return False
+            else:
+                raise OperationFailure(f"Unsupported query operator {op}")
+        return True
+    if value is _MISSING:
+        return cond is None
+    if isinstance(cond, _PATTERN_TYPE):
+        return __regex_match(value, cond)
+    if value == cond:
+        return True
+    # Scalar conditions match any element of an array field
+    return isinstance(value, list) and not isinstance(cond, list) and cond in value
+
+
+def match(doc: dict, query: dict) -> bool:
+    """Check if document matches a Mongo style query."""
+    for key, cond in (query or {}).items():
+        if key == "$and":
+            if not all(match(doc, i) for i in cond):
+                return False
+        elif key == "$or":
+            if not any(match(doc, i) for i in cond):
+                return False
+        elif key == "$nor":
+            if any(match(doc, i) for i in cond):
+                return False
+        elif not match_value(get_path(doc, key), cond):
+            return False
+    return True
+
+
+# --------------------------------------------------------------------------
+# Updates
+
+
+def set_path(doc: dict, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def unset_path(doc: dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def __pull_matches(item, cond):
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        return match_value(item, cond)
+    if isinstance(cond, dict):
+        return isinstance(item, dict) and match(item, cond)
+    return item == cond
+
+
+def apply_update(doc: dict, update: dict, is_insert: bool = False):
+    """Apply update operators to document in place."""
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not is_insert:
+            continue
+        for path, arg in fields.items():
+            arg = deepcopy(arg)
+            current = get_path(doc, path)
+            if op in ("$set", "$setOnInsert"):
+                set_path(doc, path, arg)
+            elif op == "$unset":
+                unset_path(doc, path)
+            elif op == "$inc":
+                set_path(doc, path, (0 if current is _MISSING else current) + arg)
+            elif op in ("$push", "$addToSet"):
+                items = current if isinstance(current, list) else []
+                new = (
+                    arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+                )
+                for item in new:
+                    if op == "$push" or item not in items:
+                        items.append(item)
+                set_path(doc, path, items)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    set_path(
+                        doc,
+                        path,
+                        [i for i in current if not __pull_matches(i, arg)],
+                    )
+            elif op == "$pop":
+                if isinstance(current, list) and current:
+                    current.pop(-1 if arg == 1 else 0)
+            else:
+                raise OperationFailure(f"Unsupported update operator {op}")
+
+
+def upsert_seed(query: dict):
+    """Document created by an upsert before update operators are applied."""
+    seed = {}
+    for key, cond in query.items():
+        if key.startswith("$"):
+            continue
+        if isinstance(cond, dict) and any(k.startswith("$") for k in cond):
+            continue
+        set_path(seed, key, deepcopy(cond))
+    return seed
+
+
+def project(doc: dict, projection):
+    if not projection:
+        return doc
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        result = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", True) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: v for k, v in doc.items() if projection.get(k, True)}
+
+
+# --------------------------------------------------------------------------
+# Aggregation
+
+
+def eval_expr(doc: dict, expr):
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = get_path(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, dict) and len(expr) == 1 and "$size" in expr:
+        value = eval_expr(doc, expr["$size"])
+        if not isinstance(value, list):
+            raise OperationFailure("The argument to $size must be an array")
+        return len(value)
+    if isinstance(expr, dict):
+        return {k: eval_expr(doc, v) for k, v in expr.items()}
+    return expr
+
+
+def group(docs: list, spec: dict):
+    groups = {}
+    for doc in docs:
+        _id = eval_expr(doc, spec["_id"])
+        key = doc_key(_id)
+        if key not in groups:
+            groups[key] = {"_id": _id}
+            for field, acc in spec.items():
+                if field == "_id":
+                    continue
+                op = next(iter(acc))
+                groups[key][field] = [] if op in ("$push", "$addToSet") else _MISSING
+        out = groups[key]
+        for field, acc in spec.items():
+            if field == "_id":
+                continue
+            op, expr = next(iter(acc.items()))
+            value = eval_expr(doc, expr)
+            if op == "$sum":
+                prev = 0 if out[field] is _MISSING else out[field]
+                out[field] = prev + (value if isinstance(value, (int, float)) else 0)
+            elif op == "$push":
+                out[field].append(value)
+            elif op == "$addToSet":
+                if value not in out[field]:
+                    out[field].append(value)
+            elif op == "$first":
+                if out[field] is _MISSING:
+                    out[field] = value
+            elif op in ("$max", "$min"):
+                if out[field] is _MISSING:
+                    out[field] = value
+                else:
+                    out[field] = (max if op == "$max" else min)(out[field], value)
+            else:
+                raise OperationFailure(f"Unsupported accumulator {op}")
+    return list(groups.values())
+
+
+def run_pipeline(docs: list, pipeline: list, collections=None):
+    for stage in pipeline:
+        ((name, spec),) = stage.items()
+        if name == "$match":
+            docs = [i for i in docs if match(i, spec)]
+        elif name == "$group":
+            docs = group(docs, spec)
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$project":
+            docs = [project(i, spec) for i in docs]
+        elif name == "$sort":
+            for field, direction in reversed(list(spec.items())):
+                docs.sort(
+                    key=lambda i: (get_path(i, field) is _MISSING, get_path(i, field)),
+                    reverse=direction < 0,
+                )
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$lookup" and collections is not None:
+            foreign = collections(spec["from"])
+            for doc in docs:
+                local = eval_expr(doc, "$" + spec["localField"])
+                doc[spec["as"]] = [
+                    i
+                    for i in foreign
+                    if match_value(get_path(i, spec["foreignField"]), local)
+                ]
+        else:
+            raise OperationFailure(f"Unsupported aggregation stage {name}")
+    return docs
+
+
+# --------------------------------------------------------------------------
+# Results and cursor
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id) -> None:
+        self.inserted_id = inserted_id
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None) -> None:
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count) -> None:
+        self.deleted_count = deleted_count
+
+
+class BulkWriteResult:
+    def __init__(
+        self,
+        matched_count,
+        modified_count,
+        upserted_count,
+        deleted_count=0,
+    ) -> None:
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_count = upserted_count
+        self.deleted_count = deleted_count
+
+
+class MemoryCursor:
+    """Cursor over already computed results, supports async for and to_list."""
+
+    def __init__(self, loader) -> None:
+        self.loader = loader
+        self.results = None
+
+    async def to_list(self, length=None):
+        if self.results is None:
+            self.results = await self.loader()
+        return self.results if length is None else self.results[:length]
+
+    def __aiter__(self):
+        return self.__iterate()
+
+    async def __iterate(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+# --------------------------------------------------------------------------
+# Collection, database and client
+
+
+class MemoryCollection:
+    """Collection keeping documents in a dict keyed by _id."""
+
+    def __init__(self, database, name: str) -> None:
+        self.database = database
+        self.name = name
+        self.documents = {}
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+        # Hash indexes of indexed fields, field -> value key -> doc key -> _id
+        self.field_index = {}
+        # Unique indexes, name -> value keys -> doc key owning them
+        self.unique_index = {}
+        # Index entries of every document, to drop them without reading it
+        self.index_entries = {}
+
+    # Storage primitives, overridden by the SQLite backend
+    def _all(self):
+        return list(self.documents.values())
+
+    def _get(self, _id):
+        return self.documents.get(doc_key(_id))
+
+    def _put(self, doc: dict):
+        self.documents[doc_key(doc["_id"])] = doc
+
+    def _remove(self, _id):
+        self.documents.pop(doc_key(_id), None)
+
+    def _count(self):
+        return len(self.documents)
+
+    def __unique_keys(self, doc: dict, name: str):
+        values = (get_path(doc, field) for field, _ in self.indexes[name]["key"])
+        # Missing fields are indexed as null, as Mongo does
+        return tuple(None if i is _MISSING else doc_key(i) for i in values)
+
+    def _unindex(self, key):
+        fields, unique = self.index_entries.pop(key, ((), ()))
+        for field, value in fields:
+            ids = self.field_index[field][value]
+            ids.pop(key, None)
+            if not ids:
+                del self.field_index[field][value]
+        for name, value in unique:
+            if self.unique_index[name].get(value) == key:
+                del self.unique_index[name][value]
+
+    def _index(self, doc: dict):
+        """Check the unique indexes for doc and update its index entries."""
+        key = doc_key(doc["_id"])
+        unique = []
+        for name, owners in self.unique_index.items():
+            value = self.__unique_keys(doc, name)
+            if owners.get(value, key) != key:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} "
+                    f"index: {name} dup key: {value}",
+                    11000,
+                )
+            unique.append((name, value))
+        fields = [
+            (field, value)
+            for field in self.field_index
+            for value in index_keys(doc, field)
+        ]
+        entries = (fields, unique)
+        # Unchanged entries keep their place, so lookups keep insertion order
+        if self.index_entries.get(key) == entries:
+            return
+        self._unindex(key)
+        for field, value in fields:
+            self.field_index[field].setdefault(value, {})[key] = doc["_id"]
+        for name, value in unique:
+            self.unique_index[name][value] = key
+        if fields or unique:
+            self.index_entries[key] = entries
+
+    def _reindex(self):
+        """Rebuild the index entries of all documents for the registered indexes."""
+        self.field_index = {
+            field: {}
+            for index in self.indexes.values()
+            for field, _ in index["key"]
+            if field != "_id"
+        }
+        self.unique_index = {
+            name: {}
+            for name, index in self.indexes.items()
+            if index.get("unique") and name != "_id_"
+        }
+        self.index_entries = {}
+        for doc in self._all():
+            self._index(doc)
+
+    def _store(self, doc: dict):
+        self._index(doc)
+        self._put(doc)
+
+    def _delete(self, _id):
+        self._unindex(doc_key(_id))
+        self._remove(_id)
+
+    def __candidates(self, query: dict):
+        """_id values of the only documents which can match, None to scan."""
+        best = None
+        for field, cond in query.items():
+            values = equality_values(cond)
+            if values is None:
+                continue
+            if field == "_id":
+                ids = {doc_key(i): i for i in values}
+            elif field in self.field_index:
+                index = self.field_index[field]
+                ids = {}
+                for value in values:
+                    ids.update(index.get(doc_key(value), {}))
+            else:
+                continue
+            if best is None or len(ids) < len(best):
+                best = ids
+        return None if best is None else list(best.values())
+
+    async def _delay(self, op: str, start: float):
+        if self.database.latency:
+            await sleep(self.database.latency)
+        record_latency(self.name, op, (perf_counter() - start) * 1000)
+
+    def _matching(self, query: dict):
+        query = query or {}
+        ids = self.__candidates(query)
+        if ids is None:
+            return [i for i in self._all() if match(i, query)]
+        docs = (self._get(i) for i in ids)
+        return [i for i in docs if i is not None and match(i, query)]
+
+    def _replace(self, query: dict, replacement: dict, upsert: bool):
+        matched = self._matching(query)[:1]
+        if matched:
+            self._store({"_id": matched[0]["_id"], **deepcopy(replacement)})
+            return matched, None
+        if not upsert:
+            return [], None
+        doc = {**upsert_seed(query), **deepcopy(replacement)}
+        doc.setdefault("_id", ObjectId())
+        self._store(doc)
+        return [doc], doc["_id"]
+
+    def _update(self, query: dict, update: dict, upsert: bool, multi: bool = False):
+        matched = self._matching(query)
+        if not multi:
+            matched = matched[:1]
+        # Updated copies are stored, so a unique index violation changes nothing
+        matched = [deepcopy(i) for i in matched]
+        for doc in matched:
+            apply_update(doc, update)
+            self._store(doc)
+        if matched or not upsert:
+            return matched, None
+        doc = upsert_seed(query)
+        apply_update(doc, update, is_insert=True)
+        doc.setdefault("_id", ObjectId())
+        self._store(doc)
+        return [doc], doc["_id"]
+
+    async def insert_one(self, document: dict):
+        start = perf_counter()
+        document.setdefault("_id", ObjectId())
+        if self._get(document["_id"]) is not None:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.name} "
+                f"index: _id_ dup key: {document['_id']}",
+                11000,
+            )
+        self._store(deepcopy(document))
+        await self._delay("insert", start)
+        return InsertOneResult(document["_id"])
+
+    async def find_one(self, query=None, projection=None):
+        start = perf_counter()
+        matched = self._matching(query)
+        await self._delay("find", start)
+        return project(deepcopy(matched[0]), projection) if matched else None
+
+    def find(self, query=None, projection=None, skip=0, limit=0):
+        async def loader():
+            start = perf_counter()
+            docs = self._matching(query)[skip:]
+            if limit:
+                docs = docs[:limit]
+            await self._delay("find", start)
+            return [project(deepcopy(i), projection) for i in docs]
+
+        return MemoryCursor(loader)
+
+    async def count_documents(self, query=None):
+        start = perf_counter()
+        count = len(self._matching(query)) if query else self._count()
+        await self._delay("count", start)
+        return count
+
+    async def delete_one(self, query):
+        start = perf_counter()
+        matched = self._matching(query)[:1]
+        for doc in matched:
+            self._delete(doc["_id"])
+        await self._delay("delete", start)
+        return DeleteResult(len(matched))
+
+    async def delete_many(self, query):
+        start = perf_counter()
+        matched = self._matching(query)
+        for doc in matched:
+            self._delete(doc["_id"])
+        await self._delay("delete", start)
+        return DeleteResult(len(matched))
+
+    async def find_one_and_delete(self, query):
+        start = perf_counter()
+        matched = self._matching(query)[:1]
+        for doc in matched:
+            self._delete(doc["_id"])
+        await self._delay("findAndModify", start)
+        return matched[0] if matched else None
+
+    async def find_one_and_replace(self, query, replacement):
+        start = perf_counter()
+        matched = self._matching(query)[:1]
+        for doc in matched:
+            self._store({"_id": doc["_id"], **deepcopy(replacement)})
+        await self._delay("findAndModify", start)
+        return matched[0] if matched else None
+
+    async def find_one_and_update(
+        self,
+        query,
+        update,
+        upsert=False,
+        return_document=False,
+    ):
+        start = perf_counter()
+        before = self._matching(query)[:1]
+        before = deepcopy(before[0]) if before else None
+        after, _ = self._update(query, update, upsert)
+        await self._delay("findAndModify", start)
+        if return_document:
+            return deepcopy(after[0]) if after else None
+        return before
+
+    async def update_one(self, query, update, upsert=False):
+        start = perf_counter()
+        matched, upserted_id = self._update(query, update, upsert)
+        await self._delay("update", start)
+        count = 0 if upserted_id is not None else len(matched)
+        return UpdateResult(count, count, upserted_id)
+
+    async def update_many(self, query, update, upsert=False):
+        start = perf_counter()
+        matched, upserted_id = self._update(query, update, upsert, multi=True)
+        await self._delay("update", start)
+        count = 0 if upserted_id is not None else len(matched)
+        return UpdateResult(count, count, upserted_id)
+
+    async def bulk_write(self, requests, ordered=True):
+        start = perf_counter()
+        matched = upserted = deleted = 0
+        errors = []
+        for position, request in enumerate(requests):
+            # pymongo write models keep their arguments in private attributes
+            if isinstance(request, (DeleteOne, DeleteMany)):
+                docs = self._matching(request._filter)
+                if isinstance(request, DeleteOne):
+                    docs = docs[:1]
+                for doc in docs:
+                    self._delete(doc["_id"])
+                deleted += len(docs)
+                continue
+            try:
+                if isinstance(request, ReplaceOne):
+                    docs, upserted_id = self._replace(
+                        request._filter,
+                        request._doc,
+                        request._upsert,
+                    )
+                else:
+                    docs, upserted_id = self._update(
+                        request._filter,
+                        request._doc,
+                        request._upsert,
+                        multi=isinstance(request, UpdateMany),
+                    )
+            except DuplicateKeyError as ef:
+                errors.append({"index": position, "code": 11000, "errmsg": str(ef)})
+                if ordered:
+                    break
+                continue
+            if upserted_id is None:
+                matched += len(docs)
+            else:
+                upserted += 1
+        await self._delay("update", start)
+        if errors:
+            raise BulkWriteError(
+                {
+                    "writeErrors": errors,
+                    "nMatched": matched,
+                    "nModified": matched,
+                    "nUpserted": upserted,
+                    "nRemoved": deleted,
+                },
+            )
+        return BulkWriteResult(matched, matched, upserted, deleted)
+
+    def aggregate(self, pipeline):
+        async def loader():
+            start = perf_counter()
+            for stage in pipeline:
+                if "$indexStats" in stage:
+                    raise OperationFailure("$indexStats is not supported")
+            docs = run_pipeline(
+                deepcopy(self._all()),
+                pipeline,
+                lambda name: self.database[name]._all(),
+            )
+            await self._delay("aggregate", start)
+            return docs
+
+        return MemoryCursor(loader)
+
+    async def create_indexes(self, indexes):
+        registered = deepcopy(self.indexes)
+        for index in indexes:
+            document = index.document
+            self.indexes[document["name"]] = {
+                "key": list(document["key"].items()),
+                "unique": document.get("unique", False),
+            }
+        try:
+            self._reindex()
+        except DuplicateKeyError:
+            self.indexes = registered
+            self._reindex()
+            raise
+        return [i.document["name"] for i in indexes]
+
+    async def index_information(self):
+        return deepcopy(self.indexes)
+
+    async def drop_index(self, name):
+        if self.indexes.pop(name, None) is None:
+            raise OperationFailure(f"index not found with name [{name}]")
+        self._reindex()
+
+
+class MemoryDatabase:
+    """Database holding MemoryCollection objects."""
+
+    collection_class = MemoryCollection
+
+    def __init__(self, name: str, latency: float = 0) -> None:
+        self.name = name
+        self.latency = latency
+        self.collections = {}
+
+    def __getitem__(self, name: str):
+        try:
+            return self.collections[name]
+        except KeyError:
+            collection = self.collections[name] = self.collection_class(self, name)
+            return collection
+
+    async def list_collection_names(self):
+        return [name for name, i in self.collections.items() if i._count()]
+
+    async def command(self, command):
+        if command in ("dbstats", "dbStats"):
+            names = await self.list_collection_names()
+            return {
+                "db": self.name,
+                "backend": type(self).__name__,
+                "collections": len(names),
+                "objects": sum(self[i]._count() for i in names),
+            }
+        if command == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"Unsupported command {command}")
+
+
+class MemoryClient:
+    """Drop-in for AsyncIOMotorClient keeping all data in process memory."""
+
+    database_class = MemoryDatabase
+
+    def __init__(self, latency_ms: float = 0) -> None:
+        self.latency = latency_ms / 1000
+        self.databases = {}
+
+    def __getitem__(self, name: str):
+        try:
+            return self.databases[name]
+        except KeyError:
+            database = self.databases[name] = self.database_class(name, self.latency)
+            return database
+
+    def close(self):
+        pass
@@ -0,0 +1,105 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from datetime import datetime
+from time import time
+
+from ineruki import LOGGER
+from ineruki.database import SCHEMA_REGISTRY, MongoDB
+
+# Collection storing the applied schema version of every collection
+SCHEMA_VERSIONS = "schema_versions"
+
+# Data migrations keyed by collection name, then by the version they upgrade to
+MIGRATION_STEPS = {}
+
+
+def migration_step(collection_name: str, version: int):
+    """Register a data migration to run when collection reaches version."""
+
+    def decorator(func):
+        MIGRATION_STEPS.setdefault(collection_name, {})[version] = func
+        return func
+
+    return decorator
+
+
+async def migrate_collection(
+    collection_name: str,
+    from_version: int,
+    version: int,
+    defaults: dict,
+):
+    """Run pending data migrations, then set missing defaults per key."""
+    collection = MongoDB(collection_name)
+    repaired = {}
+    steps = MIGRATION_STEPS.get(collection_name, {})
+    for step_version in sorted(steps):
+        if from_version < step_version <= version:
+            repaired[steps[step_version].__name__] = await steps[step_version]()
+    for key, val in defaults.items():
+        modified = await collection.update_many(
+            {key: {"$exists": False}},
+            {"$set": {key: val}},
+        )
+        if modified:
+            repaired[key] = modified
+    await MongoDB(SCHEMA_VERSIONS).upsert(
+        {"_id": collection_name},
+        {"version": version, "applied": datetime.now()},
+    )
+    return repaired
+
+
+async def run_migrations():
+    """Migrate collections whose recorded schema version is outdated."""
+    applied = {
+        i["_id"]: i["version"] for i in await MongoDB(SCHEMA_VERSIONS).find_all()
+    }
+    report = {}
+    for collection_name, db_class in SCHEMA_REGISTRY.items():
+        if applied.get(collection_name, 0) >= db_class.schema_version:
+            continue
+        start = time()
+        repaired = await migrate_collection(
+            collection_name,
+            applied.get(collection_name, 0),
+            db_class.schema_version,
+            db_class.schema_defaults,
+        )
+        report[collection_name] = {
+            "from": applied.get(collection_name, 0),
+            "to": db_class.schema_version,
+            "repaired": repaired,
+            "time": round((time() - start), 3),
+        }
+    return report
+
+
+async def __pre_req_migrations():
+    start = time()
+    LOGGER.info("Starting Database Migrations...")
+    report = await run_migrations()
+    for collection_name, status in report.items():
+        LOGGER.info(
+            f"Migrated {collection_name} v{status['from']} -> v{status['to']} "
+            f"in {status['time']}s, repaired: {status['repaired'] or 'nothing'}",
+        )
+    if not report:
+        LOGGER.info("Database schema is up to date, skipping repair")
+    LOGGER.info(f"Done in {round((time() - start), 3)}s!")
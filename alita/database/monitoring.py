@@ -0,0 +1,192 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from bisect import bisect_left
+from functools import wraps
+from pymongo.monitoring import CommandListener, ConnectionPoolListener
+from sys import _getframe
+from threading import Lock
+from time import perf_counter
+
+from ineruki import DB_SLOW_QUERY_MS, LOGGER
+
+STATS_LOCK = Lock()
+
+# Upper bounds of latency histogram buckets in milliseconds, last is overflow
+LATENCY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+# {(collection, command): {"count", "total_ms", "max_ms", "buckets"}}
+LATENCY_STATS = {}
+FAILED_COMMANDS = {}
+POOL_STATS = {
+    "checked_out": 0,
+    "checkouts": 0,
+    "checkout_failures": 0,
+    "connections_created": 0,
+    "connections_closed": 0,
+    "pool_cleared": 0,
+}
+
+
+def record_latency(collection: str, command: str, duration_ms: float):
+    """Add one command duration to its latency histogram."""
+    with STATS_LOCK:
+        try:
+            stats = LATENCY_STATS[(collection, command)]
+        except KeyError:
+            stats = LATENCY_STATS[(collection, command)] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * len(LATENCY_BUCKETS),
+            }
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["buckets"][bisect_left(LATENCY_BUCKETS, duration_ms)] += 1
+
+
+def bucket_percentile(buckets: list, count: int, pct: float):
+    """Upper bound of the bucket holding the given percentile."""
+    target, seen = count * pct, 0
+    for bound, hits in zip(LATENCY_BUCKETS, buckets):
+        seen += hits
+        if seen >= target:
+            return bound
+    return LATENCY_BUCKETS[-1]
+
+
+def latency_report():
+    """Per collection and command latency summary, slowest total first."""
+    with STATS_LOCK:
+        report = [
+            {
+                "collection": collection,
+                "command": command,
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                "p50_ms": bucket_percentile(stats["buckets"], stats["count"], 0.5),
+                "p99_ms": bucket_percentile(stats["buckets"], stats["count"], 0.99),
+                "max_ms": round(stats["max_ms"], 2),
+                "failed": FAILED_COMMANDS.get((collection, command), 0),
+                "total_ms": stats["total_ms"],
+            }
+            for (collection, command), stats in LATENCY_STATS.items()
+        ]
+        pool = dict(POOL_STATS)
+    report.sort(key=lambda i: i["total_ms"], reverse=True)
+    return report, pool
+
+
+class CommandLatencyListener(CommandListener):
+    """Record latency of every command sent to the database server."""
+
+    def __init__(self) -> None:
+        self.collections = {}
+
+    def started(self, event):
+        # Collection is the value of the command name field, except for getMore
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "")
+        self.collections[event.request_id] = collection
+
+    def succeeded(self, event):
+        collection = self.collections.pop(event.request_id, "")
+        record_latency(collection, event.command_name, event.duration_micros / 1000)
+
+    def failed(self, event):
+        collection = self.collections.pop(event.request_id, "")
+        record_latency(collection, event.command_name, event.duration_micros / 1000)
+        with STATS_LOCK:
+            key = (collection, event.command_name)
+            FAILED_COMMANDS[key] = FAILED_COMMANDS.get(key, 0) + 1
+        LOGGER.warning(
+            f"Database command {event.command_name} on '{collection}' failed: {event.failure}",
+        )
+
+
+class PoolListener(ConnectionPoolListener):
+    """Keep counters of connection pool usage."""
+
+    @staticmethod
+    def __inc(key: str, value: int = 1):
+        with STATS_LOCK:
+            POOL_STATS[key] += value
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.__inc("pool_cleared")
+        LOGGER.warning(f"Database connection pool for {event.address} was cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.__inc("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.__inc("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.__inc("checkout_failures")
+        LOGGER.warning(f"Could not get a database connection: {event.reason}")
+
+    def connection_checked_out(self, event):
+        self.__inc("checkouts")
+        self.__inc("checked_out")
+
+    def connection_checked_in(self, event):
+        self.__inc("checked_out", -1)
+
+
+def calling_plugin():
+    """Name of the plugin module whose handler is awaiting the current call."""
+    frame = _getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("ineruki.plugins."):
+            return f"{module[16:]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "internal"
+
+
+def log_slow(func):
+    """Log wrapper calls slower than DB_SLOW_QUERY_MS with the calling plugin."""
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        start = perf_counter()
+        result = await func(self, *args, **kwargs)
+        duration_ms = (perf_counter() - start) * 1000
+        if duration_ms >= DB_SLOW_QUERY_MS:
+            LOGGER.warning(
+                f"Slow query: {self.collection_name}.{func.__name__} took "
+                f"{round(duration_ms, 2)}ms, called from {calling_plugin()}",
+            )
+        return result
+
+    return wrapper
@@ -0,0 +1,74 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from cachetools import TTLCache
+from threading import RLock
+from time import perf_counter
+
+CACHE_LOCK = RLock()
+
+# Per-chat settings documents keyed by (collection, chat_id).
+# Least recently used entries are evicted once maxsize is reached.
+SETTINGS_CACHE = TTLCache(maxsize=10000, ttl=(60 * 30), timer=perf_counter)
+
+CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def get_settings(collection: str, chat_id: int):
+    """Return cached settings document or None on a miss."""
+    with CACHE_LOCK:
+        try:
+            data = SETTINGS_CACHE[(collection, chat_id)]
+        except KeyError:
+            CACHE_STATS["misses"] += 1
+            return None
+        CACHE_STATS["hits"] += 1
+        return data
+
+
+def put_settings(collection: str, chat_id: int, data):
+    """Store latest settings document, dropping the entry if data is empty."""
+    with CACHE_LOCK:
+        if data:
+            SETTINGS_CACHE[(collection, chat_id)] = data
+        else:
+            SETTINGS_CACHE.pop((collection, chat_id), None)
+        return data
+
+
+def drop_settings(collection: str, chat_id: int = None):
+    """Invalidate one chat, or the whole collection if chat_id is None."""
+    with CACHE_LOCK:
+        if chat_id is not None:
+            SETTINGS_CACHE.pop((collection, chat_id), None)
+            return
+        for key in [key for key in SETTINGS_CACHE.keys() if key[0] == collection]:
+            SETTINGS_CACHE.pop(key, None)
+
+
+def settings_cache_stats():
+    """Hit/miss counters and current size of the settings cache."""
+    with CACHE_LOCK:
+        total = CACHE_STATS["hits"] + CACHE_STATS["misses"]
+        return {
+            "hits": CACHE_STATS["hits"],
+            "misses": CACHE_STATS["misses"],
+            "hit_ratio": round(CACHE_STATS["hits"] / total, 3) if total else 0.0,
+            "size": SETTINGS_CACHE.currsize,
+            "maxsize": SETTINGS_CACHE.maxsize,
+        }
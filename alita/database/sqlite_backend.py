@@ -0,0 +1,119 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""SQLite stand-in for the Motor client.
+
+Documents are stored as extended JSON, one table per collection, so data
+survives restarts on a single machine. Query matching and updates reuse the
+in-memory backend; lookups by _id use the table primary key, and equality
+lookups on indexed fields the in-memory indexes built by create_indexes.
+"""
+
+from bson.json_util import dumps, loads
+from sqlite3 import connect
+
+from ineruki.database.memory_backend import (
+    MemoryClient,
+    MemoryCollection,
+    MemoryDatabase,
+    doc_key,
+)
+
+
+def _row_id(_id):
+    return dumps(doc_key(_id))
+
+
+class SQLiteCollection(MemoryCollection):
+    """Collection stored in a table of (id, doc) rows."""
+
+    def __init__(self, database, name: str) -> None:
+        super().__init__(database, name)
+        self.table = '"' + name.replace('"', '""') + '"'
+        self.database.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} (id TEXT PRIMARY KEY, doc TEXT)",
+        )
+
+    def _all(self):
+        rows = self.database.connection.execute(f"SELECT doc FROM {self.table}")
+        return [loads(row[0]) for row in rows]
+
+    def _get(self, _id):
+        row = self.database.connection.execute(
+            f"SELECT doc FROM {self.table} WHERE id = ?",
+            (_row_id(_id),),
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def _put(self, doc: dict):
+        self.database.connection.execute(
+            f"INSERT OR REPLACE INTO {self.table} (id, doc) VALUES (?, ?)",
+            (_row_id(doc["_id"]), dumps(doc)),
+        )
+
+    def _remove(self, _id):
+        self.database.connection.execute(
+            f"DELETE FROM {self.table} WHERE id = ?",
+            (_row_id(_id),),
+        )
+
+    def _count(self):
+        return self.database.connection.execute(
+            f"SELECT COUNT(*) FROM {self.table}",
+        ).fetchone()[0]
+
+
+class SQLiteDatabase(MemoryDatabase):
+    """Database backed by one SQLite file."""
+
+    collection_class = SQLiteCollection
+
+    def __init__(self, name: str, latency: float = 0, path: str = ":memory:") -> None:
+        super().__init__(name, latency)
+        # Autocommit, every write is persisted as soon as it is made
+        self.connection = connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        tables = self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'",
+        )
+        for (table,) in tables.fetchall():
+            _ = self[table]
+
+
+class SQLiteClient(MemoryClient):
+    """Drop-in for AsyncIOMotorClient storing data in a SQLite file."""
+
+    database_class = SQLiteDatabase
+
+    def __init__(self, path: str, latency_ms: float = 0) -> None:
+        super().__init__(latency_ms)
+        self.path = path
+
+    def __getitem__(self, name: str):
+        try:
+            return self.databases[name]
+        except KeyError:
+            database = self.databases[name] = SQLiteDatabase(
+                name,
+                self.latency,
+                self.path,
+            )
+            return database
+
+    def close(self):
+        for database in self.databases.values():
+            database.connection.close()
@@ -0,0 +1,99 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from asyncio import Lock, ensure_future, gather
+from time import time
+from traceback import format_exc
+
+from ineruki import LOGGER, STATS_REFRESH_INTERVAL
+from ineruki.database.antispam_db import GBan
+from ineruki.database.approve_db import Approve
+from ineruki.database.blacklist_db import Blacklist
+from ineruki.database.chats_db import Chats
+from ineruki.database.filters_db import Filters
+from ineruki.database.notes_db import Notes, NotesSettings
+from ineruki.database.pins_db import Pins
+from ineruki.database.rules_db import Rules
+from ineruki.database.users_db import Users
+from ineruki.database.warns_db import Warns, WarnSettings
+
+SNAPSHOT_LOCK = Lock()
+
+# Last computed stats, served to /stats until older than STATS_REFRESH_INTERVAL
+STATS_SNAPSHOT = {"time": 0, "data": None}
+
+
+async def collect_stats():
+    """Run all stats queries concurrently on the database server."""
+    fldb = Filters()
+    notesdb = Notes()
+    queries = {
+        "users": Users.count_users(),
+        "chats": Chats.count_chats(),
+        "antichannelpin": Pins.count_chats("antichannelpin"),
+        "cleanlinked": Pins.count_chats("cleanlinked"),
+        "filters": fldb.count_filters_all(),
+        "filters_chats": fldb.count_filters_chats(),
+        "filter_aliases": fldb.count_filter_aliases(),
+        "blacklists": Blacklist.count_blacklists_all(),
+        "blacklists_chats": Blacklist.count_blackists_chats(),
+        "blacklist_actions": Blacklist.count_action_bl_chats(),
+        "rules": Rules.count_chats_with_rules(),
+        "privrules": Rules.count_privrules_chats(),
+        "warns": Warns.count_warns_total(),
+        "warns_chats": Warns.count_all_chats_using_warns(),
+        "warned_users": Warns.count_warned_users(),
+        "warn_kick": WarnSettings.count_action_chats("kick"),
+        "warn_mute": WarnSettings.count_action_chats("mute"),
+        "warn_ban": WarnSettings.count_action_chats("ban"),
+        "notes": notesdb.count_all_notes(),
+        "notes_chats": notesdb.count_notes_chats(),
+        "privatenotes": NotesSettings().count_chats(),
+        "gbans": GBan().count_gbans(),
+        "approved": Approve.count_all_approved(),
+        "approved_chats": Approve.count_approved_chats(),
+    }
+    results = await gather(*queries.values())
+    return dict(zip(queries.keys(), results))
+
+
+async def refresh_stats():
+    """Recompute the stats snapshot, only one refresh runs at a time."""
+    if SNAPSHOT_LOCK.locked():
+        async with SNAPSHOT_LOCK:
+            return STATS_SNAPSHOT
+    async with SNAPSHOT_LOCK:
+        start = time()
+        try:
+            STATS_SNAPSHOT["data"] = await collect_stats()
+            STATS_SNAPSHOT["time"] = time()
+        except Exception as ef:
+            LOGGER.error(ef)
+            LOGGER.error(format_exc())
+        LOGGER.info(f"Refreshed stats snapshot in {round((time() - start), 3)}s")
+        return STATS_SNAPSHOT
+
+
+async def get_stats_snapshot(force: bool = False):
+    """Return cached stats, refreshing in background once they are stale."""
+    if force or STATS_SNAPSHOT["data"] is None:
+        return await refresh_stats()
+    if (time() - STATS_SNAPSHOT["time"]) > STATS_REFRESH_INTERVAL:
+        if not SNAPSHOT_LOCK.locked():
+            ensure_future(refresh_stats())
+    return STATS_SNAPSHOT
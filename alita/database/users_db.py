@@ -16,8 +16,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from pymongo import ASCENDING, IndexModel
 from threading import RLock
-from time import time
 
 from ineruki import LOGGER
 from ineruki.database import MongoDB
@@ -29,55 +29,58 @@ class Users(MongoDB):
     """Class to manage users for bot."""
 
     db_name = "users"
+    schema_version = 1
+    schema_defaults = {"username": "", "name": "unknown_till_now"}
+    indexes = [IndexModel([("username", ASCENDING)], name="username")]
 
     def __init__(self, user_id: int) -> None:
         super().__init__(self.db_name)
         self.user_id = user_id
-        self.user_info = self.__ensure_in_db()
+        self.user_info = None
 
-    def update_user(self, name: str, username: str = None):
+    async def update_user(self, name: str, username: str = None):
         with INSERTION_LOCK:
-            if (
-                    name == self.user_info["name"]
-                    and username == self.user_info["username"]
-            ):
+            user_info = self.user_info or {}
+            if name == user_info.get("name") and username == user_info.get("username"):
                 return True
-            return self.update(
+            self.user_info = await self.upsert(
                 {"_id": self.user_id},
                 {"username": username, "name": name},
             )
+            return self.user_info
 
-    def delete_user(self):
+    async def delete_user(self):
         with INSERTION_LOCK:
-            return self.delete_one(
+            self.user_info = None
+            return await self.delete_one(
                 {"_id": self.user_id},
             )
 
     @staticmethod
-    def count_users():
+    async def count_users():
         with INSERTION_LOCK:
             collection = MongoDB(Users.db_name)
-            return collection.count()
+            return await collection.count()
 
-    def get_my_info(self):
+    async def get_my_info(self):
         with INSERTION_LOCK:
-            return self.user_info
+            return await self.__ensure_in_db()
 
     @staticmethod
-    def list_users():
+    async def list_users():
         with INSERTION_LOCK:
             collection = MongoDB(Users.db_name)
-            return collection.find_all()
+            return await collection.find_all()
 
     @staticmethod
-    def get_user_info(user_id: int or str):
+    async def get_user_info(user_id: int or str):
         with INSERTION_LOCK:
             collection = MongoDB(Users.db_name)
             if isinstance(user_id, int):
-                curr = collection.find_one({"_id": user_id})
+                curr = await collection.find_one({"_id": user_id})
             elif isinstance(user_id, str):
                 # user_id[1:] because we don't want the '@' in the username search!
-                curr = collection.find_one({"username": user_id[1:]})
+                curr = await collection.find_one({"username": user_id[1:]})
             else:
                 curr = None
 
@@ -86,39 +89,18 @@ class Users(MongoDB):
 
             return {}
 
-    def __ensure_in_db(self):
-        chat_data = self.find_one({"_id": self.user_id})
+    async def __ensure_in_db(self):
+        if self.user_info is not None:
+            return self.user_info
+        chat_data = await self.find_one({"_id": self.user_id})
         if not chat_data:
-            new_data = {"_id": self.user_id, "username": "", "name": "unknown_till_now"}
-            self.insert_one(new_data)
+            chat_data = await self.upsert({"_id": self.user_id}, {}, self.defaults)
             LOGGER.info(f"Initialized User Document for {self.user_id}")
-            return new_data
+        self.user_info = chat_data
         return chat_data
 
     @staticmethod
-    def load_from_db():
+    async def load_from_db():
         with INSERTION_LOCK:
             collection = MongoDB(Users.db_name)
-            return collection.find_all()
-
-    @staticmethod
-    def repair_db(collection):
-        all_data = collection.find_all()
-        keys = {"username": "", "name": "unknown_till_now"}
-        for data in all_data:
-            for key, val in keys.items():
-                try:
-                    _ = data[key]
-                except KeyError:
-                    LOGGER.warning(
-                        f"Repairing Users Database - setting '{key}:{val}' for {data['_id']}",
-                    )
-                    collection.update({"_id": data["_id"]}, {key: val})
-
-
-def __pre_req_users():
-    start = time()
-    LOGGER.info("Starting Users Database Repair...")
-    collection = MongoDB(Users.db_name)
-    Users.repair_db(collection)
-    LOGGER.info(f"Done in {round((time() - start), 3)}s!")
+            return await collection.find_all()
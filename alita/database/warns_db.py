@@ -16,184 +16,194 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
 from threading import RLock
-from time import time
 
 from ineruki import LOGGER
 from ineruki.database import MongoDB
+from ineruki.database.migrations import migration_step
 
 INSERTION_LOCK = RLock()
 
 
 class Warns(MongoDB):
     db_name = "chat_warns"
+    chat_field = "chat_id"
+    schema_version = 2
+    schema_defaults = {
+        "warns": [],
+        "num_warns": 0,
+    }
+    # Unique so concurrent first warns of a user upsert the same document
+    indexes = [
+        IndexModel(
+            [("chat_id", ASCENDING), ("user_id", ASCENDING)],
+            name="chat_id_user_id",
+            unique=True,
+        ),
+    ]
 
     def __init__(self, chat_id: int) -> None:
         super().__init__(self.db_name)
         self.chat_id = chat_id
+        self.user_info = None
 
-    def __ensure_in_db(self, user_id: int):
-        chat_data = self.find_one(
-            {"chat_id": self.chat_id, "user_id": user_id},
-        )
-        if not chat_data:
-            new_data = {
-                "chat_id": self.chat_id,
-                "user_id": user_id,
-                "warns": [],
-                "num_warns": 0,
-            }
-            self.insert_one(new_data)
-            LOGGER.info(f"Initialized Warn Document for {user_id} in {self.chat_id}")
-            return new_data
-        return chat_data
-
-    def warn_user(self, user_id: int, warn_reason=None):
+    # All writes below are single atomic updates returning the post-image,
+    # callers must use the returned count instead of reading it again.
+    async def warn_user(self, user_id: int, warn_reason=None):
         with INSERTION_LOCK:
-            self.user_info = self.__ensure_in_db(user_id)
-            warns = self.user_info["warns"] + [warn_reason]
-            num_warns = len(warns)
-            self.update(
+            self.user_info = await self.find_one_and_update(
                 {"chat_id": self.chat_id, "user_id": user_id},
-                {"warns": warns, "num_warns": num_warns},
+                {"$push": {"warns": warn_reason}, "$inc": {"num_warns": 1}},
+                {},
             )
-            return warns, num_warns
+            return self.user_info["warns"], self.user_info["num_warns"]
 
-    def remove_warn(self, user_id: int):
+    async def remove_warn(self, user_id: int):
         with INSERTION_LOCK:
-            self.user_info = self.__ensure_in_db(user_id)
-            curr_warns = self.user_info["warns"][:-1]
-            num_warns = len(curr_warns)
-            self.update(
-                {"chat_id": self.chat_id, "user_id": user_id},
-                {"warns": curr_warns, "num_warns": num_warns},
+            self.user_info = await self.find_one_and_update(
+                {
+                    "chat_id": self.chat_id,
+                    "user_id": user_id,
+                    "num_warns": {"$gt": 0},
+                },
+                {"$pop": {"warns": 1}, "$inc": {"num_warns": -1}},
             )
-            return curr_warns, num_warns
+            if not self.user_info:
+                # User had no warns to remove
+                return False
+            return self.user_info["warns"], self.user_info["num_warns"]
 
-    def reset_warns(self, user_id: int):
+    async def reset_warns(self, user_id: int):
         with INSERTION_LOCK:
-            self.user_info = self.__ensure_in_db(user_id)
-            return self.delete_one(
+            self.user_info = None
+            return await self.delete_one(
                 {"chat_id": self.chat_id, "user_id": user_id},
             )
 
-    def get_warns(self, user_id: int):
+    async def get_warns(self, user_id: int):
         with INSERTION_LOCK:
-            self.user_info = self.__ensure_in_db(user_id)
-            return self.user_info["warns"], len(self.user_info["warns"])
+            self.user_info = await self.find_one(
+                {"chat_id": self.chat_id, "user_id": user_id},
+            )
+            if not self.user_info:
+                return [], 0
+            return self.user_info["warns"], self.user_info["num_warns"]
 
     @staticmethod
-    def count_all_chats_using_warns():
+    async def count_all_chats_using_warns():
         with INSERTION_LOCK:
             collection = MongoDB(Warns.db_name)
-            curr = collection.find_all()
-            return len({i["chat_id"] for i in curr})
+            return await collection.aggregate_count(
+                [{"$group": {"_id": "$chat_id"}}, {"$count": "count"}],
+            )
 
     @staticmethod
-    def count_warned_users():
+    async def count_warned_users():
         with INSERTION_LOCK:
             collection = MongoDB(Warns.db_name)
-            curr = collection.find_all()
-            return len({i["user_id"] for i in curr if i["num_warns"] >= 1})
+            return await collection.aggregate_count(
+                [
+                    {"$match": {"num_warns": {"$gte": 1}}},
+                    {"$group": {"_id": "$user_id"}},
+                    {"$count": "count"},
+                ],
+            )
 
     @staticmethod
-    def count_warns_total():
+    async def count_warns_total():
         with INSERTION_LOCK:
             collection = MongoDB(Warns.db_name)
-            curr = collection.find_all()
-            return sum(i["num_warns"] for i in curr if i["num_warns"] >= 1)
+            return await collection.aggregate_count(
+                [
+                    {"$match": {"num_warns": {"$gte": 1}}},
+                    {"$group": {"_id": None, "count": {"$sum": "$num_warns"}}},
+                ],
+            )
 
-    @staticmethod
-    def repair_db(collection):
-        all_data = collection.find_all()
-        keys = {
-            "warns": [],
-            "num_warns": 0,
-        }
-        for data in all_data:
-            for key, val in keys.items():
-                try:
-                    _ = data[key]
-                except KeyError:
-                    LOGGER.warning(
-                        f"Repairing Approve Database - setting '{key}:{val}' for {data['user_id']} in {data['chat_id']}",
-                    )
-                    collection.update(
-                        {"chat_id": data["chat_id"], "user_id": data["user_id"]},
-                        {key: val},
-                    )
+
+@migration_step(Warns.db_name, 2)
+async def make_warns_unique():
+    """Merge duplicate warn documents and drop the old non-unique index."""
+    collection = MongoDB(Warns.db_name)
+    duplicates = await collection.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {"chat_id": "$chat_id", "user_id": "$user_id"},
+                    "ids": {"$push": "$_id"},
+                    "warns": {"$push": "$warns"},
+                    "count": {"$sum": 1},
+                },
+            },
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+    )
+    for dup in duplicates:
+        warns = [warn for warns in dup["warns"] for warn in (warns or [])]
+        await collection.update(
+            {"_id": dup["ids"][0]},
+            {"warns": warns, "num_warns": len(warns)},
+        )
+        await collection.delete_many({"_id": {"$in": dup["ids"][1:]}})
+    try:
+        await collection.drop_index("chat_id_user_id")
+    except OperationFailure:
+        # Index does not exist yet on new databases
+        pass
+    LOGGER.info(f"Merged {len(duplicates)} duplicate warn documents")
+    return len(duplicates)
 
 
 class WarnSettings(MongoDB):
     db_name = "chat_warn_settings"
+    chat_field = "_id"
+    cache_settings = True
+    schema_version = 1
+    schema_defaults = {"warn_mode": "none", "warn_limit": 3}
 
     def __init__(self, chat_id: int) -> None:
         super().__init__(self.db_name)
         self.chat_id = chat_id
-        self.chat_info = self.__ensure_in_db()
-
-    def __ensure_in_db(self):
-        chat_data = self.find_one({"_id": self.chat_id})
-        if not chat_data:
-            new_data = {"_id": self.chat_id, "warn_mode": "none", "warn_limit": 3}
-            self.insert_one(new_data)
-            LOGGER.info(f"Initialized Warn Settings Document for {self.chat_id}")
-            return new_data
-        return chat_data
-
-    def get_warnings_settings(self):
+        self.chat_info = None
+
+    async def __ensure_in_db(self):
+        if self.chat_info is None:
+            self.chat_info = await self.get_settings_doc(self.chat_id, self.defaults)
+        return self.chat_info
+
+    async def get_warnings_settings(self):
         with INSERTION_LOCK:
-            return self.chat_info
+            return await self.__ensure_in_db()
 
-    def set_warnmode(self, warn_mode: str = "none"):
+    async def set_warnmode(self, warn_mode: str = "none"):
         with INSERTION_LOCK:
-            self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"warn_mode": warn_mode},
+                self.defaults,
             )
             return warn_mode
 
-    def get_warnmode(self):
+    async def get_warnmode(self):
         with INSERTION_LOCK:
-            return self.chat_info["warn_mode"]
+            return (await self.__ensure_in_db())["warn_mode"]
 
-    def set_warnlimit(self, warn_limit: int = 3):
+    async def set_warnlimit(self, warn_limit: int = 3):
         with INSERTION_LOCK:
-            self.update(
+            self.chat_info = await self.upsert(
                 {"_id": self.chat_id},
                 {"warn_limit": warn_limit},
+                self.defaults,
             )
             return warn_limit
 
-    def get_warnlimit(self):
+    async def get_warnlimit(self):
         with INSERTION_LOCK:
-            return self.chat_info["warn_limit"]
+            return (await self.__ensure_in_db())["warn_limit"]
 
     @staticmethod
-    def count_action_chats(mode: str):
+    async def count_action_chats(mode: str):
         collection = MongoDB(WarnSettings.db_name)
-        return collection.count({"warn_mode": mode})
-
-    @staticmethod
-    def repair_db(collection):
-        all_data = collection.find_all()
-        keys = {"warn_mode": "none", "warn_limit": 3}
-        for data in all_data:
-            for key, val in keys.items():
-                try:
-                    _ = data[key]
-                except KeyError:
-                    LOGGER.warning(
-                        f"Repairing Approve Database - setting '{key}:{val}' for {data['_id']}",
-                    )
-                    collection.update({"_id": data["_id"]}, {key: val})
-
-
-def __pre_req_warns():
-    start = time()
-    LOGGER.info("Starting Warns Database Repair...")
-    collection_warns = MongoDB(Warns.db_name)
-    collection_warn_settings = MongoDB(WarnSettings.db_name)
-    Warns.repair_db(collection_warns)
-    WarnSettings.repair_db(collection_warn_settings)
-    LOGGER.info(f"Done in {round((time() - start), 3)}s!")
+        return await collection.count({"warn_mode": mode})
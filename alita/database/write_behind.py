@@ -0,0 +1,169 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from asyncio import CancelledError, create_task, sleep
+from time import perf_counter, time
+from traceback import format_exc
+
+from cachetools import TTLCache
+from pymongo import UpdateOne
+
+from ineruki import LOGGER
+from ineruki.database import MongoDB
+from ineruki.database.chats_db import ChatMembers, Chats
+from ineruki.database.users_db import Users
+
+# Seconds between two flushes of the buffer
+FLUSH_INTERVAL = 10
+# Flush early if this many distinct users are waiting to be written
+MAX_PENDING = 5000
+
+# Pending writes, keyed by document id
+PENDING_CHATS = {}
+PENDING_USERS = {}
+
+# What was last written, so unchanged users/chats don't get written again
+FLUSHED_CACHE = TTLCache(maxsize=100000, ttl=(60 * 60), timer=perf_counter)
+
+_FLUSH_TASK = None
+# Flush started early because the buffer is full, at most one at a time
+_EARLY_FLUSH = None
+
+
+def track_user(chat_id: int, chat_name: str, user_id: int, name: str, username: str):
+    """Buffer a 'user seen in chat with name' event, written later in bulk."""
+    global _EARLY_FLUSH
+    if FLUSHED_CACHE.get(("chat", chat_id, user_id)) != chat_name:
+        try:
+            pending = PENDING_CHATS[chat_id]
+        except KeyError:
+            pending = PENDING_CHATS[chat_id] = {"chat_name": chat_name, "users": set()}
+        pending["chat_name"] = chat_name
+        pending["users"].add(user_id)
+
+    if FLUSHED_CACHE.get(("user", user_id)) != (name, username):
+        PENDING_USERS[user_id] = (name, username)
+
+    if len(PENDING_USERS) >= MAX_PENDING and (
+        _EARLY_FLUSH is None or _EARLY_FLUSH.done()
+    ):
+        _EARLY_FLUSH = create_task(flush())
+
+
+async def flush():
+    """Write every buffered event to database using bulk upserts."""
+    global PENDING_CHATS, PENDING_USERS
+    if not (PENDING_CHATS or PENDING_USERS):
+        return
+
+    # Swap buffers first so events arriving during the write are kept
+    chats, PENDING_CHATS = PENDING_CHATS, {}
+    users, PENDING_USERS = PENDING_USERS, {}
+
+    start = time()
+    chat_ops = [
+        __upsert_op(chat_id, {"chat_name": data["chat_name"]}, Chats.defaults)
+        for chat_id, data in chats.items()
+    ]
+    member_ops = [
+        ChatMembers.member_op(chat_id, user_id)
+        for chat_id, data in chats.items()
+        for user_id in data["users"]
+    ]
+    user_ops = [
+        __upsert_op(
+            user_id,
+            {"name": name, "username": username},
+            Users.defaults,
+        )
+        for user_id, (name, username) in users.items()
+    ]
+
+    try:
+        await MongoDB(Chats.db_name).bulk_write(chat_ops)
+        await MongoDB(ChatMembers.db_name).bulk_write(member_ops)
+        await MongoDB(Users.db_name).bulk_write(user_ops)
+    except Exception as ef:
+        LOGGER.error(ef)
+        LOGGER.error(format_exc())
+        __requeue(chats, users)
+        return
+
+    for chat_id, data in chats.items():
+        for user_id in data["users"]:
+            FLUSHED_CACHE[("chat", chat_id, user_id)] = data["chat_name"]
+    for user_id, data in users.items():
+        FLUSHED_CACHE[("user", user_id)] = data
+
+    LOGGER.debug(
+        f"Flushed {len(chat_ops)} chats, {len(member_ops)} memberships and {len(user_ops)} users in {round((time() - start), 3)}s",
+    )
+
+
+def __upsert_op(_id, fields: dict, defaults: dict):
+    """Upsert setting fields, new documents also get the schema defaults."""
+    update = {"$set": fields}
+    on_insert = {k: v for k, v in defaults.items() if k not in fields}
+    if on_insert:
+        update["$setOnInsert"] = on_insert
+    return UpdateOne({"_id": _id}, update, upsert=True)
+
+
+def __requeue(chats: dict, users: dict):
+    """Put back events of a failed flush, newer events take precedence."""
+    for chat_id, data in chats.items():
+        try:
+            PENDING_CHATS[chat_id]["users"].update(data["users"])
+        except KeyError:
+            PENDING_CHATS[chat_id] = data
+    for user_id, data in users.items():
+        PENDING_USERS.setdefault(user_id, data)
+
+
+async def __flush_loop():
+    while True:
+        await sleep(FLUSH_INTERVAL)
+        try:
+            await flush()
+        except CancelledError:
+            raise
+        except Exception as ef:
+            LOGGER.error(ef)
+            LOGGER.error(format_exc())
+
+
+def start_writer():
+    """Start the periodic flush task on the running loop."""
+    global _FLUSH_TASK
+    if _FLUSH_TASK is None:
+        _FLUSH_TASK = create_task(__flush_loop())
+        LOGGER.info(f"Started write-behind writer, flushing every {FLUSH_INTERVAL}s")
+
+
+async def stop_writer():
+    """Stop the periodic flush task and write whatever is still buffered."""
+    global _FLUSH_TASK
+    if _FLUSH_TASK is not None:
+        _FLUSH_TASK.cancel()
+        try:
+            await _FLUSH_TASK
+        except CancelledError:
+            pass
+        _FLUSH_TASK = None
+    await flush()
+    LOGGER.info("Flushed write-behind buffer")
@@ -30,6 +30,7 @@ from traceback import format_exc
 from ineruki import LOGGER, SUPPORT_GROUP, SUPPORT_STAFF
 from ineruki.bot_class import Ineruki
 from ineruki.database.approve_db import Approve
+from ineruki.database.cache_bus import publish
 from ineruki.database.reporting_db import Reporting
 from ineruki.tr_engine import tlang
 from ineruki.utils.caching import ADMIN_CACHE, TEMP_ADMIN_CACHE_BLOCK, admin_cache_reload
@@ -121,6 +122,7 @@ async def reload_admins(_, m: Message):
     try:
         await admin_cache_reload(m, "admincache")
         TEMP_ADMIN_CACHE_BLOCK[m.chat.id] = "manualblock"
+        publish("admins", m.chat.id)
         await m.reply_text(tlang(m, "admin.adminlist.reloaded_admins"))
         LOGGER.info(f"Admincache cmd use in {m.chat.id} by {m.from_user.id}")
     except RPCError as ef:
@@ -138,7 +140,7 @@ async def reload_admins(_, m: Message):
 @Ineruki.on_message(filters.regex(r"^(?i)@admin(s)?") & filters.group)
 async def tag_admins(_, m: Message):
     db = Reporting(m.chat.id)
-    if not db.get_settings():
+    if not await db.get_settings():
         return
 
     try:
@@ -232,8 +234,8 @@ async def promote_usr(c: Ineruki, m: Message):
         )
 
         # If user is approved, disapprove them as they willbe promoted and get even more rights
-        if Approve(m.chat.id).check_approve(user_id):
-            Approve(m.chat.id).remove_approve(user_id)
+        if await Approve(m.chat.id).check_approve(user_id):
+            await Approve(m.chat.id).remove_approve(user_id)
 
         # ----- Add admin to temp cache -----
         try:
@@ -243,6 +245,7 @@ async def promote_usr(c: Ineruki, m: Message):
             ADMIN_CACHE[m.chat.id] = admins_group
         except KeyError:
             await admin_cache_reload(m, "promote_key_error")
+        publish("admins", m.chat.id)
 
     except ChatAdminRequired:
         await m.reply_text(tlang(m, "admin.not_admin"))
@@ -317,6 +320,7 @@ async def demote_usr(c: Ineruki, m: Message):
             ADMIN_CACHE[m.chat.id] = admin_list
         except (KeyError, StopIteration):
             await admin_cache_reload(m, "demote_key_stopiter_error")
+        publish("admins", m.chat.id)
 
         await m.reply_text(
             (tlang(m, "admin.demote.demoted_user")).format(
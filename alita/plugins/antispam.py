@@ -17,17 +17,17 @@
 
 
 from datetime import datetime
+from gzip import GzipFile
 from io import BytesIO
 from pyrogram.errors import MessageTooLong, PeerIdInvalid, UserIsBlocked
 from pyrogram.types import Message
+from time import time
 from traceback import format_exc
 
 from ineruki import BOT_ID, LOGGER, MESSAGE_DUMP, SUPPORT_GROUP, SUPPORT_STAFF
 from ineruki.bot_class import Ineruki
 from ineruki.database.antispam_db import GBan
-from ineruki.database.users_db import Users
 from ineruki.tr_engine import tlang
-from ineruki.utils.clean_file import remove_markdown_and_html
 from ineruki.utils.custom_filters import command
 from ineruki.utils.extract_user import extract_user
 from ineruki.utils.parser import mention_html
@@ -35,6 +35,9 @@ from ineruki.utils.parser import mention_html
 # Initialize
 db = GBan()
 
+# Lists longer than this are always exported as a file
+GBAN_LIST_INLINE = 50
+
 
 @Ineruki.on_message(command(["gban", "globalban"], sudo_cmd=True))
 async def gban(c: Ineruki, m: Message):
@@ -61,8 +64,8 @@ async def gban(c: Ineruki, m: Message):
         await m.reply_text(tlang(m, "antispam.gban.not_self"))
         return
 
-    if db.check_gban(user_id):
-        db.update_gban_reason(user_id, gban_reason)
+    if await db.check_gban(user_id):
+        await db.update_gban_reason(user_id, gban_reason)
         await m.reply_text(
             (tlang(m, "antispam.gban.updated_reason")).format(
                 gban_reason=gban_reason,
@@ -70,7 +73,7 @@ async def gban(c: Ineruki, m: Message):
         )
         return
 
-    db.add_gban(user_id, gban_reason, m.from_user.id)
+    await db.add_gban(user_id, gban_reason, m.from_user.id)
     await m.reply_text(
         (tlang(m, "antispam.gban.added_to_watch")).format(
             first_name=user_first_name,
@@ -124,8 +127,8 @@ async def ungban(c: Ineruki, m: Message):
         await m.reply_text(tlang(m, "antispam.ungban.not_self"))
         return
 
-    if db.check_gban(user_id):
-        db.remove_gban(user_id)
+    if await db.check_gban(user_id):
+        await db.remove_gban(user_id)
         await m.reply_text(
             (tlang(m, "antispam.ungban.removed_from_list")).format(
                 first_name=user_first_name,
@@ -160,7 +163,7 @@ async def ungban(c: Ineruki, m: Message):
 )
 async def gban_count(_, m: Message):
     await m.reply_text(
-        (tlang(m, "antispam.num_gbans")).format(count=(db.count_gbans())),
+        (tlang(m, "antispam.num_gbans")).format(count=(await db.count_gbans())),
     )
     LOGGER.info(f"{m.from_user.id} counting gbans in {m.chat.id}")
     return
@@ -170,28 +173,58 @@ async def gban_count(_, m: Message):
     command(["gbanlist", "globalbanlist"], sudo_cmd=True),
 )
 async def gban_list(_, m: Message):
-    banned_users = db.load_from_db()
+    total = await db.count_gbans()
 
-    if not banned_users:
+    if not total:
         await m.reply_text(tlang(m, "antispam.none_gbanned"))
         return
 
-    banfile = tlang(m, "antispam.here_gbanned_start")
-    for user in banned_users:
-        banfile += f"[x] <b>{Users.get_user_info(user['_id'])['name']}</b> - <code>{user['_id']}</code>\n"
-        if user["reason"]:
-            banfile += f"<b>Reason:</b> {user['reason']}\n"
-
-    try:
-        await m.reply_text(banfile)
-    except MessageTooLong:
-        with BytesIO(str.encode(await remove_markdown_and_html(banfile))) as f:
-            f.name = "gbanlist.txt"
-            await m.reply_document(
-                document=f,
-                caption=tlang(m, "antispam.here_gbanned_start"),
-            )
+    if total <= GBAN_LIST_INLINE:
+        banfile = tlang(m, "antispam.here_gbanned_start")
+        async for batch in db.iter_gbans():
+            for user_id, name, reason in batch:
+                banfile += f"[x] <b>{name}</b> - <code>{user_id}</code>\n"
+                if reason:
+                    banfile += f"<b>Reason:</b> {reason}\n"
+        try:
+            await m.reply_text(banfile)
+            LOGGER.info(f"{m.from_user.id} exported gbanlist in {m.chat.id}")
+            return
+        except MessageTooLong:
+            pass
 
+    await __export_gban_file(m, total)
     LOGGER.info(f"{m.from_user.id} exported gbanlist in {m.chat.id}")
 
     return
+
+
+async def __export_gban_file(m: Message, total: int):
+    """Stream gbans into a gzip compressed file, editing a progress message."""
+    start = last_edit = time()
+    exported = 0
+    status = await m.reply_text(f"Exporting {total} gbanned users...")
+    f = BytesIO()
+    with GzipFile(fileobj=f, mode="wb") as gz:
+        gz.write(tlang(m, "antispam.here_gbanned_start").encode())
+        async for batch in db.iter_gbans():
+            gz.write(
+                "".join(
+                    f"[x] {name} - {user_id}\n"
+                    + (f"Reason: {reason}\n" if reason else "")
+                    for user_id, name, reason in batch
+                ).encode(),
+            )
+            exported += len(batch)
+            if time() - last_edit >= 5:
+                last_edit = time()
+                await status.edit_text(f"Exported {exported}/{total} gbanned users...")
+    f.seek(0)
+    f.name = "gbanlist.txt.gz"
+    await m.reply_document(
+        document=f,
+        caption=tlang(m, "antispam.here_gbanned_start"),
+    )
+    await status.edit_text(
+        f"Exported {exported} gbanned users in {round((time() - start), 3)}s",
+    )
@@ -58,13 +58,13 @@ async def approve_user(c: Ineruki, m: Message):
             "User is already admin - blacklists and locks already don't apply to them.",
         )
         return
-    already_approved = db.check_approve(user_id)
+    already_approved = await db.check_approve(user_id)
     if already_approved:
         await m.reply_text(
             f"{(await mention_html(user_first_name, user_id))} is already approved in {chat_title}",
         )
         return
-    db.add_approve(user_id, user_first_name)
+    await db.add_approve(user_id, user_first_name)
     LOGGER.info(f"{user_id} approved by {m.from_user.id} in {m.chat.id}")
 
     # Allow all permissions
@@ -102,7 +102,7 @@ async def disapprove_user(c: Ineruki, m: Message):
 
     chat_title = m.chat.title
     user_id, user_first_name, _ = await extract_user(c, m)
-    already_approved = db.check_approve(user_id)
+    already_approved = await db.check_approve(user_id)
     if not user_id:
         await m.reply_text(
             "I don't know who you're talking about, you're going to need to specify a user!",
@@ -112,7 +112,7 @@ async def disapprove_user(c: Ineruki, m: Message):
         member = await m.chat.get_member(user_id)
     except UserNotParticipant:
         if already_approved:  # If user is approved and not in chat, unapprove them.
-            db.remove_approve(user_id)
+            await db.remove_approve(user_id)
             LOGGER.info(f"{user_id} disapproved in {m.chat.id} as UserNotParticipant")
         await m.reply_text("This user is not in this chat, unapproved them.")
         return
@@ -132,7 +132,7 @@ async def disapprove_user(c: Ineruki, m: Message):
         )
         return
 
-    db.remove_approve(user_id)
+    await db.remove_approve(user_id)
     LOGGER.info(f"{user_id} disapproved by {m.from_user.id} in {m.chat.id}")
 
     # Set permission same as of current user by fetching them from chat!
@@ -154,7 +154,7 @@ async def check_approved(_, m: Message):
     chat = m.chat
     chat_title = chat.title
     msg = "The following users are approved:\n"
-    approved_people = db.list_approved()
+    approved_people = await db.list_approved()
 
     if not approved_people:
         await m.reply_text(f"No users are approved in {chat_title}.")
@@ -164,7 +164,7 @@ async def check_approved(_, m: Message):
         try:
             await chat.get_member(user_id)  # Check if user is in chat or not
         except UserNotParticipant:
-            db.remove_approve(user_id)
+            await db.remove_approve(user_id)
             continue
         except PeerIdInvalid:
             pass
@@ -179,7 +179,7 @@ async def check_approval(c: Ineruki, m: Message):
     db = Approve(m.chat.id)
 
     user_id, user_first_name, _ = await extract_user(c, m)
-    check_approve = db.check_approve(user_id)
+    check_approve = await db.check_approve(user_id)
     LOGGER.info(f"{m.from_user.id} checking approval of {user_id} in {m.chat.id}")
 
     if not user_id:
@@ -204,7 +204,7 @@ async def check_approval(c: Ineruki, m: Message):
 async def unapproveall_users(_, m: Message):
     db = Approve(m.chat.id)
 
-    all_approved = db.list_approved()
+    all_approved = await db.list_approved()
     if not all_approved:
         await m.reply_text("No one is approved in this chat.")
         return
@@ -222,7 +222,7 @@ async def unapproveall_users(_, m: Message):
 async def unapproveall_callback(_, q: CallbackQuery):
     user_id = q.from_user.id
     db = Approve(q.message.chat.id)
-    approved_people = db.list_approved()
+    approved_people = await db.list_approved()
     user_status = (await q.message.chat.get_member(user_id)).status
     if user_status not in {"creator", "administrator"}:
         await q.answer(
@@ -236,7 +236,7 @@ async def unapproveall_callback(_, q: CallbackQuery):
             show_alert=True,
         )
         return
-    db.unapprove_all()
+    await db.unapprove_all()
     for i in approved_people:
         await q.message.chat.restrict_member(
             user_id=i[0],
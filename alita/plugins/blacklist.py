@@ -38,7 +38,7 @@ async def view_blacklist(_, m: Message):
     blacklists_chat = (tlang(m, "blacklist.curr_blacklist_initial")).format(
         chat_title=chat_title,
     )
-    all_blacklisted = db.get_blacklists()
+    all_blacklisted = await db.get_blacklists()
 
     if not all_blacklisted:
         await m.reply_text(
@@ -65,14 +65,14 @@ async def add_blacklist(_, m: Message):
         return
 
     bl_words = ((m.text.split(None, 1)[1]).lower()).split()
-    all_blacklisted = db.get_blacklists()
+    all_blacklisted = await db.get_blacklists()
     already_added_words, rep_text = [], ""
 
     for bl_word in bl_words:
         if bl_word in all_blacklisted:
             already_added_words.append(bl_word)
             continue
-        db.add_blacklist(bl_word)
+        await db.add_blacklist(bl_word)
 
     if already_added_words:
         rep_text = (
@@ -97,13 +97,13 @@ async def blacklistreason(_, m: Message):
     db = Blacklist(m.chat.id)
 
     if len(m.text.split()) == 1:
-        curr = db.get_reason()
+        curr = await db.get_reason()
         await m.reply_text(
             f"The current reason for blacklists warn is:\n<code>{curr}</code>",
         )
     else:
         reason = m.text.split(None, 1)[1]
-        db.set_reason(reason)
+        await db.set_reason(reason)
         await m.reply_text(
             f"Updated reason for blacklists warn is:\n<code>{reason}</code>",
         )
@@ -120,7 +120,7 @@ async def rm_blacklist(_, m: Message):
         await m.reply_text(tlang(m, "general.check_help"))
         return
 
-    chat_bl = db.get_blacklists()
+    chat_bl = await db.get_blacklists()
     non_found_words, rep_text = [], ""
     bl_words = ((m.text.split(None, 1)[1]).lower()).split()
 
@@ -128,7 +128,7 @@ async def rm_blacklist(_, m: Message):
         if bl_word not in chat_bl:
             non_found_words.append(bl_word)
             continue
-        db.remove_blacklist(bl_word)
+        await db.remove_blacklist(bl_word)
 
     if non_found_words == bl_words:
         return await m.reply_text("Blacklists not found!")
@@ -168,7 +168,7 @@ async def set_bl_action(_, m: Message):
             )
 
             return
-        db.set_action(action)
+        await db.set_action(action)
         LOGGER.info(
             f"{m.from_user.id} set blacklist action to '{action}' in {m.chat.id}",
         )
@@ -176,7 +176,7 @@ async def set_bl_action(_, m: Message):
             (tlang(m, "blacklist.action_set")).format(action=action),
         )
     elif len(m.text.split()) == 1:
-        action = db.get_action()
+        action = await db.get_action()
         LOGGER.info(f"{m.from_user.id} checking blacklist action in {m.chat.id}")
         await m.reply_text(
             (tlang(m, "blacklist.action_get")).format(action=action),
@@ -193,7 +193,7 @@ async def set_bl_action(_, m: Message):
 async def rm_allblacklist(_, m: Message):
     db = Blacklist(m.chat.id)
 
-    all_bls = db.get_blacklists()
+    all_bls = await db.get_blacklists()
     if not all_bls:
         await m.reply_text("No notes are blacklists in this chat")
         return
@@ -224,7 +224,7 @@ async def rm_allbl_callback(_, q: CallbackQuery):
             show_alert=True,
         )
         return
-    db.rm_all_blacklist()
+    await db.rm_all_blacklist()
     await q.message.delete()
     LOGGER.info(f"{user_id} removed all blacklists in {q.message.chat.id}")
     await q.answer("Cleared all Blacklists!", show_alert=True)
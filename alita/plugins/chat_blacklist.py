@@ -39,7 +39,7 @@ async def blacklist_chat(c: Ineruki, m: Message):
             try:
                 get_chat = await c.get_chat(chat)
                 chat_id = get_chat.id
-                db.add_chat(chat_id)
+                await db.add_chat(chat_id)
             except PeerIdInvalid:
                 await replymsg.edit_text(
                     "Haven't seen this group in this session, maybe try again later?",
@@ -61,7 +61,7 @@ async def unblacklist_chat(c: Ineruki, m: Message):
         chat_ids = m.text.split()[1:]
         replymsg = await m.reply_text(f"Removing {len(chat_ids)} chats from blacklist")
         LOGGER.info(f"{m.from_user.id} removed blacklisted {chat_ids} groups for bot")
-        bl_chats = db.list_all_chats()
+        bl_chats = await db.list_all_chats()
         for chat in chat_ids:
             try:
                 get_chat = await c.get_chat(chat)
@@ -69,7 +69,7 @@ async def unblacklist_chat(c: Ineruki, m: Message):
                 if chat_id not in bl_chats:
                     # If chat is not blaklisted, continue loop
                     continue
-                db.remove_chat(chat_id)
+                await db.remove_chat(chat_id)
             except PeerIdInvalid:
                 await replymsg.edit_text(
                     "Haven't seen this group in this session, maybe try again later?",
@@ -87,7 +87,7 @@ async def unblacklist_chat(c: Ineruki, m: Message):
     command(["blchatlist", "blchats"], dev_cmd=True),
 )
 async def list_blacklist_chats(_, m: Message):
-    bl_chats = db.list_all_chats()
+    bl_chats = await db.list_all_chats()
     LOGGER.info(f"{m.from_user.id} checking group blacklists in {m.chat.id}")
     if bl_chats:
         txt = (
@@ -30,7 +30,6 @@ from pyrogram.errors import (
 )
 from pyrogram.types import Message
 from pyromod.helpers import ikb
-from speedtest import Speedtest
 from time import gmtime, strftime, time
 from traceback import format_exc
 
@@ -104,6 +103,9 @@ async def test_speed(c: Ineruki, m: Message):
         f"#SPEEDTEST\n\n**User:** {(await mention_markdown(m.from_user.first_name, m.from_user.id))}",
     )
     sent = await m.reply_text(tlang(m, "dev.speedtest.start_speedtest"))
+    # Imported on first use, most instances never run a speedtest
+    from speedtest import Speedtest
+
     s = Speedtest()
     bs = s.get_best_server()
     dl = round(s.download() / 1024 / 1024, 2)
@@ -274,7 +276,7 @@ async def chats(c: Ineruki, m: Message):
         MESSAGE_DUMP,
         f"#CHATLIST\n\n**User:** {(await mention_markdown(m.from_user.first_name, m.from_user.id))}",
     )
-    all_chats = (Chats.list_chats_full()) or {}
+    all_chats = (await Chats.list_chats_full()) or {}
     chatfile = tlang(m, "dev.chatlist.header")
     P = 1
     for chat in all_chats:
@@ -290,7 +292,7 @@ async def chats(c: Ineruki, m: Message):
         except ChatAdminRequired:
             pass
         except (ChannelPrivate, ChannelInvalid):
-            Chats.remove_chat(chat["_id"])
+            await Chats.remove_chat(chat["_id"])
         except PeerIdInvalid:
             LOGGER.warning(f"Peer not found {chat['_id']}")
         except FloodWait as ef:
@@ -348,7 +350,7 @@ async def chat_broadcast(c: Ineruki, m: Message):
         return
 
     exmsg = await m.reply_text("Started broadcasting!")
-    all_chats = (Chats.list_chats_by_id()) or {}
+    all_chats = (await Chats.list_chats_by_id()) or {}
     err_str, done_broadcast = "", 0
 
     for chat in all_chats:
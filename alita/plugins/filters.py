@@ -20,8 +20,6 @@ from pyrogram import filters
 from pyrogram.errors import RPCError
 from pyrogram.types import CallbackQuery, Message
 from pyromod.helpers import ikb
-from re import escape as re_escape
-from secrets import choice
 from traceback import format_exc
 
 from ineruki.bot_class import LOGGER, Ineruki
@@ -29,24 +27,23 @@ from ineruki.database.filters_db import Filters
 from ineruki.utils.cmd_senders import send_cmd
 from ineruki.utils.custom_filters import admin_filter, command, owner_filter
 from ineruki.utils.msg_types import Types, get_filter_type
-from ineruki.utils.regex_utils import regex_searcher
-from ineruki.utils.string import (
-    build_keyboard,
-    escape_mentions_using_curly_brackets,
-    parse_button,
-    split_quotes,
-)
+from ineruki.utils.reply_template import get_template
+from ineruki.utils.string import parse_button, split_quotes
 
 # Initialise
 db = Filters()
 
+# Per chat limits, matching cost does not grow with the number of aliases
+MAX_FILTERS = 500
+MAX_ALIASES = 1500
+
 
 @Ineruki.on_message(command("filters") & filters.group)
 async def view_filters(_, m: Message):
     LOGGER.info(f"{m.from_user.id} checking filters in {m.chat.id}")
 
     filters_chat = f"Filters in <b>{m.chat.title}</b>:\n"
-    all_filters = db.get_all_filters(m.chat.id)
+    all_filters = await db.get_all_filters(m.chat.id)
     actual_filters = [j for i in all_filters for j in i.split("|")]
 
     if not actual_filters:
@@ -68,12 +65,13 @@ async def view_filters(_, m: Message):
 )
 async def add_filter(_, m: Message):
     args = m.text.split(None, 1)
-    all_filters = db.get_all_filters(m.chat.id)
+    all_filters = await db.get_all_filters(m.chat.id)
     actual_filters = {j for i in all_filters for j in i.split("|")}
 
-    if (len(all_filters) >= 50) and (len(actual_filters) >= 120):
+    if (len(all_filters) >= MAX_FILTERS) or (len(actual_filters) >= MAX_ALIASES):
         await m.reply_text(
-            "Only 50 filters and 120 aliases are allowed per chat!\nTo  add more filters, remove the existing ones.",
+            f"Only {MAX_FILTERS} filters and {MAX_ALIASES} aliases are allowed per chat!\n"
+            "To  add more filters, remove the existing ones.",
         )
         return
 
@@ -140,7 +138,9 @@ async def add_filter(_, m: Message):
         await m.reply_text("Invalid filter!")
         return
 
-    add = db.save_filter(m.chat.id, keyword, teks, msgtype, file_id)
+    add = await db.save_filter(m.chat.id, keyword, teks, msgtype, file_id)
+    # Compile the reply now, not when the filter first fires
+    await get_template(teks)
     LOGGER.info(f"{m.from_user.id} added new filter ({keyword}) in {m.chat.id}")
     if add:
         await m.reply_text(
@@ -159,7 +159,7 @@ async def stop_filter(_, m: Message):
         await m.reply_text("What should I stop replying to?")
         return
 
-    chat_filters = db.get_all_filters(m.chat.id)
+    chat_filters = await db.get_all_filters(m.chat.id)
     act_filters = {j for i in chat_filters for j in i.split("|")}
 
     if not chat_filters:
@@ -168,7 +168,7 @@ async def stop_filter(_, m: Message):
 
     for keyword in act_filters:
         if keyword == args[1]:
-            db.rm_filter(m.chat.id, args[1])
+            await db.rm_filter(m.chat.id, args[1])
             LOGGER.info(f"{m.from_user.id} removed filter ({keyword}) in {m.chat.id}")
             await m.reply_text(
                 f"Okay, I'll stop replying to that filter and it's aliases in <b>{m.chat.title}</b>.",
@@ -188,7 +188,7 @@ async def stop_filter(_, m: Message):
     & owner_filter,
 )
 async def rm_allfilters(_, m: Message):
-    all_bls = db.get_all_filters(m.chat.id)
+    all_bls = await db.get_all_filters(m.chat.id)
     if not all_bls:
         await m.reply_text("No filters to stop in this chat.")
         return
@@ -218,17 +218,15 @@ async def rm_allfilters_callback(_, q: CallbackQuery):
             show_alert=True,
         )
         return
-    db.rm_all_filters(q.message.chat.id)
+    await db.rm_all_filters(q.message.chat.id)
     await q.message.edit_text(f"Cleared all filters for {q.message.chat.title}")
     LOGGER.info(f"{user_id} removed all filter from {q.message.chat.id}")
     await q.answer("Cleared all Filters!", show_alert=True)
     return
 
 
-async def send_filter_reply(c: Ineruki, m: Message, trigger: str):
+async def send_filter_reply(c: Ineruki, m: Message, getfilter: dict):
     """Reply with assigned filter for the trigger"""
-    getfilter = db.get_filter(m.chat.id, trigger)
-
     if not getfilter:
         await m.reply_text(
             "<b>Error:</b> Cannot find a type for this filter!!",
@@ -241,29 +239,11 @@ async def send_filter_reply(c: Ineruki, m: Message, trigger: str):
         await m.reply_text("<b>Error:</b> Cannot find a type for this filter!!")
         return
 
-    try:
-        # support for random filter texts
-        splitter = "%%%"
-        filter_reply = getfilter["filter_reply"].split(splitter)
-        filter_reply = choice(filter_reply)
-    except KeyError:
-        filter_reply = ""
-
-    parse_words = [
-        "first",
-        "last",
-        "fullname",
-        "username",
-        "id",
-        "chatname",
-        "mention",
-    ]
-    text = await escape_mentions_using_curly_brackets(m, filter_reply, parse_words)
+    # Random variant with buttons parsed once when the filter was compiled
+    template = await get_template(getfilter.get("filter_reply"))
+    teks, button = await template.render(m)
 
     if msgtype == Types.TEXT:
-        teks, button = await parse_button(text)
-        button = await build_keyboard(button)
-        button = ikb(button) if button else None
         if button:
             try:
                 await m.reply_text(
@@ -300,7 +280,8 @@ async def send_filter_reply(c: Ineruki, m: Message, trigger: str):
         await (await send_cmd(c, msgtype))(
             m.chat.id,
             getfilter["fileid"],
-            caption=text,
+            caption=teks,
+            reply_markup=button,
             reply_to_message_id=m.message_id,
         )
     return msgtype
@@ -311,21 +292,19 @@ async def filters_watcher(c: Ineruki, m: Message):
     if not m.from_user:
         return
 
-    chat_filters = db.get_all_filters(m.chat.id)
-    actual_filters = {j for i in chat_filters for j in i.split("|")}
+    # Filter of the first alias in message, all aliases checked in one pass
+    getfilter = (await db.get_matcher(m.chat.id)).search(m.text)
+    if getfilter is None:
+        return
 
-    for trigger in actual_filters:
-        pattern = r"( |^|[^\w])" + re_escape(trigger) + r"( |$|[^\w])"
-        match = await regex_searcher(pattern, m.text.lower())
-        if match:
-            try:
-                msgtype = await send_filter_reply(c, m, trigger)
-                LOGGER.info(f"Replied with {msgtype} to {trigger} in {m.chat.id}")
-            except RPCError as ef:
-                LOGGER.error(ef)
-                LOGGER.error(format_exc())
-            break
-        continue
+    try:
+        msgtype = await send_filter_reply(c, m, getfilter)
+        LOGGER.info(
+            f"Replied with {msgtype} to {getfilter['keyword']} in {m.chat.id}",
+        )
+    except RPCError as ef:
+        LOGGER.error(ef)
+        LOGGER.error(format_exc())
     return
 
 
@@ -18,25 +18,17 @@
 
 from pyrogram import filters
 from pyrogram.errors import RPCError
-from pyrogram.types import Message
+from pyrogram.types import Message, User
 
 from ineruki import LOGGER
 from ineruki.bot_class import Ineruki
-from ineruki.database.approve_db import Approve
-from ineruki.database.blacklist_db import Blacklist
-from ineruki.database.chats_db import Chats
-from ineruki.database.filters_db import Filters
-from ineruki.database.lang_db import Langs
-from ineruki.database.notes_db import Notes, NotesSettings
-from ineruki.database.pins_db import Pins
-from ineruki.database.reporting_db import Reporting
-from ineruki.database.rules_db import Rules
-from ineruki.database.users_db import Users
+from ineruki.database.chat_migration import migrate_chat_data
+from ineruki.database.write_behind import track_user
+from ineruki.utils.caching import move_admin_cache
 
 
 @Ineruki.on_message(filters.group, group=4)
 async def initial_works(_, m: Message):
-    chatdb = Chats(m.chat.id)
     try:
         if m.migrate_to_chat_id or m.migrate_from_chat_id:
             new_chat = m.migrate_to_chat_id or m.chat.id
@@ -46,81 +38,34 @@ async def initial_works(_, m: Message):
                 LOGGER.error(ef)
                 return
         elif m.reply_to_message and not m.forward_from:
-            chatdb.update_chat(
-                m.chat.title,
-                m.reply_to_message.from_user.id,
-            )
-            Users(m.reply_to_message.from_user.id).update_user(
-                (
-                    f"{m.reply_to_message.from_user.first_name} {m.reply_to_message.from_user.last_name}"
-                    if m.reply_to_message.from_user.last_name
-                    else m.reply_to_message.from_user.first_name
-                ),
-                m.reply_to_message.from_user.username,
-            )
+            __track(m, m.reply_to_message.from_user)
         elif m.forward_from and not m.reply_to_message:
-            chatdb.update_chat(
-                m.chat.title,
-                m.forward_from.id,
-            )
-            Users(m.forward_from.id).update_user(
-                (
-                    f"{m.forward_from.first_name} {m.forward_from.last_name}"
-                    if m.forward_from.last_name
-                    else m.forward_from.first_name
-                ),
-                m.forward_from.username,
-            )
+            __track(m, m.forward_from)
         elif m.reply_to_message:
-            chatdb.update_chat(
-                m.chat.title,
-                m.reply_to_message.forward_from.id,
-            )
-            Users(m.forward_from.id).update_user(
-                (
-                    f"{m.reply_to_message.forward_from.first_name} {m.reply_to_message.forward_from.last_name}"
-                    if m.reply_to_message.forward_from.last_name
-                    else m.reply_to_message.forward_from.first_name
-                ),
-                m.forward_from.username,
-            )
+            __track(m, m.reply_to_message.forward_from)
         else:
-            chatdb.update_chat(m.chat.title, m.from_user.id)
-            Users(m.from_user.id).update_user(
-                (
-                    f"{m.from_user.first_name} {m.from_user.last_name}"
-                    if m.from_user.last_name
-                    else m.from_user.first_name
-                ),
-                m.from_user.username,
-            )
+            __track(m, m.from_user)
     except AttributeError:
         pass  # Skip attribute errors!
     return
 
 
+def __track(m: Message, user: User):
+    """Buffer chat membership and name of user, written to db in bulk."""
+    track_user(
+        m.chat.id,
+        m.chat.title,
+        user.id,
+        (f"{user.first_name} {user.last_name}" if user.last_name else user.first_name),
+        user.username,
+    )
+
+
 async def migrate_chat(m: Message, new_chat: int) -> None:
     LOGGER.info(f"Migrating from {m.chat.id} to {new_chat}...")
-    langdb = Langs(m.chat.id)
-    notedb = Notes()
-    ruledb = Rules(m.chat.id)
-    userdb = Users(m.chat.id)
-    chatdb = Chats(m.chat.id)
-    bldb = Blacklist(m.chat.id)
-    approvedb = Approve(m.chat.id)
-    reportdb = Reporting(m.chat.id)
-    notes_settings = NotesSettings()
-    pins_db = Pins(m.chat.id)
-    fldb = Filters()
-    chatdb.migrate_chat(new_chat)
-    userdb.migrate_chat(new_chat)
-    langdb.migrate_chat(new_chat)
-    ruledb.migrate_chat(new_chat)
-    bldb.migrate_chat(new_chat)
-    notedb.migrate_chat(m.chat.id, new_chat)
-    approvedb.migrate_chat(new_chat)
-    reportdb.migrate_chat(new_chat)
-    notes_settings.migrate_chat(m.chat.id, new_chat)
-    pins_db.migrate_chat(new_chat)
-    fldb.migrate_chat(m.chat.id, new_chat)
-    LOGGER.info(f"Successfully migrated from {m.chat.id} to {new_chat}!")
+    report = await migrate_chat_data(m.chat.id, new_chat)
+    move_admin_cache(m.chat.id, new_chat)
+    LOGGER.info(
+        f"Successfully migrated from {m.chat.id} to {new_chat} in {report['time']}s, "
+        f"moved: {report['moved'] or 'nothing'}",
+    )
@@ -76,7 +76,7 @@ async def close_btn_callback(_, q: CallbackQuery):
 async def set_lang_callback(_, q: CallbackQuery):
     lang_code = q.data.split(".")[1]
 
-    Langs(q.message.chat.id).set_lang(lang_code)
+    await Langs(q.message.chat.id).set_lang(lang_code)
     await sleep(0.1)
 
     if q.message.chat.type == "private":
@@ -109,7 +109,7 @@ async def set_lang(_, m: Message):
                 f"Please choose a valid language code from: {', '.join(avail_langs)}",
             )
             return
-        Langs(m.chat.id).set_lang(lang_code)
+        await Langs(m.chat.id).set_lang(lang_code)
         LOGGER.info(f"{m.from_user.id} change language to {lang_code} in {m.chat.id}")
         await m.reply_text(
             f"🌐 {((tlang(m, 'langs.changed')).format(lang_code=lang_code))}",
@@ -378,7 +378,7 @@ async def unlock_perm(c: Ineruki, m: Message):
 
 
 async def prevent_approved(m: Message):
-    approved_users = Approve(m.chat.id).list_approved()
+    approved_users = await Approve(m.chat.id).list_approved()
     ul = [user[0] for user in approved_users]
     for i in ul:
         await m.chat.restrict_member(
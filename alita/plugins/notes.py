@@ -20,7 +20,6 @@ from pyrogram import filters
 from pyrogram.errors import RPCError
 from pyrogram.types import CallbackQuery, Message
 from pyromod.helpers import ikb
-from secrets import choice
 from traceback import format_exc
 
 from ineruki import LOGGER
@@ -29,11 +28,7 @@ from ineruki.database.notes_db import Notes, NotesSettings
 from ineruki.utils.cmd_senders import send_cmd
 from ineruki.utils.custom_filters import admin_filter, command, owner_filter
 from ineruki.utils.msg_types import Types, get_note_type
-from ineruki.utils.string import (
-    build_keyboard,
-    escape_mentions_using_curly_brackets,
-    parse_button,
-)
+from ineruki.utils.reply_template import get_template
 
 # Initialise
 db = Notes()
@@ -42,7 +37,7 @@ db_settings = NotesSettings()
 
 @Ineruki.on_message(command("save") & admin_filter)
 async def save_note(_, m: Message):
-    existing_notes = {i[0] for i in db.get_all_notes(m.chat.id)}
+    existing_notes = {i[0] for i in await db.get_all_notes(m.chat.id)}
 
     note_name, text, data_type, content = await get_note_type(m)
     note_name = note_name.lower()
@@ -71,7 +66,9 @@ async def save_note(_, m: Message):
         )
         return
 
-    db.save_note(m.chat.id, note_name, text, data_type, content)
+    await db.save_note(m.chat.id, note_name, text, data_type, content)
+    # Compile the reply now, not when the note is first fetched
+    await get_template(text)
     LOGGER.info(f"{m.from_user.id} saved note ({note_name}) in {m.chat.id}")
     await m.reply_text(
         f"Saved note <code>{note_name}</code>!\nGet it with <code>/get {note_name}</code> or <code>#{note_name}</code>",
@@ -87,7 +84,7 @@ async def get_note_func(c: Ineruki, m: Message, note_name, priv_notes_status):
     if priv_notes_status:
         from ineruki import BOT_USERNAME
 
-        note_hash = next(i[1] for i in db.get_all_notes(m.chat.id) if i[0] == note_name)
+        note_hash = await db.get_note_hash(m.chat.id, note_name)
         await reply_text(
             f"Click on the button to get the note <code>{note_name}</code>",
             reply_markup=ikb(
@@ -104,37 +101,18 @@ async def get_note_func(c: Ineruki, m: Message, note_name, priv_notes_status):
         )
         return
 
-    getnotes = db.get_note(m.chat.id, note_name)
+    getnotes = await db.get_note(m.chat.id, note_name)
 
     msgtype = getnotes["msgtype"]
     if not msgtype:
         await reply_text("<b>Error:</b> Cannot find a type for this note!!")
         return
 
-    try:
-        # support for random notes texts
-        splitter = "%%%"
-        note_reply = getnotes["note_value"].split(splitter)
-        note_reply = choice(note_reply)
-    except KeyError:
-        note_reply = ""
-
-    parse_words = [
-        "first",
-        "last",
-        "fullname",
-        "username",
-        "id",
-        "chatname",
-        "mention",
-    ]
-    text = await escape_mentions_using_curly_brackets(m, note_reply, parse_words)
+    # Random variant with buttons parsed once when the note was compiled
+    template = await get_template(getnotes.get("note_value"))
+    teks, button = await template.render(m)
 
     if msgtype == Types.TEXT:
-
-        teks, button = await parse_button(text)
-        button = await build_keyboard(button)
-        button = ikb(button) if button else None
         if button:
             try:
                 await reply_text(
@@ -167,13 +145,6 @@ async def get_note_func(c: Ineruki, m: Message, note_name, priv_notes_status):
             reply_to_message_id=reply_msg_id,
         )
     else:
-        if getnotes["note_value"]:
-            teks, button = await parse_button(text)
-            button = await build_keyboard(button)
-            button = ikb(button) if button else None
-        else:
-            teks = ""
-            button = None
         if button:
             try:
                 await (await send_cmd(c, msgtype))(
@@ -209,13 +180,13 @@ async def get_note_func(c: Ineruki, m: Message, note_name, priv_notes_status):
 
 async def get_raw_note(c: Ineruki, m: Message, note: str):
     """Get the note in raw format, so it can updated by just copy and pasting."""
-    all_notes = {i[0] for i in db.get_all_notes(m.chat.id)}
+    all_notes = {i[0] for i in await db.get_all_notes(m.chat.id)}
 
     if note not in all_notes:
         await m.reply_text("This note does not exists!")
         return
 
-    getnotes = db.get_note(m.chat.id, note)
+    getnotes = await db.get_note(m.chat.id, note)
     msg_id = m.reply_to_message.message_id if m.reply_to_message else m.message_id
 
     msgtype = getnotes["msgtype"]
@@ -263,13 +234,13 @@ async def hash_get(c: Ineruki, m: Message):
     except TypeError:
         return
 
-    all_notes = {i[0] for i in db.get_all_notes(m.chat.id)}
+    all_notes = {i[0] for i in await db.get_all_notes(m.chat.id)}
 
     if note not in all_notes:
         # don't reply to all messages starting with #
         return
 
-    priv_notes_status = db_settings.get_privatenotes(m.chat.id)
+    priv_notes_status = await db_settings.get_privatenotes(m.chat.id)
     await get_note_func(c, m, note, priv_notes_status)
     return
 
@@ -277,9 +248,9 @@ async def hash_get(c: Ineruki, m: Message):
 @Ineruki.on_message(command("get") & filters.group)
 async def get_note(c: Ineruki, m: Message):
     if len(m.text.split()) == 2:
-        priv_notes_status = db_settings.get_privatenotes(m.chat.id)
+        priv_notes_status = await db_settings.get_privatenotes(m.chat.id)
         note = ((m.text.split())[1]).lower()
-        all_notes = {i[0] for i in db.get_all_notes(m.chat.id)}
+        all_notes = {i[0] for i in await db.get_all_notes(m.chat.id)}
 
         if note not in all_notes:
             await m.reply_text("This note does not exists!")
@@ -304,18 +275,18 @@ async def priv_notes(_, m: Message):
     if len(m.text.split()) == 2:
         option = (m.text.split())[1]
         if option in ("on", "yes"):
-            db_settings.set_privatenotes(chat_id, True)
+            await db_settings.set_privatenotes(chat_id, True)
             LOGGER.info(f"{m.from_user.id} enabled privatenotes in {m.chat.id}")
             msg = "Set private notes to On"
         elif option in ("off", "no"):
-            db_settings.set_privatenotes(chat_id, False)
+            await db_settings.set_privatenotes(chat_id, False)
             LOGGER.info(f"{m.from_user.id} disabled privatenotes in {m.chat.id}")
             msg = "Set private notes to Off"
         else:
             msg = "Enter correct option"
         await m.reply_text(msg)
     elif len(m.text.split()) == 1:
-        curr_pref = db_settings.get_privatenotes(m.chat.id)
+        curr_pref = await db_settings.get_privatenotes(m.chat.id)
         msg = msg = f"Private Notes: {curr_pref}"
         LOGGER.info(f"{m.from_user.id} fetched privatenotes preference in {m.chat.id}")
         await m.reply_text(msg)
@@ -328,14 +299,14 @@ async def priv_notes(_, m: Message):
 @Ineruki.on_message(command(["notes", "saved"]) & filters.group)
 async def local_notes(_, m: Message):
     LOGGER.info(f"{m.from_user.id} listed all notes in {m.chat.id}")
-    getnotes = db.get_all_notes(m.chat.id)
+    getnotes = await db.get_all_notes(m.chat.id)
     if not getnotes:
         await m.reply_text(f"There are no notes in <b>{m.chat.title}</b>.")
         return
 
     msg_id = m.reply_to_message.message_id if m.reply_to_message else m.message_id
 
-    curr_pref = db_settings.get_privatenotes(m.chat.id)
+    curr_pref = await db_settings.get_privatenotes(m.chat.id)
     if curr_pref:
         from ineruki import BOT_USERNAME
 
@@ -372,7 +343,7 @@ async def clear_note(_, m: Message):
         return
 
     note = m.text.split()[1]
-    getnote = db.rm_note(m.chat.id, note)
+    getnote = await db.rm_note(m.chat.id, note)
     LOGGER.info(f"{m.from_user.id} cleared note ({note}) in {m.chat.id}")
     if not getnote:
         await m.reply_text("This note does not exist!")
@@ -384,7 +355,7 @@ async def clear_note(_, m: Message):
 
 @Ineruki.on_message(command("clearall") & owner_filter)
 async def clear_allnote(_, m: Message):
-    all_notes = {i[0] for i in db.get_all_notes(m.chat.id)}
+    all_notes = {i[0] for i in await db.get_all_notes(m.chat.id)}
     if not all_notes:
         await m.reply_text("No notes are there in this chat")
         return
@@ -414,7 +385,7 @@ async def clearallnotes_callback(_, q: CallbackQuery):
             show_alert=True,
         )
         return
-    db.rm_all_notes(q.message.chat.id)
+    await db.rm_all_notes(q.message.chat.id)
     LOGGER.info(f"{user_id} removed all notes in {q.message.chat.id}")
     await q.message.delete()
     await q.answer("Cleared all notes!", show_alert=True)
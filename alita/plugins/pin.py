@@ -159,7 +159,7 @@ async def anti_channel_pin(_, m: Message):
     pinsdb = Pins(m.chat.id)
 
     if len(m.text.split()) == 1:
-        status = pinsdb.get_settings()["antichannelpin"]
+        status = (await pinsdb.get_settings())["antichannelpin"]
         await m.reply_text(
             tlang(m, "pin.antichannelpin.current_status").format(
                 status=status,
@@ -169,11 +169,11 @@ async def anti_channel_pin(_, m: Message):
 
     if len(m.text.split()) == 2:
         if m.command[1] in ("yes", "on", "true"):
-            pinsdb.antichannelpin_on()
+            await pinsdb.antichannelpin_on()
             LOGGER.info(f"{m.from_user.id} enabled antichannelpin in {m.chat.id}")
             msg = tlang(m, "pin.antichannelpin.turned_on")
         elif m.command[1] in ("no", "off", "false"):
-            pinsdb.antichannelpin_off()
+            await pinsdb.antichannelpin_off()
             LOGGER.info(f"{m.from_user.id} disabled antichannelpin in {m.chat.id}")
             msg = tlang(m, "pin.antichannelpin.turned_off")
         else:
@@ -209,7 +209,7 @@ async def clean_linked(_, m: Message):
     pinsdb = Pins(m.chat.id)
 
     if len(m.text.split()) == 1:
-        status = pinsdb.get_settings()["cleanlinked"]
+        status = (await pinsdb.get_settings())["cleanlinked"]
         await m.reply_text(
             tlang(m, "pin.antichannelpin.current_status").format(
                 status=status,
@@ -219,11 +219,11 @@ async def clean_linked(_, m: Message):
 
     if len(m.text.split()) == 2:
         if m.command[1] in ("yes", "on", "true"):
-            pinsdb.cleanlinked_on()
+            await pinsdb.cleanlinked_on()
             LOGGER.info(f"{m.from_user.id} enabled CleanLinked in {m.chat.id}")
             msg = "Turned on CleanLinked! Now all the messages from linked channel will be deleted!"
         elif m.command[1] in ("no", "off", "false"):
-            pinsdb.cleanlinked_off()
+            await pinsdb.cleanlinked_off()
             LOGGER.info(f"{m.from_user.id} disabled CleanLinked in {m.chat.id}")
             msg = "Turned off CleanLinked! Messages from linked channel will not be deleted!"
         else:
@@ -41,24 +41,24 @@ async def report_setting(_, m: Message):
         if len(args) >= 2:
             option = args[1].lower()
             if option in ("yes", "on", "true"):
-                db.set_settings(True)
+                await db.set_settings(True)
                 LOGGER.info(f"{m.from_user.id} enabled reports for them")
                 await m.reply_text(
                     "Turned on reporting! You'll be notified whenever anyone reports something in groups you are admin.",
                 )
 
             elif option in ("no", "off", "false"):
-                db.set_settings(False)
+                await db.set_settings(False)
                 LOGGER.info(f"{m.from_user.id} disabled reports for them")
                 await m.reply_text("Turned off reporting! You wont get any reports.")
         else:
             await m.reply_text(
-                f"Your current report preference is: `{(db.get_settings())}`",
+                f"Your current report preference is: `{(await db.get_settings())}`",
             )
     elif len(args) >= 2:
         option = args[1].lower()
         if option in ("yes", "on", "true"):
-            db.set_settings(True)
+            await db.set_settings(True)
             LOGGER.info(f"{m.from_user.id} enabled reports in {m.chat.id}")
             await m.reply_text(
                 "Turned on reporting! Admins who have turned on reports will be notified when /report "
@@ -67,7 +67,7 @@ async def report_setting(_, m: Message):
             )
 
         elif option in ("no", "off", "false"):
-            db.set_settings(False)
+            await db.set_settings(False)
             LOGGER.info(f"{m.from_user.id} disabled reports in {m.chat.id}")
             await m.reply_text(
                 "Turned off reporting! No admins will be notified on /report or @admin.",
@@ -75,7 +75,7 @@ async def report_setting(_, m: Message):
             )
     else:
         await m.reply_text(
-            f"This group's current setting is: `{(db.get_settings())}`",
+            f"This group's current setting is: `{(await db.get_settings())}`",
         )
 
 
@@ -90,7 +90,7 @@ async def report_watcher(c: Ineruki, m: Message):
     me = await c.get_me()
     db = Reporting(m.chat.id)
 
-    if (m.chat and m.reply_to_message) and (db.get_settings()):
+    if (m.chat and m.reply_to_message) and (await db.get_settings()):
         reported_msg_id = m.reply_to_message.message_id
         reported_user = m.reply_to_message.from_user
         chat_name = m.chat.title or m.chat.username
@@ -155,7 +155,7 @@ async def report_watcher(c: Ineruki, m: Message):
                 admin.user.is_bot or admin.user.is_deleted
             ):  # can't message bots or deleted accounts
                 continue
-            if Reporting(admin.user.id).get_settings():
+            if await Reporting(admin.user.id).get_settings():
                 try:
                     await c.send_message(
                         admin.user.id,
@@ -32,7 +32,7 @@ async def get_rules(_, m: Message):
     db = Rules(m.chat.id)
     msg_id = m.reply_to_message.message_id if m.reply_to_message else m.message_id
 
-    rules = db.get_rules()
+    rules = await db.get_rules()
     LOGGER.info(f"{m.from_user.id} fetched rules in {m.chat.id}")
 
     if not rules:
@@ -42,7 +42,7 @@ async def get_rules(_, m: Message):
         )
         return
 
-    priv_rules_status = db.get_privrules()
+    priv_rules_status = await db.get_privrules()
 
     if priv_rules_status:
         from ineruki import BOT_USERNAME
@@ -89,7 +89,7 @@ async def set_rules(_, m: Message):
         rules = rules[0:3949]  # Split Rules if len > 4000 chars
         await m.reply_text("Rules truncated to 3950 characters!")
 
-    db.set_rules(rules)
+    await db.set_rules(rules)
     LOGGER.info(f"{m.from_user.id} set rules in {m.chat.id}")
     await m.reply_text(tlang(m, "rules.set_rules"))
     return
@@ -103,18 +103,18 @@ async def priv_rules(_, m: Message):
     if len(m.text.split()) == 2:
         option = (m.text.split())[1]
         if option in ("on", "yes"):
-            db.set_privrules(True)
+            await db.set_privrules(True)
             LOGGER.info(f"{m.from_user.id} enabled privaterules in {m.chat.id}")
             msg = tlang(m, "rules.priv_rules.turned_on").format(chat_name=m.chat.title)
         elif option in ("off", "no"):
-            db.set_privrules(False)
+            await db.set_privrules(False)
             LOGGER.info(f"{m.from_user.id} disbaled privaterules in {m.chat.id}")
             msg = tlang(m, "rules.priv_rules.turned_off").format(chat_name=m.chat.title)
         else:
             msg = tlang(m, "rules.priv_rules.no_option")
         await m.reply_text(msg)
     elif len(m.text.split()) == 1:
-        curr_pref = db.get_privrules()
+        curr_pref = await db.get_privrules()
         msg = tlang(m, "rules.priv_rules.current_preference").format(
             current_option=curr_pref,
         )
@@ -130,7 +130,7 @@ async def priv_rules(_, m: Message):
 async def clear_rules(_, m: Message):
     db = Rules(m.chat.id)
 
-    rules = db.get_rules()
+    rules = await db.get_rules()
     if not rules:
         await m.reply_text(tlang(m, "rules.no_rules"))
         return
@@ -146,7 +146,7 @@ async def clear_rules(_, m: Message):
 
 @Ineruki.on_callback_query(filters.regex("^clear_rules$"))
 async def clearrules_callback(_, q: CallbackQuery):
-    Rules(q.message.chat.id).clear_rules()
+    await Rules(q.message.chat.id).clear_rules()
     await q.message.edit_text(tlang(q, "rules.cleared"))
     LOGGER.info(f"{q.from_user.id} cleared rules in {q.message.chat.id}")
     await q.answer("Rules for the chat have been cleared!", show_alert=True)
@@ -17,63 +17,52 @@
 
 
 from pyrogram.types import Message
+from time import time
 
 from ineruki.bot_class import Ineruki
 from ineruki.database import MongoDB
-from ineruki.database.antispam_db import GBan
-from ineruki.database.approve_db import Approve
-from ineruki.database.blacklist_db import Blacklist
-from ineruki.database.chats_db import Chats
-from ineruki.database.filters_db import Filters
-from ineruki.database.notes_db import Notes, NotesSettings
-from ineruki.database.pins_db import Pins
-from ineruki.database.rules_db import Rules
-from ineruki.database.users_db import Users
-from ineruki.database.warns_db import Warns, WarnSettings
+from ineruki.database.indexes import index_report
+from ineruki.database.monitoring import latency_report
+from ineruki.database.settings_cache import settings_cache_stats
+from ineruki.database.stats_snapshot import get_stats_snapshot
 from ineruki.utils.custom_filters import command
 
 
 @Ineruki.on_message(command("stats", dev_cmd=True))
 async def get_stats(_, m: Message):
-    # initialise
-    bldb = Blacklist
-    gbandb = GBan()
-    notesdb = Notes()
-    rulesdb = Rules
-    userdb = Users
-    appdb = Approve
-    chatdb = Chats
-    fldb = Filters()
-    pinsdb = Pins
-    notesettings_db = NotesSettings()
-    warns_db = Warns
-    warns_settings_db = WarnSettings
-
+    force = len(m.command) > 1 and m.command[1].lower() == "refresh"
     replymsg = await m.reply_text("<b><i>Fetching Stats...</i></b>", quote=True)
+    snapshot = await get_stats_snapshot(force)
+    stats = snapshot["data"]
+    if stats is None:
+        await replymsg.edit_text("Could not fetch stats, check logs!")
+        return
+    bl_actions = stats["blacklist_actions"]
     rply = (
-        f"<b>Users:</b> <code>{(userdb.count_users())}</code> in <code>{(chatdb.count_chats())}</code> chats\n"
-        f"<b>Anti Channel Pin:</b> <code>{(pinsdb.count_chats('antichannelpin'))}</code> enabled chats\n"
-        f"<b>Clean Linked:</b> <code>{(pinsdb.count_chats('cleanlinked'))}</code> enabled chats\n"
-        f"<b>Filters:</b> <code>{(fldb.count_filters_all())}</code> in <code>{(fldb.count_filters_chats())}</code> chats\n"
-        f"    <b>Aliases:</b> <code>{(fldb.count_filter_aliases())}</code>\n"
-        f"<b>Blacklists:</b> <code>{(bldb.count_blacklists_all())}</code> in <code>{(bldb.count_blackists_chats())}</code> chats\n"
+        f"<b>Users:</b> <code>{stats['users']}</code> in <code>{stats['chats']}</code> chats\n"
+        f"<b>Anti Channel Pin:</b> <code>{stats['antichannelpin']}</code> enabled chats\n"
+        f"<b>Clean Linked:</b> <code>{stats['cleanlinked']}</code> enabled chats\n"
+        f"<b>Filters:</b> <code>{stats['filters']}</code> in <code>{stats['filters_chats']}</code> chats\n"
+        f"    <b>Aliases:</b> <code>{stats['filter_aliases']}</code>\n"
+        f"<b>Blacklists:</b> <code>{stats['blacklists']}</code> in <code>{stats['blacklists_chats']}</code> chats\n"
         f"    <b>Action Specific:</b>\n"
-        f"        <b>None:</b> <code>{(bldb.count_action_bl_all('none'))}</code> chats\n"
-        f"        <b>Kick</b> <code>{(bldb.count_action_bl_all('kick'))}</code> chats\n"
-        f"        <b>Warn:</b> <code>{(bldb.count_action_bl_all('warn'))}</code> chats\n"
-        f"        <b>Ban</b> <code>{(bldb.count_action_bl_all('ban'))}</code> chats\n"
-        f"<b>Rules:</b> Set in <code>{(rulesdb.count_chats_with_rules())}</code> chats\n"
-        f"    <b>Private Rules:</b> <code>{(rulesdb.count_privrules_chats())}</code> chats\n"
-        f"<b>Warns:</b> <code>{(warns_db.count_warns_total())}</code> in <code>{(warns_db.count_all_chats_using_warns())}</code> chats\n"
-        f"    <b>Users Warned:</b> <code>{(warns_db.count_warned_users())}</code> users\n"
+        f"        <b>None:</b> <code>{bl_actions.get('none', 0)}</code> chats\n"
+        f"        <b>Kick</b> <code>{bl_actions.get('kick', 0)}</code> chats\n"
+        f"        <b>Warn:</b> <code>{bl_actions.get('warn', 0)}</code> chats\n"
+        f"        <b>Ban</b> <code>{bl_actions.get('ban', 0)}</code> chats\n"
+        f"<b>Rules:</b> Set in <code>{stats['rules']}</code> chats\n"
+        f"    <b>Private Rules:</b> <code>{stats['privrules']}</code> chats\n"
+        f"<b>Warns:</b> <code>{stats['warns']}</code> in <code>{stats['warns_chats']}</code> chats\n"
+        f"    <b>Users Warned:</b> <code>{stats['warned_users']}</code> users\n"
         f"    <b>Action Specific:</b>\n"
-        f"        <b>Kick</b>: <code>{(warns_settings_db.count_action_chats('kick'))}</code>\n"
-        f"        <b>Mute</b>: <code>{(warns_settings_db.count_action_chats('mute'))}</code>\n"
-        f"        <b>Ban</b>: <code>{warns_settings_db.count_action_chats('ban')}</code>\n"
-        f"<b>Notes:</b> <code>{(notesdb.count_all_notes())}</code> in <code>{(notesdb.count_notes_chats())}</code> chats\n"
-        f"    <b>Private Notes:</b> <code>{(notesettings_db.count_chats())}</code> chats\n"
-        f"<b>GBanned Users:</b> <code>{(gbandb.count_gbans())}</code>\n"
-        f"<b>Approved People</b>: <code>{(appdb.count_all_approved())}</code> in <code>{(appdb.count_approved_chats())}</code> chats\n"
+        f"        <b>Kick</b>: <code>{stats['warn_kick']}</code>\n"
+        f"        <b>Mute</b>: <code>{stats['warn_mute']}</code>\n"
+        f"        <b>Ban</b>: <code>{stats['warn_ban']}</code>\n"
+        f"<b>Notes:</b> <code>{stats['notes']}</code> in <code>{stats['notes_chats']}</code> chats\n"
+        f"    <b>Private Notes:</b> <code>{stats['privatenotes']}</code> chats\n"
+        f"<b>GBanned Users:</b> <code>{stats['gbans']}</code>\n"
+        f"<b>Approved People</b>: <code>{stats['approved']}</code> in <code>{stats['approved_chats']}</code> chats\n"
+        f"\n<i>Updated {round(time() - snapshot['time'])}s ago</i>"
     )
     await replymsg.edit_text(rply, parse_mode="html")
     return
@@ -81,8 +70,59 @@ async def get_stats(_, m: Message):
 
 @Ineruki.on_message(command("dbstats", dev_cmd=True))
 async def get_dbstats(_, m: Message):
+    cache = settings_cache_stats()
     db_stats = (
-        f"<b>Database Stats:</b>\n<code>{MongoDB('test').db_command('dbstats')}</code>"
+        f"<b>Database Stats:</b>\n<code>{await MongoDB('test').db_command('dbstats')}</code>"
+        "\n\n<b>Settings Cache:</b>\n"
+        f"    <b>Hits:</b> <code>{cache['hits']}</code>\n"
+        f"    <b>Misses:</b> <code>{cache['misses']}</code>\n"
+        f"    <b>Hit Ratio:</b> <code>{cache['hit_ratio']}</code>\n"
+        f"    <b>Size:</b> <code>{cache['size']}/{cache['maxsize']}</code>"
     )
     await m.reply_text(db_stats, parse_mode="html")
     return
+
+
+@Ineruki.on_message(command("dbindexes", dev_cmd=True))
+async def get_dbindexes(_, m: Message):
+    replymsg = await m.reply_text("<b><i>Checking database indexes...</i></b>")
+    report = await index_report()
+    rply = "<b>Database Indexes:</b>\n"
+    for collection, status in report.items():
+        if not (status["missing"] or status["unused"]):
+            continue
+        rply += f"\n<b>{collection}</b>\n"
+        if status["missing"]:
+            rply += f"    <b>Missing:</b> <code>{', '.join(status['missing'])}</code>\n"
+        if status["unused"]:
+            rply += f"    <b>Unused:</b> <code>{', '.join(status['unused'])}</code>\n"
+    if rply.count("\n") == 1:
+        rply += "All declared indexes exist and are in use."
+    await replymsg.edit_text(rply, parse_mode="html")
+    return
+
+
+@Ineruki.on_message(command("dblatency", dev_cmd=True))
+async def get_dblatency(_, m: Message):
+    report, pool = latency_report()
+    rply = (
+        "<b>Database Pool:</b>\n"
+        f"    <b>In Use:</b> <code>{pool['checked_out']}</code>\n"
+        f"    <b>Checkouts:</b> <code>{pool['checkouts']}</code> "
+        f"(<code>{pool['checkout_failures']}</code> failed)\n"
+        f"    <b>Connections:</b> <code>{pool['connections_created'] - pool['connections_closed']}</code> open\n"
+        f"    <b>Cleared:</b> <code>{pool['pool_cleared']}</code> times\n\n"
+        "<b>Slowest Operations (total time):</b>\n"
+    )
+    for i in report[:15]:
+        rply += (
+            f"<code>{i['collection'] or '-'}.{i['command']}</code>: "
+            f"{i['count']} calls, avg {i['avg_ms']}ms, p50 ≤{i['p50_ms']}ms, "
+            f"p99 ≤{i['p99_ms']}ms, max {i['max_ms']}ms"
+            + (f", {i['failed']} failed" if i["failed"] else "")
+            + "\n"
+        )
+    if not report:
+        rply += "No database commands recorded yet."
+    await m.reply_text(rply, parse_mode="html")
+    return
@@ -16,7 +16,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from gpytranslate import Translator
 from html import escape
 from io import BytesIO
 from os import remove
@@ -24,9 +23,6 @@ from pyrogram import filters
 from pyrogram.errors import MessageTooLong, PeerIdInvalid, RPCError
 from pyrogram.types import Message
 from pyromod.helpers import ikb
-from tswift import Song
-from wikipedia import summary
-from wikipedia.exceptions import DisambiguationError, PageError
 
 from ineruki import (
     DEV_USERS,
@@ -59,6 +55,10 @@ async def wiki(_, m: Message):
         search = m.reply_to_message.text
     else:
         search = m.text.split(None, 1)[1]
+    # Heavy optional dependencies are imported when their command first runs
+    from wikipedia import summary
+    from wikipedia.exceptions import DisambiguationError, PageError
+
     try:
         res = summary(search)
     except DisambiguationError as de:
@@ -96,7 +96,7 @@ async def gdpr_remove(_, m: Message):
         )
         return
 
-    Users(m.from_user.id).delete_user()
+    await Users(m.from_user.id).delete_user()
     await m.reply_text(
         "Your personal data has been deleted.\n"
         "Note that this will not unban you from any chats, as that is telegram data, not Ineruki data."
@@ -127,6 +127,8 @@ async def get_lyrics(_, m: Message):
     em = await m.reply_text(
         (tlang(m, "utils.song.searching").format(song_name=query)),
     )
+    from tswift import Song
+
     song = Song.find_song(query)
     if song:
         if song.lyrics:
@@ -270,7 +272,7 @@ async def my_info(c: Ineruki, m: Message):
             await m.reply_text(tlang(m, "utils.user_info.id_not_found"))
         return
     try:
-        user = Users.get_user_info(int(user_id))
+        user = await Users.get_user_info(int(user_id))
         name = user["name"]
         user_name = user["username"]
         user_id = user["_id"]
@@ -296,7 +298,7 @@ async def my_info(c: Ineruki, m: Message):
         )
         return
 
-    gbanned, reason_gban = gban_db.get_gban(user_id)
+    gbanned, reason_gban = await gban_db.get_gban(user_id)
     LOGGER.info(f"{m.from_user.id} used info cmd for {user_id} in {m.chat.id}")
 
     text = (tlang(m, "utils.user_info.info_text.main")).format(
@@ -394,6 +396,8 @@ async def paste_it(_, m: Message):
 
 @Ineruki.on_message(command("tr"))
 async def translate(_, m: Message):
+    from gpytranslate import Translator
+
     trl = Translator()
     if m.reply_to_message and (m.reply_to_message.text or m.reply_to_message.caption):
         if len(m.text.split()) == 1:
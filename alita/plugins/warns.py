@@ -90,8 +90,8 @@ async def warn(c: Ineruki, m: Message):
     warn_db = Warns(m.chat.id)
     warn_settings_db = WarnSettings(m.chat.id)
 
-    _, num = warn_db.warn_user(user_id, reason)
-    warn_settings = warn_settings_db.get_warnings_settings()
+    _, num = await warn_db.warn_user(user_id, reason)
+    warn_settings = await warn_settings_db.get_warnings_settings()
     if num >= warn_settings["warn_limit"]:
         if warn_settings["warn_mode"] == "kick":
             await m.chat.kick_member(user_id, until_date=int(time() + 45))
@@ -114,7 +114,7 @@ async def warn(c: Ineruki, m: Message):
         )
         await m.stop_propagation()
 
-    rules = Rules(m.chat.id).get_rules()
+    rules = await Rules(m.chat.id).get_rules()
     if rules:
         kb = InlineKeyboardButton(
             "Rules 📋",
@@ -187,7 +187,7 @@ async def reset_warn(c: Ineruki, m: Message):
         return
 
     warn_db = Warns(m.chat.id)
-    warn_db.reset_warns(user_id)
+    await warn_db.reset_warns(user_id)
     await m.reply_text(
         f"Warnings have been reset for {(await mention_html(user_first_name, user_id))}",
     )
@@ -224,8 +224,8 @@ async def list_warns(c: Ineruki, m: Message):
 
     warn_db = Warns(m.chat.id)
     warn_settings_db = WarnSettings(m.chat.id)
-    warns, num_warns = warn_db.get_warns(user_id)
-    warn_settings = warn_settings_db.get_warnings_settings()
+    warns, num_warns = await warn_db.get_warns(user_id)
+    warn_settings = await warn_settings_db.get_warnings_settings()
     if not warns:
         await m.reply_text("This user has no warns!")
         return
@@ -272,12 +272,12 @@ async def remove_warn(c: Ineruki, m: Message):
         return
 
     warn_db = Warns(m.chat.id)
-    warns, _ = warn_db.get_warns(user_id)
-    if not warns:
+    removed = await warn_db.remove_warn(user_id)
+    if not removed:
         await m.reply_text("This user has no warnings!")
         return
 
-    _, num_warns = warn_db.remove_warn(user_id)
+    _, num_warns = removed
     await m.reply_text(
         (
             f"{(await mention_html(user_first_name,user_id))} now has <b>{num_warns}</b> warnings!\n"
@@ -303,12 +303,16 @@ async def remove_last_warn_btn(c: Ineruki, q: CallbackQuery):
     action = args[1]
     user_id = int(args[2])
     chat_id = int(q.message.chat.id)
-    user = Users.get_user_info(int(user_id))
+    user = await Users.get_user_info(int(user_id))
     user_first_name = user["name"]
 
     if action == "remove":
         warn_db = Warns(q.message.chat.id)
-        _, num_warns = warn_db.remove_warn(user_id)
+        removed = await warn_db.remove_warn(user_id)
+        if not removed:
+            await q.answer("This user has no warnings!", show_alert=True)
+            return
+        _, num_warns = removed
         await q.message.edit_text(
             (
                 f"Admin {(await mention_html(q.from_user.first_name, q.from_user.id))} "
@@ -339,7 +343,7 @@ async def remove_last_warn_btn(c: Ineruki, q: CallbackQuery):
 @Ineruki.on_message(command(["warnings", "warnsettings"]) & admin_filter)
 async def get_settings(_, m: Message):
     warn_settings_db = WarnSettings(m.chat.id)
-    settings = warn_settings_db.get_warnings_settings()
+    settings = await warn_settings_db.get_warnings_settings()
     await m.reply_text(
         (
             "This group has these following settings:\n"
@@ -363,10 +367,10 @@ async def warnmode(_, m: Message):
                 ),
             )
             return
-        warnmode_var = warn_settings_db.set_warnmode(wm)
+        warnmode_var = await warn_settings_db.set_warnmode(wm)
         await m.reply_text(f"Warn Mode has been set to: {warnmode_var}")
         return
-    warnmode_var = warn_settings_db.get_warnmode()
+    warnmode_var = await warn_settings_db.get_warnmode()
     await m.reply_text(f"This chats current Warn Mode is: {warnmode_var}")
     return
 
@@ -379,10 +383,10 @@ async def warnlimit(_, m: Message):
         if not isinstance(wl, int):
             await m.reply_text("Warn Limit can only be a number!")
             return
-        warnlimit_var = warn_settings_db.set_warnlimit(wl)
+        warnlimit_var = await warn_settings_db.set_warnlimit(wl)
         await m.reply_text(f"Warn Limit has been set to: {warnlimit_var}")
         return
-    warnlimit_var = warn_settings_db.get_warnlimit()
+    warnlimit_var = await warn_settings_db.get_warnlimit()
     await m.reply_text(f"This chats current Warn Limit is: {warnlimit_var}")
     return
 
@@ -19,25 +19,19 @@
 from pyrogram import filters
 from pyrogram.errors import ChatAdminRequired, RPCError, UserAdminInvalid
 from pyrogram.types import ChatPermissions, Message
-from re import escape as re_escape
 from time import time
 from traceback import format_exc
 
 from ineruki import LOGGER, MESSAGE_DUMP, SUPPORT_STAFF
 from ineruki.bot_class import Ineruki
-from ineruki.database.antispam_db import ANTISPAM_BANNED, GBan
 from ineruki.database.approve_db import Approve
 from ineruki.database.blacklist_db import Blacklist
-from ineruki.database.group_blacklist import BLACKLIST_CHATS
 from ineruki.database.pins_db import Pins
 from ineruki.database.warns_db import Warns, WarnSettings
 from ineruki.tr_engine import tlang
 from ineruki.utils.caching import ADMIN_CACHE, admin_cache_reload
+from ineruki.utils.custom_filters import blacklisted_chat_filter, gban_filter
 from ineruki.utils.parser import mention_html
-from ineruki.utils.regex_utils import regex_searcher
-
-# Initialise
-gban_db = GBan()
 
 
 @Ineruki.on_message(filters.linked_channel)
@@ -45,7 +39,7 @@ async def antichanpin_cleanlinked(c: Ineruki, m: Message):
     try:
         msg_id = m.message_id
         pins_db = Pins(m.chat.id)
-        curr = pins_db.get_settings()
+        curr = await pins_db.get_settings()
         if curr["antichannelpin"]:
             await c.unpin_chat_message(chat_id=m.chat.id, message_id=msg_id)
             LOGGER.info(f"AntiChannelPin: msgid-{m.message_id} unpinned in {m.chat.id}")
@@ -56,7 +50,7 @@ async def antichanpin_cleanlinked(c: Ineruki, m: Message):
         await m.reply_text(
             "Disabled antichannelpin as I don't have enough admin rights!",
         )
-        pins_db.antichannelpin_off()
+        await pins_db.antichannelpin_off()
         LOGGER.warning(f"Disabled antichannelpin in {m.chat.id} as bot is not admin.")
     except Exception as ef:
         LOGGER.error(ef)
@@ -120,9 +114,10 @@ async def bl_watcher(_, m: Message):
         elif action == "warn":
             warns_settings_db = WarnSettings(m.chat.id)
             warns_db = Warns(m.chat.id)
-            warn_settings = warns_settings_db.get_warnings_settings()
-            warn_reason = bl_db.get_reason()
-            _, num = warns_db.warn_user(m.from_user.id, warn_reason)
+            warn_settings = await warns_settings_db.get_warnings_settings()
+            warn_reason = await bl_db.get_reason()
+            # Limit is checked against the count returned by the atomic update
+            _, num = await warns_db.warn_user(m.from_user.id, warn_reason)
             if num >= warn_settings["warn_limit"]:
                 if warn_settings["warn_mode"] == "kick":
                     await m.chat.kick_member(
@@ -157,8 +152,8 @@ async def bl_watcher(_, m: Message):
         return
 
     # If no blacklists, then return
-    chat_blacklists = bl_db.get_blacklists()
-    if not chat_blacklists:
+    matcher = await bl_db.get_matcher()
+    if not matcher:
         return
 
     # Get admins from admin_cache, reduces api calls
@@ -171,85 +166,81 @@ async def bl_watcher(_, m: Message):
         return
 
     # Get approved user from cache/database
-    app_users = Approve(m.chat.id).list_approved()
+    app_users = await Approve(m.chat.id).list_approved()
     if m.from_user.id in {i[0] for i in app_users}:
         return
 
     # Get action for blacklist
-    action = bl_db.get_action()
-    for trigger in chat_blacklists:
-        pattern = r"( |^|[^\w])" + re_escape(trigger) + r"( |$|[^\w])"
-        match = await regex_searcher(pattern, m.text.lower())
-        if not match:
-            continue
-        if match:
-            try:
-                await perform_action_blacklist(m, action, trigger)
-                LOGGER.info(
-                    f"{m.from_user.id} {action}ed for using blacklisted word {trigger} in {m.chat.id}",
-                )
-                await m.delete()
-            except RPCError as ef:
-                LOGGER.error(ef)
-                LOGGER.error(format_exc())
-            break
+    # First blacklisted trigger in message, all triggers checked in one pass
+    trigger = matcher.search(m.text)
+    if trigger is None:
+        return
+
+    action = await bl_db.get_action()
+    try:
+        await perform_action_blacklist(m, action, trigger)
+        LOGGER.info(
+            f"{m.from_user.id} {action}ed for using blacklisted word {trigger} in {m.chat.id}",
+        )
+        await m.delete()
+    except RPCError as ef:
+        LOGGER.error(ef)
+        LOGGER.error(format_exc())
     return
 
 
-@Ineruki.on_message(filters.user(list(ANTISPAM_BANNED)) & filters.group)
+@Ineruki.on_message(gban_filter & filters.group)
 async def gban_watcher(c: Ineruki, m: Message):
     from ineruki import SUPPORT_GROUP
 
     try:
-        _banned = gban_db.check_gban(m.from_user.id)
-    except Exception as ef:
-        LOGGER.error(ef)
-        LOGGER.error(format_exc())
-        return
-
-    if _banned:
-        try:
-            await m.chat.kick_member(m.from_user.id)
-            await m.delete(m.message_id)  # Delete users message!
-            await m.reply_text(
-                (tlang(m, "antispam.watcher_banned")).format(
-                    user_gbanned=(
-                        await mention_html(m.from_user.first_name, m.from_user.id)
-                    ),
-                    SUPPORT_GROUP=SUPPORT_GROUP,
-                ),
-            )
-            LOGGER.info(f"Banned user {m.from_user.id} in {m.chat.id} due to antispam")
-            return
-        except (ChatAdminRequired, UserAdminInvalid):
-            # Bot not admin in group and hence cannot ban users!
-            # TO-DO - Improve Error Detection
-            LOGGER.info(
-                f"User ({m.from_user.id}) is admin in group {m.chat.name} ({m.chat.id})",
-            )
-        except RPCError as ef:
-            await c.send_message(
-                MESSAGE_DUMP,
-                tlang(m, "antispam.gban.gban_error_log").format(
-                    chat_id=m.chat.id,
-                    ef=ef,
+        await m.chat.kick_member(m.from_user.id)
+        await m.delete(m.message_id)  # Delete users message!
+        await m.reply_text(
+            (tlang(m, "antispam.watcher_banned")).format(
+                user_gbanned=(
+                    await mention_html(m.from_user.first_name, m.from_user.id)
                 ),
-            )
+                SUPPORT_GROUP=SUPPORT_GROUP,
+            ),
+        )
+        LOGGER.info(f"Banned user {m.from_user.id} in {m.chat.id} due to antispam")
+        return
+    except (ChatAdminRequired, UserAdminInvalid):
+        # Bot not admin in group and hence cannot ban users!
+        # TO-DO - Improve Error Detection
+        LOGGER.info(
+            f"User ({m.from_user.id}) is admin in group {m.chat.name} ({m.chat.id})",
+        )
+    except RPCError as ef:
+        await c.send_message(
+            MESSAGE_DUMP,
+            tlang(m, "antispam.gban.gban_error_log").format(
+                chat_id=m.chat.id,
+                ef=ef,
+            ),
+        )
     return
 
 
-@Ineruki.on_message(filters.chat(BLACKLIST_CHATS))
+# Runs before every other handler group and stops the update there, so no
+# other handler spends work on blacklisted chats
+@Ineruki.on_message(blacklisted_chat_filter, group=-1)
 async def bl_chats_watcher(c: Ineruki, m: Message):
     from ineruki import SUPPORT_GROUP
 
-    await c.send_message(
-        m.chat.id,
-        (
-            "This is a blacklisted group!\n"
-            f"For Support, Join @{SUPPORT_GROUP}\n"
-            "Now, I'm outta here!"
-        ),
-    )
-    await c.leave_chat(m.chat.id)
-    LOGGER.info(f"Joined and Left blacklisted chat {m.chat.id}")
-    return
+    try:
+        await c.send_message(
+            m.chat.id,
+            (
+                "This is a blacklisted group!\n"
+                f"For Support, Join @{SUPPORT_GROUP}\n"
+                "Now, I'm outta here!"
+            ),
+        )
+        await c.leave_chat(m.chat.id)
+        LOGGER.info(f"Joined and Left blacklisted chat {m.chat.id}")
+    except RPCError as ef:
+        LOGGER.error(ef)
+        LOGGER.error(format_exc())
+    m.stop_propagation()
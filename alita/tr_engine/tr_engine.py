@@ -16,74 +16,150 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from functools import reduce
-from glob import glob
-from operator import getitem
-from os import path
+from marshal import dump, load
+from os import makedirs, path, replace, stat
 from pyrogram.types import CallbackQuery
-from threading import RLock
-from traceback import format_exc
-from yaml import FullLoader
 from yaml import load as load_yml
 
 from ineruki import ENABLED_LOCALES, LOGGER
 from ineruki.database.lang_db import Langs
 
-# Initialise
-LANG_LOCK = RLock()
-
-
-def cache_localizations(files):
-    """Get all translated strings from files."""
-    ldict = {lang: {} for lang in ENABLED_LOCALES}
-    for file in files:
-        lang_name = (file.split(path.sep)[1]).replace(".yml", "")
-        lang_data = load_yml(open(file, encoding="utf-8"), Loader=FullLoader)
-        ldict[lang_name] = lang_data
-    return ldict
-
-
-# Get all translation files
-lang_files = []
-for locale in ENABLED_LOCALES:
-    lang_files += glob(path.join("locales", f"{locale}.yml"))
-lang_dict = cache_localizations(lang_files)
+try:
+    from yaml import CFullLoader as FullLoader
+except ImportError:
+    from yaml import FullLoader
+
+DEFAULT_LANG = "en"
+
+LOCALES_DIR = "locales"
+# Compiled bundles, rebuilt whenever the yml file changes
+BUNDLE_DIR = path.join(LOCALES_DIR, "__pycache__")
+# Bump when the bundle layout changes
+BUNDLE_VERSION = 1
+
+
+def flatten_strings(strings: dict, prefix: str = ""):
+    """Map the dotted key path of every string to the string."""
+    flat = {}
+    for key, value in (strings or {}).items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_strings(value, f"{full_key}."))
+        else:
+            flat[full_key] = value
+    return flat
+
+
+def __yml_file(lang: str):
+    return path.join(LOCALES_DIR, f"{lang}.yml")
+
+
+def __bundle_file(lang: str):
+    return path.join(BUNDLE_DIR, f"{lang}.marshal")
+
+
+def __stamp(lang: str):
+    # Changes whenever the yml file is edited or replaced
+    stats = stat(__yml_file(lang))
+    return BUNDLE_VERSION, stats.st_mtime_ns, stats.st_size
+
+
+def build_bundle(lang: str):
+    """Parse the yml file of lang and write its compiled bundle."""
+    stamp = __stamp(lang)
+    with open(__yml_file(lang), encoding="utf-8") as f:
+        data = load_yml(f, Loader=FullLoader) or {}
+    main = data.get("main", {})
+    strings = flatten_strings(data.get("strings"))
+    try:
+        makedirs(BUNDLE_DIR, exist_ok=True)
+        tmp_file = f"{__bundle_file(lang)}.tmp"
+        with open(tmp_file, "wb") as f:
+            # Separate objects, so the metadata can be read on its own
+            dump(stamp, f)
+            dump(main, f)
+            dump(strings, f)
+        replace(tmp_file, __bundle_file(lang))
+    except OSError as ef:
+        # Read only install, parse the yml file on every start
+        LOGGER.warning(f"Cannot write locale bundle for {lang}: {ef}")
+    return main, strings
+
+
+def read_bundle(lang: str, with_strings: bool = True):
+    """Metadata and strings of lang, rebuilding a missing or stale bundle."""
+    try:
+        with open(__bundle_file(lang), "rb") as f:
+            if load(f) == __stamp(lang):
+                main = load(f)
+                return main, (load(f) if with_strings else None)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    LOGGER.info(f"Compiling locale bundle for {lang}")
+    return build_bundle(lang)
+
+
+# Locales which have a yml file, only their metadata is read at start
+lang_dict = {
+    lang: {"main": read_bundle(lang, with_strings=False)[0]}
+    for lang in ENABLED_LOCALES
+    if path.isfile(__yml_file(lang))
+}
+
+# Strings of each locale keyed by their full dotted key, so a lookup is a
+# single dict access. Filled on first use of a locale, the default eagerly,
+# and only ever assigned to, never mutated
+FLAT_STRINGS = {}
+
+
+def get_strings(lang: str):
+    """Flattened strings of an enabled locale, loaded on first use."""
+    try:
+        return FLAT_STRINGS[lang]
+    except KeyError:
+        if lang not in lang_dict:
+            raise
+    strings = FLAT_STRINGS[lang] = read_bundle(lang)[1]
+    return strings
+
+
+if DEFAULT_LANG in lang_dict:
+    get_strings(DEFAULT_LANG)
+
+# Keys and locales already reported as missing, logged once each
+MISSING_KEYS = set()
+
+
+def __report_missing(item: str, message: str):
+    if item not in MISSING_KEYS:
+        MISSING_KEYS.add(item)
+        LOGGER.error(message)
 
 
 def tlang(m, user_msg):
     """Main function for getting the string of preferred language."""
-    with LANG_LOCK:
-        default_lang = "en"
-
-        m_args = user_msg.split(".")  # Split in a list
-
-        # Get Chat
-        if isinstance(m, CallbackQuery):
-            m = m.message
-
-        # Get language of user from database, default = 'en' (English)
-        try:
-            lang = Langs(m.chat.id).get_lang()
-        except Exception as ef:
-            LOGGER.error(f"Lang Error: {ef}")
-            lang = default_lang
-            LOGGER.error(format_exc())
-
-        # Raise exception if lang_code not found
-        if lang not in ENABLED_LOCALES:
-            LOGGER.error("Non-enabled locale used by user!")
-            lang = default_lang
-
-        # Get lang
-        m_args.insert(0, lang)
-        m_args.insert(1, "strings")
-
-        try:
-            txt = reduce(getitem, m_args, lang_dict)
-        except KeyError:
-            m_args.pop(0)
-            m_args.insert(0, default_lang)
-            txt = reduce(getitem, m_args, lang_dict)
-            LOGGER.error(format_exc())
-
-        return txt
+    # Get Chat
+    if isinstance(m, CallbackQuery):
+        m = m.message
+
+    # Language of chat from local cache, default = 'en' (English)
+    try:
+        lang = Langs.get_cached_lang(m.chat.id, DEFAULT_LANG)
+    except AttributeError:
+        # Callback queries from inline messages have no chat
+        lang = DEFAULT_LANG
+
+    try:
+        strings = get_strings(lang)
+    except KeyError:
+        __report_missing(lang, f"Non-enabled locale '{lang}' used by user!")
+        strings = FLAT_STRINGS[DEFAULT_LANG]
+
+    try:
+        return strings[user_msg]
+    except KeyError:
+        __report_missing(
+            f"{lang}:{user_msg}",
+            f"Missing string '{user_msg}' in locale '{lang}'",
+        )
+    return FLAT_STRINGS[DEFAULT_LANG][user_msg]
@@ -24,6 +24,7 @@ from time import perf_counter, time
 from typing import List
 
 from ineruki import LOGGER
+from ineruki.database.cache_bus import on_invalidate, publish
 
 THREAD_LOCK = RLock()
 
@@ -67,3 +68,22 @@ async def admin_cache_reload(m: Message or CallbackQuery, status=None) -> List[i
         TEMP_ADMIN_CACHE_BLOCK[m.chat.id] = "autoblock"
 
         return admin_list
+
+
+def move_admin_cache(old_chat_id: int, new_chat_id: int):
+    """Keep cached admins of a chat which got a new id."""
+    with THREAD_LOCK:
+        for cache in (ADMIN_CACHE, TEMP_ADMIN_CACHE_BLOCK):
+            try:
+                cache[new_chat_id] = cache.pop(old_chat_id)
+            except KeyError:
+                pass
+    publish("admins", old_chat_id)
+
+
+@on_invalidate("admins")
+def __drop_admins(chat_id, _):
+    # Admins changed on another instance, fetch them again on next use
+    with THREAD_LOCK:
+        ADMIN_CACHE.pop(chat_id, None)
+        TEMP_ADMIN_CACHE_BLOCK.pop(chat_id, None)
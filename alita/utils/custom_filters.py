@@ -19,11 +19,12 @@
 from pyrogram.filters import create
 from pyrogram.types import CallbackQuery, Message
 from re import compile as compile_re
-from re import escape, search
 from shlex import split
 from typing import List
 
 from ineruki import DEV_USERS, OWNER_ID, PREFIX_HANDLER, SUDO_USERS
+from ineruki.database.antispam_db import GBan
+from ineruki.database.group_blacklist import GroupBlacklist
 from ineruki.tr_engine import tlang
 from ineruki.utils.caching import ADMIN_CACHE, admin_cache_reload
 
@@ -31,6 +32,77 @@ SUDO_LEVEL = set(SUDO_USERS + DEV_USERS + [int(OWNER_ID)])
 DEV_LEVEL = set(DEV_USERS + [int(OWNER_ID)])
 
 
+# Names of all commands handled by the bot, filled by command(). Messages
+# starting with any other word are rejected before tokenizing arguments
+COMMAND_NAMES = set()
+COMMAND_WORD = compile_re(r"\w+")
+
+
+class ParsedCommand:
+    """Command name and raw arguments of a message, parsed once."""
+
+    def __init__(self, name: str, rest: str) -> None:
+        self.name = name
+        self.rest = rest
+        self.__args = None
+
+    @property
+    def args(self) -> List[str]:
+        """Arguments split like a shell, only tokenized when first used."""
+        if self.__args is None:
+            # fix for shlex qoutation error, majorly in filters
+            self.__args = split(self.rest.replace("'", "\\'").strip())
+        return self.__args
+
+
+def parse_command(text: str, prefixes) -> ParsedCommand or None:
+    """Parse a registered command at the start of text.
+
+    Same rules as the regex used before, ^(prefix)+\\b(command)\\b(@bot\\b)?(.*)
+    """
+    from ineruki import BOT_USERNAME
+
+    start = 0
+    while True:
+        for prefix in prefixes:
+            if prefix and text.startswith(prefix, start):
+                start += len(prefix)
+                break
+        else:
+            break
+    if not start and "" not in prefixes:
+        return None
+    if start and COMMAND_WORD.match(text, start - 1, start):
+        return None
+
+    word = COMMAND_WORD.match(text, start)
+    if not word or word.group() not in COMMAND_NAMES:
+        return None
+    end = word.end()
+    mention = f"@{BOT_USERNAME}"
+    if text.startswith(mention, end) and not COMMAND_WORD.match(
+        text,
+        end + len(mention),
+        end + len(mention) + 1,
+    ):
+        end += len(mention)
+    # Arguments only come from the first line, like "." of the old regex
+    return ParsedCommand(word.group(), text[end:].split("\n", 1)[0])
+
+
+def cached_parse_command(m: Message, text: str, prefixes) -> ParsedCommand or None:
+    """Parse command of message once, shared by all command filters."""
+    try:
+        parsed = m._parsed_commands
+    except AttributeError:
+        parsed = m._parsed_commands = {}
+    try:
+        return parsed[prefixes]
+    except KeyError:
+        result = parsed[prefixes] = parse_command(text, prefixes)
+        return result
+
+
 def command(
         commands: str or List[str],
         prefixes: str or List[str] = PREFIX_HANDLER,
@@ -38,8 +110,6 @@ def command(
         dev_cmd: bool = False,
         sudo_cmd: bool = False,
 ):
-    from ineruki import BOT_USERNAME
-
     async def func(flt, _, m: Message):
 
         if not m.from_user:
@@ -57,42 +127,21 @@ def command(
         m.command = None
         if not text:
             return False
-        regex = "^({prefix})+\\b({regex})\\b(\\b@{bot_name}\\b)?(.*)".format(
-            prefix="|".join(escape(x) for x in flt.prefixes),
-            regex="|".join(flt.commands),
-            bot_name=BOT_USERNAME,
-        )
-        matches = search(compile_re(regex), text)
-        if matches:
-            m.command = [matches.group(2)]
-            matches = (matches.group(4)).replace(
-                "'",
-                "\\'",
-            )  # fix for shlex qoutation error, majorly in filters
-            for arg in split(matches.strip()):
-                m.command.append(arg)
-            return True
-        return False
-
-        # backup code incase something breaks!
-        # regex = "^({prefix})+\\b({regex})\\b(.*)".format(
-        #     prefix="|".join(escape(x) for x in flt.prefixes),
-        #     regex="|".join(flt.commands),
-        # )
-        # matches = search(compile_re(regex), text)
-        # if matches:
-        #     m.command = [matches.group(2)]
-        #     matches = (matches.group(3)).replace("'", "\\'")
-        #     for arg in split(matches.strip()):
-        #         m.command.append(arg)
-        #     return True
-        # return False
+        parsed = cached_parse_command(m, text, flt.prefixes)
+        if parsed is None or parsed.name not in flt.commands:
+            return False
+        m.command = [parsed.name, *parsed.args]
+        return True
 
     commands = commands if type(commands) is list else [commands]
     commands = {c if case_sensitive else c.lower() for c in commands}
+    COMMAND_NAMES.update(commands)
     prefixes = [] if prefixes is None else prefixes
     prefixes = prefixes if type(prefixes) is list else [prefixes]
-    prefixes = set(prefixes) if prefixes else {""}
+    # Longest first, so a prefix never hides a longer one starting with it
+    prefixes = (
+        tuple(sorted(set(prefixes), key=len, reverse=True)) if prefixes else ("",)
+    )
     return create(
         func,
         "NormalCommandFilter",
@@ -210,7 +259,19 @@ async def promote_check_func(_, __, m):
     return status
 
 
+async def gban_check_func(_, __, m: Message):
+    """Check if sender is gbanned, reads the live gban set only."""
+    return bool(m.from_user and GBan.is_gbanned(m.from_user.id))
+
+
+async def blacklisted_chat_check_func(_, __, m: Message):
+    """Check if message is from a blacklisted chat, reads the live set only."""
+    return bool(m.chat and GroupBlacklist.is_blacklisted(m.chat.id))
+
+
 admin_filter = create(admin_check_func)
 owner_filter = create(owner_check_func)
 restrict_filter = create(restrict_check_func)
 promote_filter = create(promote_check_func)
+gban_filter = create(gban_check_func)
+blacklisted_chat_filter = create(blacklisted_chat_check_func)
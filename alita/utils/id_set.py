@@ -0,0 +1,86 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+
+class IDSet:
+    """Set of integer ids kept in a sorted array, 8 bytes per id.
+
+    Adds and removes go to small pending sets, merged into the array once
+    they hold merge_at ids, so millions of ids fit in a few megabytes and
+    lookups are a set check plus a binary search done in C.
+    """
+
+    def __init__(self, ids=(), merge_at: int = 4096) -> None:
+        self.merge_at = merge_at
+        self.load(ids)
+
+    def load(self, ids):
+        """Replace all ids, used when loading from database."""
+        self.ids = array("q", sorted(set(ids)))
+        # Ids missing from the array, and ids of the array which were removed
+        self.added = set()
+        self.removed = set()
+
+    def __in_array(self, value: int):
+        i = bisect_left(self.ids, value)
+        return i < len(self.ids) and self.ids[i] == value
+
+    def __contains__(self, value) -> bool:
+        if value in self.added:
+            return True
+        if value in self.removed:
+            return False
+        return self.__in_array(value)
+
+    def add(self, value: int):
+        self.removed.discard(value)
+        if not self.__in_array(value):
+            self.added.add(value)
+            self.__merge_if_needed()
+
+    def discard(self, value: int):
+        self.added.discard(value)
+        if self.__in_array(value):
+            self.removed.add(value)
+            self.__merge_if_needed()
+
+    def __merge_if_needed(self):
+        if len(self.added) + len(self.removed) >= self.merge_at:
+            self.merge()
+
+    def merge(self):
+        """Fold pending changes into the sorted array."""
+        if not (self.added or self.removed):
+            return
+        kept = (
+            (i for i in self.ids if i not in self.removed) if self.removed else self.ids
+        )
+        self.ids = array("q", merge(kept, sorted(self.added)))
+        self.added = set()
+        self.removed = set()
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.added) - len(self.removed)
+
+    def __iter__(self):
+        self.merge()
+        return iter(self.ids)
@@ -0,0 +1,75 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from re import compile as compile_re
+from re import escape
+
+
+def trie_pattern(words) -> str:
+    """Regex matching any of words, with shared prefixes merged into a trie."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return __node_pattern(trie)
+
+
+def __node_pattern(node: dict) -> str:
+    branches = [
+        escape(char) + __node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # A word ends here, the longer words are tried first
+    if "" in node:
+        pattern = f"(?:{pattern})?"
+    return pattern
+
+
+class KeywordMatcher:
+    """Find whole word keywords in text with one compiled regex.
+
+    keywords maps each keyword to the value returned when it is found, an
+    iterable of keywords maps them to themselves. Matching is case
+    insensitive and a keyword must not touch word characters on either side.
+    """
+
+    def __init__(self, keywords) -> None:
+        if not isinstance(keywords, dict):
+            keywords = {i: i for i in keywords}
+        self.keywords = {k.lower(): v for k, v in keywords.items() if k}
+        self.pattern = (
+            compile_re(rf"(?<!\w)(?:{trie_pattern(self.keywords)})(?!\w)")
+            if self.keywords
+            else None
+        )
+
+    def search(self, text: str):
+        """Value of the first keyword found in text, None if there is none."""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(text.lower())
+        return self.keywords[match.group()] if match else None
+
+    def __len__(self) -> int:
+        return len(self.keywords)
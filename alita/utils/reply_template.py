@@ -0,0 +1,121 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from cachetools import LRUCache
+from pyrogram.types import Message
+from pyromod.helpers import ikb
+from secrets import choice
+from threading import RLock
+
+from ineruki.utils.string import (
+    PlaceholderTemplate,
+    build_keyboard,
+    escape_invalid_curly_brackets,
+    parse_button,
+    placeholder_values,
+)
+
+INSERTION_LOCK = RLock()
+
+# Separates the random variants of a reply
+VARIANT_SPLITTER = "%%%"
+
+PARSE_WORDS = [
+    "first",
+    "last",
+    "fullname",
+    "username",
+    "id",
+    "chatname",
+    "mention",
+]
+
+# Compiled templates keyed by the stored reply text, shared by filters and
+# notes, so an edited reply simply compiles to a new entry
+TEMPLATE_CACHE = LRUCache(maxsize=5000)
+
+
+class ReplyVariant:
+    """One variant of a reply, buttons parsed and curly brackets escaped."""
+
+    def __init__(self, text: str, keyboard: list) -> None:
+        self.text = PlaceholderTemplate(text)
+        self.keyboard = [
+            [
+                (PlaceholderTemplate(label), PlaceholderTemplate(url), kind)
+                for label, url, kind in row
+            ]
+            for row in keyboard
+        ]
+        self.slots = self.text.slots.union(
+            *(j.slots for row in self.keyboard for i in row for j in i[:2])
+        )
+        # Nothing to substitute, render once for every later reply
+        self.rendered = None if self.slots else self.__render({})
+
+    def __render(self, values: dict):
+        keyboard = [
+            [
+                (label.render(values), url.render(values), kind)
+                for label, url, kind in row
+            ]
+            for row in self.keyboard
+        ]
+        return self.text.render(values), (ikb(keyboard) if keyboard else None)
+
+    def render(self, values: dict):
+        """Text and reply markup with placeholders replaced by values."""
+        if self.rendered is not None:
+            return self.rendered
+        return self.__render(values)
+
+
+class ReplyTemplate:
+    """Stored filter or note reply, compiled once and reused on every reply."""
+
+    def __init__(self, variants: list) -> None:
+        self.variants = variants
+
+    @staticmethod
+    async def compile(text: str):
+        """Split variants, escape curly brackets and parse buttons of text."""
+        variants = []
+        for variant in (text or "").split(VARIANT_SPLITTER):
+            # Escaped braces come in pairs, so buttons never split a slot
+            body, buttons = await parse_button(
+                await escape_invalid_curly_brackets(variant, PARSE_WORDS),
+            )
+            variants.append(ReplyVariant(body, await build_keyboard(buttons)))
+        return ReplyTemplate(variants)
+
+    async def render(self, m: Message):
+        """Text and reply markup of a random variant for the sender of m."""
+        variant = choice(self.variants)
+        return variant.render(await placeholder_values(m, variant.slots))
+
+
+async def get_template(text: str):
+    """Compiled template of a stored reply text, compiled on first use."""
+    text = text or ""
+    with INSERTION_LOCK:
+        try:
+            return TEMPLATE_CACHE[text]
+        except KeyError:
+            pass
+        template = TEMPLATE_CACHE[text] = await ReplyTemplate.compile(text)
+        return template
@@ -19,7 +19,6 @@
 from pyrogram.errors import RPCError
 from pyrogram.types import CallbackQuery, Message
 from pyromod.helpers import ikb
-from secrets import choice
 from traceback import format_exc
 
 from ineruki import HELP_COMMANDS, LOGGER, SUPPORT_GROUP
@@ -30,11 +29,7 @@ from ineruki.database.rules_db import Rules
 from ineruki.tr_engine import tlang
 from ineruki.utils.cmd_senders import send_cmd
 from ineruki.utils.msg_types import Types
-from ineruki.utils.string import (
-    build_keyboard,
-    escape_mentions_using_curly_brackets,
-    parse_button,
-)
+from ineruki.utils.reply_template import get_template
 
 # Initialize
 notes_db = Notes()
@@ -82,6 +77,12 @@ async def gen_start_kb(q: Message or CallbackQuery):
     )
 
 
+async def __chat_title(chat_id: int):
+    """Stored name of a chat, its id if it was not written to database yet."""
+    chat_info = await Chats.get_chat_info(chat_id)
+    return chat_info["chat_name"] if chat_info else chat_id
+
+
 async def get_private_note(c: Ineruki, m: Message, help_option: str):
     """Get the note in pm of user, with parsing enabled."""
     from ineruki import BOT_USERNAME
@@ -90,8 +91,8 @@ async def get_private_note(c: Ineruki, m: Message, help_option: str):
     if len(help_lst) == 2:
         chat_id = int(help_lst[1])
 
-        all_notes = notes_db.get_all_notes(chat_id)
-        chat_title = Chats.get_chat_info(chat_id)["chat_name"]
+        all_notes = await notes_db.get_all_notes(chat_id)
+        chat_title = await __chat_title(chat_id)
         rply = f"Notes in {chat_title}:\n\n"
         note_list = [
             f"- [{note[0]}](https://t.me/{BOT_USERNAME}?start=note_{chat_id}_{note[1]})"
@@ -106,7 +107,7 @@ async def get_private_note(c: Ineruki, m: Message, help_option: str):
         return
 
     note_hash = help_option.split("_")[2]
-    getnotes = notes_db.get_note_by_hash(note_hash)
+    getnotes = await notes_db.get_note_by_hash(note_hash)
     if not getnotes:
         await m.reply_text("Note does not exist", quote=True)
         return
@@ -119,30 +120,11 @@ async def get_private_note(c: Ineruki, m: Message, help_option: str):
         )
         return
 
-    try:
-        # support for random notes texts
-        splitter = "%%%"
-        note_reply = getnotes["note_value"].split(splitter)
-        note_reply = choice(note_reply)
-    except KeyError:
-        note_reply = ""
-
-    parse_words = [
-        "first",
-        "last",
-        "fullname",
-        "username",
-        "id",
-        "chatname",
-        "mention",
-    ]
-    text = await escape_mentions_using_curly_brackets(m, note_reply, parse_words)
+    # Random variant with buttons parsed once when the note was compiled
+    template = await get_template(getnotes.get("note_value"))
+    teks, button = await template.render(m)
 
     if msgtype == Types.TEXT:
-
-        teks, button = await parse_button(text)
-        button = await build_keyboard(button)
-        button = ikb(button) if button else None
         if button:
             try:
                 await m.reply_text(
@@ -171,13 +153,6 @@ async def get_private_note(c: Ineruki, m: Message, help_option: str):
     ):
         await (await send_cmd(c, msgtype))(m.chat.id, getnotes["fileid"])
     else:
-        if getnotes["note_value"]:
-            teks, button = await parse_button(getnotes["note_value"])
-            button = await build_keyboard(button)
-            button = ikb(button) if button else None
-        else:
-            teks = ""
-            button = None
         if button:
             try:
                 await (await send_cmd(c, msgtype))(
@@ -211,8 +186,8 @@ async def get_private_note(c: Ineruki, m: Message, help_option: str):
 
 async def get_private_rules(_, m: Message, help_option: str):
     chat_id = int(help_option.split("_")[1])
-    rules = Rules(chat_id).get_rules()
-    chat_title = Chats.get_chat_info(chat_id)["chat_name"]
+    rules = await Rules(chat_id).get_rules()
+    chat_title = await __chat_title(chat_id)
     await m.reply_text(
         (tlang(m, "rules.get_rules")).format(
             chat=chat_title,
@@ -0,0 +1,56 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from contextlib import contextmanager
+from time import perf_counter
+
+from ineruki import BOOT_START
+
+# Seconds spent in each startup phase, in the order they first ran
+STARTUP_PHASES = {}
+
+# Time spent in phases nested inside each running phase
+__NESTED = []
+
+
+def record_phase(name: str, start: float, nested: float = 0):
+    """Add the time since start to a phase, less the time of nested phases."""
+    elapsed = perf_counter() - start
+    STARTUP_PHASES[name] = STARTUP_PHASES.get(name, 0) + elapsed - nested
+    if __NESTED:
+        __NESTED[-1] += elapsed
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Record the time spent in the block as a startup phase."""
+    # Listed when it starts, so phases come before the ones nested in them
+    STARTUP_PHASES.setdefault(name, 0)
+    start = perf_counter()
+    __NESTED.append(0)
+    try:
+        yield
+    finally:
+        record_phase(name, start, __NESTED.pop())
+
+
+def startup_report(html: bool = True):
+    """Time of every startup phase and the total, for the boot message."""
+    line = "<b>{}:</b> <code>{}s</code>" if html else "{}: {}s"
+    phases = [*STARTUP_PHASES.items(), ("Total", perf_counter() - BOOT_START)]
+    return "\n".join(line.format(name, round(seconds, 3)) for name, seconds in phases)
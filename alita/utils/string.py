@@ -25,6 +25,10 @@ from typing import List
 from ineruki.utils.parser import mention_html
 
 BTN_URL_REGEX = compile_re(r"(\[([^\[]+?)\]\(buttonurl:(?:/{0,2})(.+?)(:same)?\))")
+# Escaped brackets, a possible placeholder or a lone bracket, in one pass
+CURLY_BRACKETS_REGEX = compile_re(r"\{\{|\}\}|\{(\w+)\}|[{}]")
+# Fields of a format string made by escape_invalid_curly_brackets
+FORMAT_FIELD_REGEX = compile_re(r"\{\{|\}\}|\{(\w+)\}")
 
 
 async def extract_time(m: Message, time_val: str):
@@ -100,33 +104,53 @@ START_CHAR = ("'", '"', SMART_OPEN)
 
 
 async def escape_invalid_curly_brackets(text: str, valids: List[str]) -> str:
-    new_text = ""
-    idx = 0
-    while idx < len(text):
-        if text[idx] == "{":
-            if idx + 1 < len(text) and text[idx + 1] == "{":
-                idx += 2
-                new_text += "{{{{"
-            else:
-                success = any(text[idx:].startswith("{" + v + "}") for v in valids)
-                if success:
-                    new_text += text[idx: idx + len(v) + 2]
-                    idx += len(v) + 2
-                else:
-                    new_text += "{{"
-
-        elif text[idx] == "}":
-            if idx + 1 < len(text) and text[idx + 1] == "}":
-                idx += 2
-                new_text += "}}}}"
-            else:
-                new_text += "}}"
-
-        else:
-            new_text += text[idx]
-        idx += 1
-
-    return new_text
+    """Escape the curly brackets of text which are not a valid placeholder."""
+
+    def replace(match):
+        token = match.group()
+        if match.group(1) is not None:
+            return token if match.group(1) in valids else "{{" + match.group(1) + "}}"
+        # "{{" and "}}" stay literal after formatting, lone brackets are escaped
+        return token * 2
+
+    return CURLY_BRACKETS_REGEX.sub(replace, text)
+
+
+class PlaceholderTemplate:
+    """Format string with named placeholders, tokenized once.
+
+    Takes the output of escape_invalid_curly_brackets and renders it like
+    str.format with keyword arguments, only the placeholders in slots need
+    a value.
+    """
+
+    def __init__(self, text: str) -> None:
+        # Literal text around the placeholders, one more than the names
+        self.literals = []
+        self.names = []
+        literal = []
+        prev = 0
+        for match in FORMAT_FIELD_REGEX.finditer(text):
+            literal.append(text[prev : match.start()])
+            prev = match.end()
+            if match.group(1) is None:
+                literal.append(match.group()[0])
+                continue
+            self.literals.append("".join(literal))
+            self.names.append(match.group(1))
+            literal = []
+        literal.append(text[prev:])
+        self.literals.append("".join(literal))
+        self.slots = frozenset(self.names)
+
+    def render(self, values: dict) -> str:
+        if not self.names:
+            return self.literals[0]
+        parts = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            parts.append(str(values[name]))
+            parts.append(literal)
+        return "".join(parts)
 
 
 async def escape_mentions_using_curly_brackets(
@@ -134,32 +158,43 @@ async def escape_mentions_using_curly_brackets(
         text: str,
         parse_words: list,
 ) -> str:
-    teks = await escape_invalid_curly_brackets(text, parse_words)
-    if teks:
-        teks = teks.format(
-            first=escape(m.from_user.first_name),
-            last=escape(m.from_user.last_name or m.from_user.first_name),
-            fullname=" ".join(
-                [
-                    escape(m.from_user.first_name),
-                    escape(m.from_user.last_name),
-                ]
-                if m.from_user.last_name
-                else [escape(m.from_user.first_name)],
-            ),
-            username="@" + escape(m.from_user.username)
-            if m.from_user.username
-            else (await mention_html(m.from_user.first_name, m.from_user.id)),
-            mention=(await mention_html(m.from_user.first_name, m.from_user.id)),
-            chatname=escape(m.chat.title)
-            if m.chat.type != "private"
-            else escape(m.from_user.first_name),
-            id=m.from_user.id,
-        )
-    else:
-        teks = ""
-
-    return teks
+    if not text:
+        return ""
+    template = PlaceholderTemplate(
+        await escape_invalid_curly_brackets(text, parse_words),
+    )
+    return template.render(await placeholder_values(m, template.slots))
+
+
+async def placeholder_value(m: Message, name: str):
+    """Value of one placeholder usable in notes and filters."""
+    user = m.from_user
+    if name == "first":
+        return escape(user.first_name)
+    if name == "last":
+        return escape(user.last_name or user.first_name)
+    if name == "fullname":
+        if user.last_name:
+            return f"{escape(user.first_name)} {escape(user.last_name)}"
+        return escape(user.first_name)
+    if name == "username":
+        if user.username:
+            return "@" + escape(user.username)
+        return await mention_html(user.first_name, user.id)
+    if name == "mention":
+        return await mention_html(user.first_name, user.id)
+    if name == "chatname":
+        if m.chat.type != "private":
+            return escape(m.chat.title)
+        return escape(user.first_name)
+    if name == "id":
+        return user.id
+    raise KeyError(name)
+
+
+async def placeholder_values(m: Message, names) -> dict:
+    """Values of the placeholders in names, the others are not computed."""
+    return {name: await placeholder_value(m, name) for name in names}
 
 
 async def split_quotes(text: str):
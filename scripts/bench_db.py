@@ -0,0 +1,151 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Load test the hot database paths on the memory or SQLite backend.
+
+Simulates group traffic without a Mongo server or Telegram. Run from the
+repository root, for example:
+
+    python3 -m scripts.bench_db --backend sqlite --latency 1 --chats 50
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from os import environ
+from random import Random
+from time import perf_counter
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument(
+        "--path",
+        default=":memory:",
+        help="SQLite database file, kept in memory by default",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="Simulated milliseconds per database operation",
+    )
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--users", type=int, default=200, help="Users per chat")
+    parser.add_argument("--messages", type=int, default=5000)
+    return parser.parse_args()
+
+
+def configure(args):
+    """Point the bot config at the local backend, before ineruki is imported."""
+    environ["ENV"] = "ANYTHING"
+    environ["DB_BACKEND"] = args.backend
+    environ["DB_URI"] = args.path
+    environ["DB_LATENCY_MS"] = str(args.latency)
+    # Required by the config, never used without a Telegram client
+    for name in ("APP_ID", "OWNER_ID"):
+        environ.setdefault(name, "0")
+
+
+async def timed(name: str, calls: list, func):
+    """Await func for every argument tuple of calls and print the time per call."""
+    start = perf_counter()
+    for args in calls:
+        await func(*args)
+    elapsed = perf_counter() - start
+    print(
+        f"{name:<24} {len(calls):>7} calls "
+        f"{elapsed / len(calls) * 1000:>9.3f} ms/call "
+        f"{len(calls) / elapsed:>10.0f} calls/s",
+    )
+
+
+async def main(args):
+    from ineruki.database import INDEX_REGISTRY, MongoDB
+    from ineruki.database.antispam_db import GBan
+    from ineruki.database.approve_db import Approve
+    from ineruki.database.blacklist_db import Blacklist
+    from ineruki.database.chats_db import Chats
+    from ineruki.database.filters_db import Filters
+    from ineruki.database.pins_db import Pins
+    from ineruki.database.users_db import Users
+    from ineruki.database.warns_db import Warns
+    from ineruki.database.write_behind import flush, track_user
+
+    # Same indexes as at startup, so unique indexes are enforced
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        await MongoDB(collection_name).create_indexes(indexes)
+
+    # Message senders of the simulated traffic, the same for every path
+    rng = Random(0)
+    chat_ids = [-1001000000000 - i for i in range(args.chats)]
+    traffic = [
+        (rng.choice(chat_ids), rng.randrange(args.users) + 1)
+        for _ in range(args.messages)
+    ]
+
+    print(
+        f"{args.backend} backend, {args.latency} ms latency, {args.chats} chats, "
+        f"{args.users} users per chat, {args.messages} messages",
+    )
+
+    async def seen(chat_id, user_id):
+        await Chats(chat_id).update_chat(f"chat {chat_id}", user_id)
+        await Users(user_id).update_user(f"user {user_id}", f"user{user_id}")
+
+    async def buffered(chat_id, user_id):
+        track_user(chat_id, f"chat {chat_id}", user_id, f"user {user_id}", None)
+
+    gbans = GBan()
+    filters = Filters()
+    for chat_id in chat_ids:
+        await Blacklist(chat_id).add_blacklist("spam")
+        await filters.save_filter(chat_id, "hello|hi", "Hello {first}!")
+
+    await timed("update_chat/update_user", traffic, seen)
+    await timed("track_user", traffic, buffered)
+    await timed("write-behind flush", [()], flush)
+    await timed("check_gban", traffic, lambda _, user_id: gbans.check_gban(user_id))
+    await timed(
+        "check_approve",
+        traffic,
+        lambda chat_id, user_id: Approve(chat_id).check_approve(user_id),
+    )
+    await timed(
+        "blacklist get_matcher",
+        traffic,
+        lambda chat_id, _: Blacklist(chat_id).get_matcher(),
+    )
+    await timed(
+        "filters get_matcher",
+        traffic,
+        lambda chat_id, _: filters.get_matcher(chat_id),
+    )
+    await timed(
+        "pins get_settings", traffic, lambda chat_id, _: Pins(chat_id).get_settings()
+    )
+    await timed(
+        "warn_user",
+        traffic,
+        lambda chat_id, user_id: Warns(chat_id).warn_user(user_id, "bench"),
+    )
+
+
+if __name__ == "__main__":
+    ARGS = parse_args()
+    configure(ARGS)
+    run(main(ARGS))
@@ -0,0 +1,142 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark the placeholder template engine against the previous path.
+
+Run from the repository root with python3 -m scripts.bench_templates.
+"""
+
+from asyncio import run
+from time import perf_counter
+from types import SimpleNamespace
+from typing import List
+
+from ineruki.utils.reply_template import PARSE_WORDS
+from ineruki.utils.string import (
+    PlaceholderTemplate,
+    escape_invalid_curly_brackets,
+    escape_mentions_using_curly_brackets,
+    placeholder_values,
+)
+
+# Welcome text repeated up to each benchmarked length
+WELCOME = "Hey {first} {last}, welcome to {chatname}! {{x}} {nope} } {mention}\n"
+LENGTHS = (1000, 10000, 100000)
+
+MESSAGE = SimpleNamespace(
+    from_user=SimpleNamespace(
+        first_name="Ada <3",
+        last_name="Lovelace",
+        username=None,
+        id=1,
+    ),
+    chat=SimpleNamespace(type="supergroup", title="Engines & Co"),
+)
+
+
+async def old_escape_invalid_curly_brackets(text: str, valids: List[str]) -> str:
+    """escape_invalid_curly_brackets before the template engine."""
+    new_text = ""
+    idx = 0
+    while idx < len(text):
+        if text[idx] == "{":
+            if idx + 1 < len(text) and text[idx + 1] == "{":
+                idx += 2
+                new_text += "{{{{"
+                continue
+            valid = next(
+                (v for v in valids if text.startswith("{" + v + "}", idx)),
+                None,
+            )
+            if valid is not None:
+                new_text += text[idx : idx + len(valid) + 2]
+                idx += len(valid) + 2
+                continue
+            new_text += "{{"
+
+        elif text[idx] == "}":
+            if idx + 1 < len(text) and text[idx + 1] == "}":
+                idx += 2
+                new_text += "}}}}"
+                continue
+            new_text += "}}"
+
+        else:
+            new_text += text[idx]
+        idx += 1
+
+    return new_text
+
+
+async def old_escape_mentions(m, text: str, parse_words: list) -> str:
+    """escape_mentions_using_curly_brackets before the template engine."""
+    teks = await old_escape_invalid_curly_brackets(text, parse_words)
+    if not teks:
+        return ""
+    # Every placeholder was computed for every text
+    return teks.format(**(await placeholder_values(m, PARSE_WORDS)))
+
+
+async def timed(func, *args, number: int):
+    """Milliseconds per awaited call of func."""
+    start = perf_counter()
+    for _ in range(number):
+        await func(*args)
+    return (perf_counter() - start) / number * 1000
+
+
+async def main():
+    for length in LENGTHS:
+        text = (WELCOME * (length // len(WELCOME) + 1))[:length]
+        number = max(10, 100000 // length)
+        old = await old_escape_mentions(MESSAGE, text, PARSE_WORDS)
+        new = await escape_mentions_using_curly_brackets(MESSAGE, text, PARSE_WORDS)
+        assert old == new, "template engine output differs from the old path"
+
+        template = PlaceholderTemplate(
+            await escape_invalid_curly_brackets(text, PARSE_WORDS),
+        )
+        values = await placeholder_values(MESSAGE, template.slots)
+        start = perf_counter()
+        for _ in range(number):
+            template.render(values)
+        render = (perf_counter() - start) / number * 1000
+
+        before = await timed(
+            old_escape_mentions, MESSAGE, text, PARSE_WORDS, number=number
+        )
+        after = await timed(
+            escape_mentions_using_curly_brackets,
+            MESSAGE,
+            text,
+            PARSE_WORDS,
+            number=number,
+        )
+        print(
+            f"{length} chars: escape_mentions {before:.3f} -> {after:.3f} ms; "
+            f"compiled render {render:.3f} ms",
+        )
+
+    # Runs of brackets only, the time should double with the length
+    for length in (100000, 200000):
+        text = "{" * length
+        ms = await timed(escape_invalid_curly_brackets, text, PARSE_WORDS, number=10)
+        print(f"{length} lone brackets: escape {ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    run(main())
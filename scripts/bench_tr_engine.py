@@ -0,0 +1,101 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark translation loading and lookups against the nested dict path.
+
+Run from the repository root with python3 -m scripts.bench_tr_engine.
+"""
+
+from functools import reduce
+from operator import getitem
+from threading import RLock
+from time import perf_counter
+from types import SimpleNamespace
+from yaml import load as load_yml
+
+from ineruki.tr_engine.tr_engine import (
+    DEFAULT_LANG,
+    FullLoader,
+    build_bundle,
+    read_bundle,
+    tlang,
+)
+
+LANG_LOCK = RLock()
+ROUNDS = 200
+LOADS = 20
+
+# Message of a chat with no language set, so the default locale is used
+MESSAGE = SimpleNamespace(chat=SimpleNamespace(id=0))
+
+
+def old_tlang(lang_dict: dict, user_msg: str):
+    """Lookup before flattening, without its database access."""
+    with LANG_LOCK:
+        m_args = user_msg.split(".")
+        m_args.insert(0, DEFAULT_LANG)
+        m_args.insert(1, "strings")
+        return reduce(getitem, m_args, lang_dict)
+
+
+def per_call(func, calls: int):
+    """Microseconds per call of func."""
+    start = perf_counter()
+    func()
+    return (perf_counter() - start) / calls * 1000000
+
+
+def main():
+    with open(f"locales/{DEFAULT_LANG}.yml", encoding="utf-8") as f:
+        lang_dict = {DEFAULT_LANG: load_yml(f, Loader=FullLoader)}
+    keys = []
+    for key in read_bundle(DEFAULT_LANG)[1]:
+        try:
+            expected = old_tlang(lang_dict, key)
+        except KeyError:
+            # Names containing a dot never resolved on the nested dict path
+            continue
+        assert expected == tlang(MESSAGE, key), key
+        keys.append(key)
+
+    calls = len(keys) * ROUNDS
+    before = per_call(
+        lambda: [old_tlang(lang_dict, i) for _ in range(ROUNDS) for i in keys],
+        calls,
+    )
+    after = per_call(
+        lambda: [tlang(MESSAGE, i) for _ in range(ROUNDS) for i in keys],
+        calls,
+    )
+    print(f"Lookup of {len(keys)} keys: {before:.2f} -> {after:.2f} us per call")
+
+    parse = per_call(
+        lambda: [build_bundle(DEFAULT_LANG) for _ in range(LOADS)],
+        LOADS,
+    )
+    bundle = per_call(
+        lambda: [read_bundle(DEFAULT_LANG) for _ in range(LOADS)],
+        LOADS,
+    )
+    print(
+        f"Loading {DEFAULT_LANG}: yml parse {parse / 1000:.2f} ms, "
+        f"marshal bundle {bundle / 1000:.2f} ms",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Copyright (C) 2020 - 2021 Divkix. All rights reserved. Source code available under the AGPL.
+#
+# This file is part of Ineruki_Robot.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Check that events published on the local cache bus reach their handler.
+
+Run from the repository root with python3 -m scripts.check_cache_bus.
+"""
+
+from asyncio import run
+
+from ineruki.database import cache_bus
+
+# Events applied by the handler, as (key, value)
+APPLIED = []
+
+
+@cache_bus.on_invalidate("check")
+def __apply(key, value):
+    APPLIED.append((key, value))
+
+
+async def main():
+    cache_bus._BUS = cache_bus.LocalBus()
+    cache_bus.publish("check", -100, "value")
+    # Waits for the pending dispatch before the bus is dropped
+    await cache_bus.stop_bus()
+    assert APPLIED == [(-100, "value")], APPLIED
+    print("Local cache bus delivered the event to its handler")
+
+
+if __name__ == "__main__":
+    run(main())